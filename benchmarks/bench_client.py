@@ -0,0 +1,217 @@
+"""
+Client path benchmark, with the real client on a loopback broker:
+    - publish:  MqttClient.publish time per message, against the message
+                encoding time alone, the difference being the client
+                overhead (metrics, paho interface, broker routing).
+    - dispatch: latency percentiles of a message from its publication
+                to its callback on the receiving client, through the
+                broker and the network loop, against the number of
+                registered per-unit topics.
+
+Usage: python benchmarks/bench_client.py [UNIT_COUNT ...]
+"""
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '..', 'src'))
+
+from pkgs.messages import UnitWhldStateMsg                  # noqa: E402
+from pkgs.mqttClient import LoopbackBroker, MqttClient      # noqa: E402
+
+DEFAULT_UNIT_COUNTS = (10, 100, 1000)
+DISPATCH_SAMPLES = 20000
+WAIT_TIMEOUT = 5.0
+
+
+def _createClient(broker: LoopbackBroker, clientId: str) -> MqttClient:
+    """
+    Create a client of the loopback broker, connected, with its network
+    loop started.
+
+    Params:
+        broker:     The loopback broker.
+        clientId:   The client ID.
+
+    Return:
+        The client.
+    """
+    client = MqttClient(logging, clientId, 'password',
+                        clientFactory=broker.createClient)
+    client.connect('loopback', 1883)
+    client.startLoop()
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while not client.isConnected():
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"{clientId} not connected to the loopback "
+                               f"broker")
+        time.sleep(0.001)
+    return client
+
+
+def _closeClient(client: MqttClient) -> None:
+    """
+    Disconnect a client and stop its network loop.
+
+    Params:
+        client:     The client.
+    """
+    client.disconnect()
+    client.stopLoop()
+
+
+def _buildMsg(unit: str) -> UnitWhldStateMsg:
+    """
+    Build a wheeled unit state message.
+
+    Params:
+        unit:       The unit ID.
+
+    Return:
+        The message.
+    """
+    return UnitWhldStateMsg(unit, {UnitWhldStateMsg.STEERING_KEY: 0.25,
+                                   UnitWhldStateMsg.THROTTLE_KEY: -0.75})
+
+
+def runPublish(repeat: int = 3) -> list:
+    """
+    Run the publish benchmark, the acknowledgements being consumed by
+    the client network loop.
+
+    Params:
+        repeat:     The number of runs, the best being kept. Default: 3.
+
+    Return:
+        The results, a dictionary per QoS with the publish and encode
+        times in microseconds.
+    """
+    broker = LoopbackBroker()
+    client = _createClient(broker, 'publisher')
+    results = []
+    for qos in (0, 1):
+        msg = _buildMsg('unit1')
+        msg.setQos(qos)
+
+        def encode():
+            msg.clearCache()
+            return msg.toWire()
+
+        def publish():
+            msg.clearCache()
+            return client.publish(msg)
+
+        timings = {}
+        for name, fn in (('encode', encode), ('publish', publish)):
+            timer = timeit.Timer(fn)
+            number = timer.autorange()[0]
+            best = None
+            for _ in range(repeat):
+                elapsed = timer.timeit(number=number)
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best / number * 1e6
+        overhead = timings['publish'] - timings['encode']
+        results.append({'qos': qos,
+                        'us per publish': timings['publish'],
+                        'us per encode': timings['encode'],
+                        'us overhead': overhead})
+    _closeClient(client)
+    return results
+
+
+def runDispatch(unitCounts: tuple = DEFAULT_UNIT_COUNTS,
+                samples: int = DISPATCH_SAMPLES) -> list:
+    """
+    Run the dispatch benchmark, each message being timed from its
+    publication by a client to the end of its callback on another one,
+    one message at a time, through the loopback broker.
+
+    Params:
+        unitCounts: The numbers of units, each registering its command,
+                    state and connection state topics.
+                    Default: 10, 100 and 1000.
+        samples:    The number of timed messages. Default: 20000.
+
+    Return:
+        The results, a dictionary per unit count with the latency
+        percentiles in microseconds.
+    """
+    results = []
+    payload = _buildMsg('unit').toWire()
+    for unitCount in unitCounts:
+        broker = LoopbackBroker()
+        publisher = _createClient(broker, 'publisher')
+        commander = _createClient(broker, 'commander')
+        received = threading.Event()
+        receivedAt = [0]
+
+        def callback(client, usrData, msg):
+            receivedAt[0] = time.perf_counter_ns()
+            received.set()
+
+        for index in range(unitCount):
+            for topicFilter in (f"units/wheeled/unit{index}/state",
+                                f"units/wheeled/unit{index}/steering",
+                                f"units/connectionState/unit{index}"):
+                commander.registerMsgCallback(topicFilter, callback)
+        if not commander.subscribe([{'topic': 'units/#', 'qos': 0}]) \
+                .wait(WAIT_TIMEOUT):
+            raise RuntimeError('commander not subscribed')
+        topics = [f"units/wheeled/unit{index % unitCount}/state"
+                  for index in range(samples)]
+        latencies = []
+        for topic in topics:
+            received.clear()
+            start = time.perf_counter_ns()
+            publisher.publishRaw(topic, payload)
+            if not received.wait(WAIT_TIMEOUT):
+                raise RuntimeError(f"message on {topic} not received")
+            latencies.append((receivedAt[0] - start) / 1e3)
+        _closeClient(commander)
+        _closeClient(publisher)
+        percentiles = statistics.quantiles(latencies, n=100)
+        results.append({'units': unitCount, 'topics': 3 * unitCount,
+                        'p50 us': percentiles[49],
+                        'p90 us': percentiles[89],
+                        'p99 us': percentiles[98],
+                        'max us': max(latencies)})
+    return results
+
+
+def run(unitCounts: tuple = DEFAULT_UNIT_COUNTS, repeat: int = 3) -> dict:
+    """
+    Run the client path benchmarks.
+
+    Params:
+        unitCounts: The numbers of units of the dispatch benchmark.
+                    Default: 10, 100 and 1000.
+        repeat:     The number of publish runs. Default: 3.
+
+    Return:
+        The publish and dispatch results.
+    """
+    return {'publish': runPublish(repeat=repeat),
+            'dispatch': runDispatch(unitCounts)}
+
+
+if __name__ == '__main__':
+    unitCounts = tuple(int(arg) for arg in sys.argv[1:]) or \
+        DEFAULT_UNIT_COUNTS
+    results = run(unitCounts)
+    print(f"{'qos':>4} {'us/publish':>11} {'us/encode':>10} "
+          f"{'us overhead':>12}")
+    for result in results['publish']:
+        print(f"{result['qos']:>4} {result['us per publish']:>11.2f} "
+              f"{result['us per encode']:>10.2f} "
+              f"{result['us overhead']:>12.2f}")
+    print(f"{'units':>6} {'topics':>7} {'p50 us':>8} {'p90 us':>8} "
+          f"{'p99 us':>8} {'max us':>8}")
+    for result in results['dispatch']:
+        print(f"{result['units']:>6} {result['topics']:>7} "
+              f"{result['p50 us']:>8.2f} {result['p90 us']:>8.2f} "
+              f"{result['p99 us']:>8.2f} {result['max us']:>8.2f}")
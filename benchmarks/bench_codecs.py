@@ -0,0 +1,124 @@
+"""
+Message codec benchmark: encode and decode operations per second of
+each message class, in each wire format it supports:
+    - json:     toJson / fromJson (str).
+    - bytes:    toBytes / decode of the json bytes.
+    - binary:   toBinary / decode of the binary format.
+The encoding cache is invalidated before each encode so the encoding
+itself is timed.
+
+Usage: python benchmarks/bench_codecs.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '..', 'src'))
+
+from pkgs.messages import BinaryFormatNotSupported, UnitCxnStateMsg, \
+    UnitWhldCmdMsg, UnitWhldStateMsg                        # noqa: E402
+
+
+def buildMessages() -> list:
+    """
+    Build a typical message of each class.
+
+    Return:
+        The messages.
+    """
+    return [
+        UnitCxnStateMsg('unit1', {
+            UnitCxnStateMsg.STATE_KEY: UnitCxnStateMsg.ONLINE_STATE,
+        }),
+        UnitWhldCmdMsg('unit1', {
+            UnitWhldCmdMsg.STEERING_KEY: 0.25,
+            UnitWhldCmdMsg.THROTTLE_KEY: -0.75,
+        }),
+        UnitWhldStateMsg('unit1', {
+            UnitWhldStateMsg.STEERING_KEY: 0.25,
+            UnitWhldStateMsg.THROTTLE_KEY: -0.75,
+        }),
+    ]
+
+
+def buildCodecs(msg) -> dict:
+    """
+    Build the encode and decode functions of a message in each format
+    it supports.
+
+    Params:
+        msg:        The message.
+
+    Return:
+        The (encode, decode) functions by format name.
+    """
+    msgClass = type(msg)
+    topic = msg.getTopic()
+
+    def encoder(encodeFn):
+        def encode():
+            msg.clearCache()
+            return encodeFn()
+        return encode
+
+    codecs = {}
+    jsonStr = msg.toJson()
+    codecs['json'] = (encoder(msg.toJson),
+                      lambda: msgClass(msg.getUnit()).fromJson(jsonStr))
+    jsonBytes = msg.toBytes()
+    codecs['bytes'] = (encoder(msg.toBytes),
+                       lambda: msgClass.decode(jsonBytes, topic))
+    try:
+        binary = msg.toBinary()
+    except BinaryFormatNotSupported:
+        return codecs
+    codecs['binary'] = (encoder(msg.toBinary),
+                        lambda: msgClass.decode(binary, topic))
+    return codecs
+
+
+def _opsPerSec(fn, repeat: int) -> float:
+    """
+    Time a function, the number of calls being adjusted so a run takes
+    at least 0.2 second.
+
+    Params:
+        fn:         The function.
+        repeat:     The number of runs, the best being kept.
+
+    Return:
+        The calls per second.
+    """
+    timer = timeit.Timer(fn)
+    number = timer.autorange()[0]
+    return number / min(timer.repeat(repeat=repeat, number=number))
+
+
+def run(repeat: int = 3) -> list:
+    """
+    Run the benchmark.
+
+    Params:
+        repeat:     The number of runs of each operation, the best being
+                    kept. Default: 3.
+
+    Return:
+        The results, a dictionary per message class, format and
+        operation with the operations per second.
+    """
+    results = []
+    for msg in buildMessages():
+        for fmt, (encode, decode) in buildCodecs(msg).items():
+            for op, fn in (('encode', encode), ('decode', decode)):
+                results.append({'class': type(msg).__name__,
+                                'format': fmt, 'op': op,
+                                'ops per sec': _opsPerSec(fn, repeat)})
+    return results
+
+
+if __name__ == '__main__':
+    print(f"{'class':>18} {'format':>7} {'op':>7} {'ops/sec':>12}")
+    for result in run():
+        print(f"{result['class']:>18} {result['format']:>7} "
+              f"{result['op']:>7} {result['ops per sec']:>12.0f}")
@@ -0,0 +1,111 @@
+"""
+Topic dispatch benchmark: time to find the callbacks of a received
+topic against the number of registered per-unit filters, for:
+    - linear:   every filter checked with paho topic_matches_sub.
+    - paho:     the paho MQTTMatcher used by message_callback_add.
+    - trie:     the mqttClient TopicTrie.
+
+Usage: python benchmarks/bench_topicDispatch.py [UNIT_COUNT ...]
+"""
+import os
+import sys
+import timeit
+
+import paho.mqtt.client as mqtt
+from paho.mqtt.matcher import MQTTMatcher
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '..', 'src'))
+
+from pkgs.messages import UnitCxnStateMsg, UnitWhldCmdMsg, \
+    UnitWhldStateMsg                                        # noqa: E402
+from pkgs.mqttClient import TopicTrie                       # noqa: E402
+
+DEFAULT_UNIT_COUNTS = (10, 100, 1000)
+WILDCARD_FILTERS = (UnitCxnStateMsg.TOPIC_FILTER, 'units/#')
+
+
+def _callback(client, usrData, msg):
+    """
+    The registered callback.
+    """
+    pass
+
+
+def buildFilters(unitCount: int) -> list:
+    """
+    Build the per-unit filters registered by a commander, plus a few
+    wildcard filters.
+
+    Params:
+        unitCount:  The number of units.
+
+    Return:
+        The topic filters.
+    """
+    filters = list(WILDCARD_FILTERS)
+    for index in range(unitCount):
+        unit = f"unit{index}"
+        filters.append(UnitWhldCmdMsg(unit).getTopic())
+        filters.append(UnitWhldStateMsg(unit).getTopic())
+        filters.append(UnitCxnStateMsg(unit).getTopic())
+    return filters
+
+
+def buildMatchers(filters: list) -> dict:
+    """
+    Build the matching functions of each approach.
+
+    Params:
+        filters:    The topic filters.
+
+    Return:
+        The matching functions by approach name.
+    """
+    matcher = MQTTMatcher()
+    trie = TopicTrie()
+    for topicFilter in filters:
+        matcher[topicFilter] = _callback
+        trie.add(topicFilter, _callback)
+    return {
+        'linear': lambda topic: [_callback for f in filters
+                                 if mqtt.topic_matches_sub(f, topic)],
+        'paho': lambda topic: list(matcher.iter_match(topic)),
+        'trie': trie.match,
+    }
+
+
+def run(unitCounts: tuple = DEFAULT_UNIT_COUNTS) -> list:
+    """
+    Run the benchmark, the number of timed matches being adjusted so
+    a run takes at least 0.2 second.
+
+    Params:
+        unitCounts: The numbers of units to benchmark.
+                    Default: 10, 100 and 1000.
+
+    Return:
+        The results, a dictionary per unit count and approach with the
+        mean match time in microseconds.
+    """
+    results = []
+    for unitCount in unitCounts:
+        filters = buildFilters(unitCount)
+        topic = UnitWhldStateMsg(f"unit{unitCount // 2}").getTopic()
+        for name, match in buildMatchers(filters).items():
+            timer = timeit.Timer(lambda: match(topic))
+            number = timer.autorange()[0]
+            best = min(timer.repeat(repeat=3, number=number))
+            results.append({'units': unitCount, 'filters': len(filters),
+                            'approach': name,
+                            'us per match': best / number * 1e6})
+    return results
+
+
+if __name__ == '__main__':
+    unitCounts = tuple(int(arg) for arg in sys.argv[1:]) or \
+        DEFAULT_UNIT_COUNTS
+    print(f"{'units':>6} {'filters':>8} {'approach':>8} {'us/match':>10}")
+    for result in run(unitCounts):
+        print(f"{result['units']:>6} {result['filters']:>8} "
+              f"{result['approach']:>8} {result['us per match']:>10.2f}")
@@ -0,0 +1,87 @@
+"""
+Benchmark suite: run the codec, client path and topic dispatch
+benchmarks and write their results as a JSON document, with the run
+metadata (time, git commit, Python version and platform), so runs can
+be compared over time.
+
+Usage: python benchmarks/run.py [--output FILE] [--units N [N ...]]
+                                [--only NAME [NAME ...]]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import bench_client                                         # noqa: E402
+import bench_codecs                                         # noqa: E402
+import bench_topicDispatch                                  # noqa: E402
+
+BENCHMARKS = ('codecs', 'client', 'topicDispatch')
+
+
+def _gitCommit() -> str:
+    """
+    Get the commit of the benchmarked tree.
+
+    Return:
+        The commit hash, None if unknown.
+    """
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+            cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(benchmarks: tuple = BENCHMARKS,
+        unitCounts: tuple = bench_client.DEFAULT_UNIT_COUNTS) -> dict:
+    """
+    Run the benchmarks.
+
+    Params:
+        benchmarks: The names of the benchmarks to run.
+                    Default: all of them.
+        unitCounts: The numbers of units of the dispatch benchmarks.
+                    Default: 10, 100 and 1000.
+
+    Return:
+        The report: the run metadata and the results by benchmark.
+    """
+    runners = {
+        'codecs': bench_codecs.run,
+        'client': lambda: bench_client.run(unitCounts),
+        'topicDispatch': lambda: bench_topicDispatch.run(unitCounts),
+    }
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return {
+        'timestamp': now.isoformat(timespec='seconds'),
+        'commit': _gitCommit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': {name: runners[name]() for name in benchmarks},
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the benchmarks.')
+    parser.add_argument('--output', help='the JSON report file, '
+                        'default: standard output')
+    parser.add_argument('--units', type=int, nargs='+',
+                        default=bench_client.DEFAULT_UNIT_COUNTS,
+                        help='the unit counts of the dispatch benchmarks')
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS,
+                        default=BENCHMARKS, help='the benchmarks to run')
+    args = parser.parse_args()
+    report = run(tuple(args.only), tuple(args.units))
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as reportFile:
+            json.dump(report, reportFile, indent=2)
@@ -1,4 +1,8 @@
 from .baseMsg import BaseMessage                    # noqa: F401
 from .unitCxnStateMsg import UnitCxnStateMsg        # noqa: F401
+from .whldMsg import WhldMsg                        # noqa: F401
 from .unitWhldCmdMsg import UnitWhldCmdMsg          # noqa: F401
 from .unitWhldStateMsg import UnitWhldStateMsg      # noqa: F401
+from .exceptions import BinaryFormatNotSupported, UnsupportedMsgVersion, \
+    UnknownSerializerBackend, UnitMismatch          # noqa: F401
+from .msgPool import MsgPool                        # noqa: F401
@@ -1,13 +1,32 @@
 import json
+import time
+
+from . import serializer
+from .exceptions import BinaryFormatNotSupported, UnitMismatch
 
 
 class BaseMessage:
     """
     The RC mission base message class.
+    The encoded message is cached, in a slot per wire format, until a
+    setter changes its content.
+    A lazily decoded message keeps its raw payload and only parses it
+    when its payload or, if not known from the topic, its unit is needed.
+    The unit known from the topic is kept, a received payload of another
+    unit raising a UnitMismatch exception when parsed.
+    A message can optionally be stamped with a sequence number and its
+    send time so receivers can drop out of order or late messages.
     TODO: exceptions for QoS out of range?
     """
     UNIT_ID_KEY = 'unit id'
     PAYLOAD_KEY = 'payload'
+    SEQ_KEY = 'seq'
+    SENT_AT_KEY = 'sent at'
+    JSON_FORMAT = 'json'
+    BINARY_FORMAT = 'binary'
+    WIRE_FORMAT = JSON_FORMAT
+    __slots__ = ('_unit', '_payload', '_qos', '_topic', '_retain', '_json',
+                 '_jsonBytes', '_binary', '_raw', '_seq', '_sentAt')
 
     def __init__(self, topic: str, unit: str, payload: dict = None,
                  qos: int = 0, retain: bool = False) -> None:
@@ -22,11 +41,120 @@ class BaseMessage:
             qos:        The message quality of service. Default: 0.
             retain:     The retention flag. Default: False
         """
+        self._json = None
+        self._jsonBytes = None
+        self._binary = None
+        self._raw = None
+        self._seq = None
+        self._sentAt = None
         self._unit = unit
-        self._payload = payload
+        self._payload = None
         self._qos = qos
         self._topic = topic
         self._retain = retain
+        self.setPayload(payload)
+
+    def _markDirty(self) -> None:
+        """
+        Invalidate the cached encodings of the message.
+        """
+        self._json = None
+        self._jsonBytes = None
+        self._binary = None
+
+    def clearCache(self) -> None:
+        """
+        Drop the cached encodings, so the next encoding is computed
+        again, like when timing the encoders.
+        """
+        self._markDirty()
+
+    def _parse(self) -> None:
+        """
+        Parse the raw payload kept by a lazy decoding.
+        """
+        raw = self._raw
+        self._raw = None
+        self._fromReceived(raw)
+
+    def _fromReceived(self, payload) -> None:
+        """
+        Set the message from a received payload, checking its unit
+        against the known unit.
+
+        Params:
+            payload:    The received payload.
+        """
+        unit = self._unit
+        self.fromWire(payload)
+        if unit is not None and self._unit != unit:
+            msgUnit, self._unit = self._unit, unit
+            raise UnitMismatch(unit, msgUnit)
+
+    def _buildTopic(self, unit: str) -> str:
+        """
+        Build the message topic for a unit.
+
+        Params:
+            unit:       The unit ID.
+
+        Return:
+            The message topic.
+        """
+        return self._topic
+
+    def reset(self, unit: str = None) -> None:
+        """
+        Reset the message so it can be reused, clearing its payload.
+
+        Params:
+            unit:       The new unit ID. Default: None, keep the current unit.
+        """
+        if unit is not None and unit != self._unit:
+            self._unit = unit
+            self._topic = self._buildTopic(unit)
+        self._raw = None
+        self._seq = None
+        self._sentAt = None
+        self.setPayload(None)
+        self._markDirty()
+
+    @classmethod
+    def _fromTopic(cls, topic: str) -> object:
+        """
+        Create an empty message for a received topic.
+
+        Params:
+            topic:      The message topic.
+
+        Return:
+            The empty message.
+        """
+        return cls(topic, None)
+
+    @classmethod
+    def decode(cls, buf, topic: str, lazy: bool = False) -> object:
+        """
+        Create a message from a received payload, without copying
+        the buffer when it is a bytes or memoryview. The payload unit
+        must match the unit of the topic, if known from it.
+
+        Params:
+            buf:        The received payload (str, bytes, bytearray
+                        or memoryview).
+            topic:      The topic on which the payload was received.
+            lazy:       The lazy parsing flag, the payload being parsed
+                        on first use. Default: False.
+
+        Return:
+            The decoded message.
+        """
+        msg = cls._fromTopic(topic)
+        if lazy:
+            msg.fromWire(buf, lazy=True)
+        else:
+            msg._fromReceived(buf)
+        return msg
 
     def getTopic(self) -> str:
         """
@@ -44,26 +172,86 @@ class BaseMessage:
         Return:
             The message unit ID.
         """
+        if self._unit is None and self._raw is not None:
+            self._parse()
         return self._unit
 
     def setPayload(self, payload: dict) -> None:
         """
-        Set the payload of the message.
+        Set the payload of the message, invalidating the cached
+        encodings when it changes or when the current dictionary itself
+        is given again.
 
         Params:
             payload:    Dictionary representing the new message json payload.
         """
-        self._payload = payload
+        if self._raw is not None:
+            self._parse()
+        if payload is self._payload or payload != self._payload:
+            self._payload = payload
+            self._markDirty()
 
     def getPayload(self) -> dict:
         """
-        Get the payload of the message.
+        Get the payload of the message. The returned dictionary is the
+        message one, not a copy, so it must not be modified in place: the
+        cached encodings would not see the change. Set a modified copy
+        with setPayload instead.
 
         Return:
             Dictionary representing the message json payload.
         """
+        if self._raw is not None:
+            self._parse()
         return self._payload
 
+    def _getWirePayload(self) -> dict:
+        """
+        Get the payload as sent in the json encodings.
+
+        Return:
+            Dictionary representing the message json payload.
+        """
+        return self.getPayload()
+
+    def stamp(self, seq: int, sentAt: float = None) -> None:
+        """
+        Stamp the message with a sequence number and its send time.
+
+        Params:
+            seq:        The sequence number.
+            sentAt:     The send time, in seconds since the epoch.
+                        Default: None, the current time.
+        """
+        if self._raw is not None:
+            self._parse()
+        self._seq = seq
+        self._sentAt = time.time() if sentAt is None else sentAt
+        self._markDirty()
+
+    def getSeq(self) -> int:
+        """
+        Get the message sequence number.
+
+        Return:
+            The sequence number, None if the message is not stamped.
+        """
+        if self._raw is not None:
+            self._parse()
+        return self._seq
+
+    def getSentAt(self) -> float:
+        """
+        Get the message send time.
+
+        Return:
+            The send time, in seconds since the epoch, None if the message
+            is not stamped.
+        """
+        if self._raw is not None:
+            self._parse()
+        return self._sentAt
+
     def setQos(self, qos: int) -> None:
         """
         Set the message quality of service.
@@ -100,6 +288,36 @@ class BaseMessage:
         """
         return self._retain
 
+    def _fromDict(self, msg: dict) -> None:
+        """
+        Set the message from its dictionary representation.
+
+        Params:
+            msg:        The dictionary containing the message.
+        """
+        self._unit = msg[self.UNIT_ID_KEY]
+        self.setPayload(msg[self.PAYLOAD_KEY])
+        self._seq = msg.get(self.SEQ_KEY)
+        self._sentAt = msg.get(self.SENT_AT_KEY)
+        self._markDirty()
+
+    def _toDict(self) -> dict:
+        """
+        Get the message dictionary representation, the stamp being only
+        included when set.
+
+        Return:
+            The dictionary representing the message.
+        """
+        payload = self._getWirePayload()
+        msg = {}
+        msg[self.UNIT_ID_KEY] = self._unit
+        msg[self.PAYLOAD_KEY] = payload
+        if self._seq is not None:
+            msg[self.SEQ_KEY] = self._seq
+            msg[self.SENT_AT_KEY] = self._sentAt
+        return msg
+
     def fromJson(self, msgJson: str) -> None:
         """
         Set the message from its json string representation.
@@ -107,9 +325,7 @@ class BaseMessage:
         Params:
             msgJson:    The json string containing the message.
         """
-        msg = json.loads(msgJson)
-        self._unit = msg[self.UNIT_ID_KEY]
-        self._payload = msg[self.PAYLOAD_KEY]
+        self._fromDict(json.loads(msgJson))
 
     def toJson(self) -> str:
         """
@@ -118,7 +334,89 @@ class BaseMessage:
         Return:
             The message as a json string.
         """
-        msg = {}
-        msg[self.UNIT_ID_KEY] = self._unit
-        msg[self.PAYLOAD_KEY] = self._payload
-        return json.dumps(msg)
+        if self._json is None:
+            self._json = json.dumps(self._toDict())
+        return self._json
+
+    def fromBytes(self, msgBytes) -> None:
+        """
+        Set the message from its json bytes representation.
+
+        Params:
+            msgBytes:   The json bytes (bytes, bytearray or memoryview)
+                        containing the message.
+        """
+        self._fromDict(serializer.loads(msgBytes))
+
+    def toBytes(self) -> bytes:
+        """
+        Get the message as json bytes, using the fastest available
+        json backend.
+
+        Return:
+            The message as json bytes.
+        """
+        if self._jsonBytes is None:
+            self._jsonBytes = serializer.dumps(self._toDict())
+        return self._jsonBytes
+
+    def toBinary(self) -> bytes:
+        """
+        Get the message in its binary format.
+
+        Return:
+            The packed message.
+        """
+        raise BinaryFormatNotSupported(type(self).__name__)
+
+    def fromBinary(self, buf) -> None:
+        """
+        Set the message from its binary format.
+
+        Params:
+            buf:        The buffer containing the packed message.
+        """
+        raise BinaryFormatNotSupported(type(self).__name__)
+
+    def toWire(self):
+        """
+        Get the message in the wire format selected by the message class.
+
+        Return:
+            The binary message if the class wire format is binary,
+            the json bytes otherwise.
+        """
+        if self.WIRE_FORMAT == self.BINARY_FORMAT:
+            if self._binary is None:
+                self._binary = self.toBinary()
+            return self._binary
+        return self.toBytes()
+
+    def fromWire(self, payload, lazy: bool = False) -> None:
+        """
+        Set the message from a received payload. The format is detected
+        from the payload itself, json documents always starting with '{'.
+        An empty payload, clearing a retained message, gives a message
+        without payload.
+
+        Params:
+            payload:    The received payload.
+            lazy:       The lazy parsing flag. When set, the payload is
+                        kept as is and parsed on first use, so it must not
+                        be modified in between, its unit having to match
+                        the message unit. Default: False.
+        """
+        if lazy:
+            self._raw = payload
+            self._markDirty()
+        elif len(payload) == 0:
+            self._seq = None
+            self._sentAt = None
+            self.setPayload(None)
+            self._markDirty()
+        elif isinstance(payload, str):
+            self.fromJson(payload)
+        elif payload[:1] == b'{':
+            self.fromBytes(payload)
+        else:
+            self.fromBinary(payload)
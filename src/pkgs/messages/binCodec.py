@@ -0,0 +1,151 @@
+import math
+import struct
+
+from .exceptions import UnsupportedMsgVersion
+
+VERSION = 1
+FLAG_QUANTIZED = 0x01
+FLAG_STAMPED = 0x02
+QUANT_SCALE = 32767
+QUANT_UNSET = -32768
+HEADER = struct.Struct('<BBB')
+WHLD_BODY = struct.Struct('<dd')
+WHLD_QUANT_BODY = struct.Struct('<hh')
+STAMP = struct.Struct('<Qd')
+
+
+def quantize(modifier: float) -> int:
+    """
+    Quantize a modifier to a signed 16 bits fixed point value scaled to
+    [-1, 1]. The modifier is clamped to [-1, 1] and the resolution is
+    1 / QUANT_SCALE (about 3e-5), the error being at most half of it.
+
+    Params:
+        modifier:   The modifier.
+
+    Return:
+        The quantized modifier.
+    """
+    value = round(modifier * QUANT_SCALE)
+    return max(-QUANT_SCALE, min(QUANT_SCALE, value))
+
+
+def dequantize(value: int, scale: int = QUANT_SCALE) -> float:
+    """
+    Get the modifier of a quantized value.
+
+    Params:
+        value:      The quantized modifier.
+        scale:      The quantization scale. Default: QUANT_SCALE.
+
+    Return:
+        The modifier.
+    """
+    return value / scale
+
+
+def _packModifier(modifier: float, quantized: bool):
+    """
+    Get the packed value of a modifier, an unset modifier being packed
+    as NaN, or as QUANT_UNSET when quantized.
+
+    Params:
+        modifier:   The modifier, None if unset.
+        quantized:  The quantized modifier flag.
+
+    Return:
+        The value to pack.
+    """
+    if modifier is None:
+        return QUANT_UNSET if quantized else math.nan
+    return quantize(modifier) if quantized else modifier
+
+
+def _unpackModifier(value, quantized: bool) -> float:
+    """
+    Get the modifier of a packed value.
+
+    Params:
+        value:      The packed value.
+        quantized:  The quantized modifier flag.
+
+    Return:
+        The modifier, None if unset.
+    """
+    if quantized:
+        return None if value == QUANT_UNSET else dequantize(value)
+    return None if math.isnan(value) else value
+
+
+def packWhld(unit: str, steering: float, throttle: float,
+             quantized: bool = False, seq: int = None,
+             sentAt: float = None) -> bytes:
+    """
+    Pack a wheeled message in its binary format.
+
+    The layout is a header (version, flags, unit ID length) followed by
+    the UTF-8 unit ID and the steering and throttle modifiers as
+    little-endian doubles, or as quantized little-endian int16 when the
+    FLAG_QUANTIZED flag is set. An unset modifier is packed as NaN, or
+    as QUANT_UNSET when quantized. When the FLAG_STAMPED flag is set,
+    the sequence number (uint64) and send time (double) follow.
+
+    Params:
+        unit:       The unit ID.
+        steering:   The steering modifier, None if unset.
+        throttle:   The throttle modifier, None if unset.
+        quantized:  The quantized modifiers flag. Default: False.
+        seq:        The sequence number. Default: None, not stamped.
+        sentAt:     The send time, in seconds since the epoch.
+                    Default: None.
+
+    Return:
+        The packed message.
+    """
+    unitBytes = unit.encode()
+    flags = 0
+    steering = _packModifier(steering, quantized)
+    throttle = _packModifier(throttle, quantized)
+    if quantized:
+        flags |= FLAG_QUANTIZED
+        body = WHLD_QUANT_BODY.pack(steering, throttle)
+    else:
+        body = WHLD_BODY.pack(steering, throttle)
+    if seq is not None:
+        flags |= FLAG_STAMPED
+        body += STAMP.pack(seq, sentAt)
+    return HEADER.pack(VERSION, flags, len(unitBytes)) + unitBytes + body
+
+
+def unpackWhld(buf) -> tuple:
+    """
+    Unpack a wheeled message from its binary format.
+
+    Params:
+        buf:        The buffer (bytes, bytearray or memoryview)
+                    containing the packed message.
+
+    Return:
+        The unit ID, the steering modifier, the throttle modifier, the
+        sequence number and the send time, an unset modifier being None
+        and the last two being None if the message is not stamped.
+    """
+    version, flags, unitLen = HEADER.unpack_from(buf)
+    if version != VERSION:
+        raise UnsupportedMsgVersion(version)
+    offset = HEADER.size
+    unit = str(buf[offset:offset + unitLen], 'utf-8')
+    offset += unitLen
+    quantized = bool(flags & FLAG_QUANTIZED)
+    if quantized:
+        steering, throttle = WHLD_QUANT_BODY.unpack_from(buf, offset)
+        offset += WHLD_QUANT_BODY.size
+    else:
+        steering, throttle = WHLD_BODY.unpack_from(buf, offset)
+        offset += WHLD_BODY.size
+    steering = _unpackModifier(steering, quantized)
+    throttle = _unpackModifier(throttle, quantized)
+    seq = sentAt = None
+    if flags & FLAG_STAMPED:
+        seq, sentAt = STAMP.unpack_from(buf, offset)
+    return unit, steering, throttle, seq, sentAt
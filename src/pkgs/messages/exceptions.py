@@ -0,0 +1,31 @@
+class BinaryFormatNotSupported(Exception):
+    """
+    The binary format not supported exception.
+    """
+    def __init__(self, msgClass: str) -> None:
+        super().__init__(f"{msgClass} has no binary format.")
+
+
+class UnsupportedMsgVersion(Exception):
+    """
+    The unsupported binary message version exception.
+    """
+    def __init__(self, version: int) -> None:
+        super().__init__(f"unsupported binary message version: {version}.")
+
+
+class UnknownSerializerBackend(Exception):
+    """
+    The unknown or unavailable json backend exception.
+    """
+    def __init__(self, name: str) -> None:
+        super().__init__(f"json backend {name} is not available.")
+
+
+class UnitMismatch(Exception):
+    """
+    The received message unit not matching its topic unit exception.
+    """
+    def __init__(self, topicUnit: str, msgUnit: str) -> None:
+        super().__init__(f"message unit {msgUnit} does not match the topic "
+                         f"unit {topicUnit}.")
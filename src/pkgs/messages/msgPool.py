@@ -0,0 +1,58 @@
+from collections import deque
+
+
+class MsgPool:
+    """
+    A pool of reusable messages for high rate publishing loops.
+    The pooled message class constructor must take the unit ID as its
+    first parameter (UnitWhldCmdMsg, UnitWhldStateMsg, UnitCxnStateMsg).
+    A message must only be released once it has been published.
+    """
+    def __init__(self, msgClass: type, size: int = 16) -> None:
+        """
+        Constructor.
+
+        Params:
+            msgClass:   The class of the pooled messages.
+            size:       The maximum number of free messages kept.
+                        Default: 16.
+        """
+        self._msgClass = msgClass
+        self._size = size
+        self._free = deque()
+
+    def acquire(self, unit: str) -> object:
+        """
+        Get a message for a unit, reusing a free one when available.
+
+        Params:
+            unit:       The unit ID.
+
+        Return:
+            The message with an empty payload.
+        """
+        try:
+            msg = self._free.pop()
+        except IndexError:
+            return self._msgClass(unit)
+        msg.reset(unit)
+        return msg
+
+    def release(self, msg: object) -> None:
+        """
+        Give a message back to the pool.
+
+        Params:
+            msg:        The message to release.
+        """
+        if len(self._free) < self._size:
+            self._free.append(msg)
+
+    def getFreeCount(self) -> int:
+        """
+        Get the number of free messages in the pool.
+
+        Return:
+            The number of free messages.
+        """
+        return len(self._free)
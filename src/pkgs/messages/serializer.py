@@ -0,0 +1,84 @@
+import json
+
+from .exceptions import UnknownSerializerBackend
+
+try:
+    import orjson
+except ImportError:     # pragma: no cover
+    orjson = None
+
+STDLIB_BACKEND = 'json'
+ORJSON_BACKEND = 'orjson'
+
+
+def _stdlibDumps(obj: object) -> bytes:
+    """
+    Serialize an object to json bytes with the standard library.
+
+    Params:
+        obj:        The object to serialize.
+
+    Return:
+        The json bytes.
+    """
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+def _stdlibLoads(data) -> object:
+    """
+    Deserialize json with the standard library.
+
+    Params:
+        data:       The json as str, bytes, bytearray or memoryview.
+
+    Return:
+        The deserialized object.
+    """
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+_backends = {STDLIB_BACKEND: (_stdlibDumps, _stdlibLoads)}
+if orjson is not None:
+    _backends[ORJSON_BACKEND] = (orjson.dumps, orjson.loads)
+
+_backend = ORJSON_BACKEND if orjson is not None else STDLIB_BACKEND
+dumps, loads = _backends[_backend]
+
+
+def getBackend() -> str:
+    """
+    Get the active json backend.
+
+    Return:
+        The active backend name.
+    """
+    return _backend
+
+
+def getAvailableBackends() -> tuple:
+    """
+    Get the json backends that can be used.
+
+    Return:
+        The available backend names.
+    """
+    return tuple(_backends)
+
+
+def setBackend(name: str) -> None:
+    """
+    Select the json backend. The fastest available backend is selected
+    by default.
+
+    Params:
+        name:       The backend name.
+    """
+    global _backend
+    global dumps
+    global loads
+    if name not in _backends:
+        raise UnknownSerializerBackend(name)
+    _backend = name
+    dumps, loads = _backends[name]
@@ -9,8 +9,10 @@ class UnitCxnStateMsg(BaseMessage):
     ONLINE_STATE = 'online'
     OFFLINE_STATE = 'offline'
     TOPIC_ROOT = 'units/connectionState'
+    TOPIC_FILTER = f"{TOPIC_ROOT}/+"
     QOS = 1
     RETAIN = True
+    __slots__ = ()
 
     def __init__(self, unit: str, payload: dict = None) -> None:
         """
@@ -21,9 +23,47 @@ class UnitCxnStateMsg(BaseMessage):
             payload:    Dictionary representing the message payload.
                         Default: None.
         """
-        super().__init__(f"{self.TOPIC_ROOT}/{unit}", unit,
+        super().__init__(self._buildTopic(unit), unit,
                          payload=payload, qos=self.QOS, retain=self.RETAIN)
 
+    def _buildTopic(self, unit: str) -> str:
+        """
+        Build the message topic for a unit.
+
+        Params:
+            unit:       The unit ID.
+
+        Return:
+            The message topic.
+        """
+        return f"{self.TOPIC_ROOT}/{unit}"
+
+    @classmethod
+    def getUnitFromTopic(cls, topic: str) -> str:
+        """
+        Get the unit ID from a message topic.
+
+        Params:
+            topic:      The message topic.
+
+        Return:
+            The unit ID.
+        """
+        return topic[len(cls.TOPIC_ROOT) + 1:]
+
+    @classmethod
+    def _fromTopic(cls, topic: str) -> object:
+        """
+        Create an empty message for a received topic.
+
+        Params:
+            topic:      The message topic.
+
+        Return:
+            The empty message.
+        """
+        return cls(cls.getUnitFromTopic(topic))
+
     def setAsOffline(self) -> None:
         """
         Change the state to offline.
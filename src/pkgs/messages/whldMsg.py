@@ -0,0 +1,204 @@
+from . import binCodec
+from .baseMsg import BaseMessage
+
+
+class WhldMsg(BaseMessage):
+    """
+    The wheeled unit message base class, shared by the command and state
+    messages which only differ by their topic, named by TOPIC_SUFFIX.
+    The modifiers are kept as plain attributes rather than a payload
+    dictionary to keep the messages small in high rate loops.
+    When QUANTIZED is set, the modifiers are snapped to signed 16 bits
+    fixed point values scaled to [-1, 1] (resolution of about 3e-5,
+    clamped to [-1, 1]) and sent as such in the json and binary formats.
+    """
+    TOPIC_ROOT = 'units/wheeled'
+    TOPIC_SUFFIX = None
+    STEERING_KEY = 'steering'
+    THROTTLE_KEY = 'throttle'
+    SCALE_KEY = 'scale'
+    QUANTIZED = False
+    __slots__ = ('_steering', '_throttle')
+
+    def __init__(self, unit: str, payload: dict = None) -> None:
+        """
+        Constructor.
+
+        Params:
+            unit:       The unit ID.
+            payload:    The message payload. Default: None.
+        """
+        self._steering = None
+        self._throttle = None
+        super().__init__(self._buildTopic(unit), unit, payload=payload)
+
+    @classmethod
+    def getUnitFromTopic(cls, topic: str) -> str:
+        """
+        Get the unit ID from a message topic.
+
+        Params:
+            topic:      The message topic.
+
+        Return:
+            The unit ID.
+        """
+        return topic[len(cls.TOPIC_ROOT) + 1:topic.rindex('/')]
+
+    @classmethod
+    def _fromTopic(cls, topic: str) -> object:
+        """
+        Create an empty message for a received topic.
+
+        Params:
+            topic:      The message topic.
+
+        Return:
+            The empty message.
+        """
+        return cls(cls.getUnitFromTopic(topic))
+
+    def _buildTopic(self, unit: str) -> str:
+        """
+        Build the message topic for a unit.
+
+        Params:
+            unit:       The unit ID.
+
+        Return:
+            The message topic.
+        """
+        return f"{self.TOPIC_ROOT}/{unit}/{self.TOPIC_SUFFIX}"
+
+    def setPayload(self, payload: dict) -> None:
+        """
+        Set the modifiers from a payload dictionary, quantized or not.
+
+        Params:
+            payload:    Dictionary representing the message json payload.
+        """
+        if payload is None:
+            payload = {}
+        steering = payload.get(self.STEERING_KEY)
+        throttle = payload.get(self.THROTTLE_KEY)
+        scale = payload.get(self.SCALE_KEY)
+        if scale is not None:
+            if steering is not None:
+                steering = binCodec.dequantize(steering, scale)
+            if throttle is not None:
+                throttle = binCodec.dequantize(throttle, scale)
+        self.setSteering(steering)
+        self.setThrottle(throttle)
+
+    def getPayload(self) -> dict:
+        """
+        Get the modifiers as a payload dictionary.
+
+        Return:
+            Dictionary representing the message json payload, None if
+            no modifier is set.
+        """
+        if self._raw is not None:
+            self._parse()
+        payload = {}
+        if self._steering is not None:
+            payload[self.STEERING_KEY] = self._steering
+        if self._throttle is not None:
+            payload[self.THROTTLE_KEY] = self._throttle
+        return payload if payload else None
+
+    def _getWirePayload(self) -> dict:
+        """
+        Get the payload as sent in the json encodings, with the quantized
+        modifiers and their scale when QUANTIZED is set.
+
+        Return:
+            Dictionary representing the message json payload.
+        """
+        if not self.QUANTIZED:
+            return self.getPayload()
+        if self._raw is not None:
+            self._parse()
+        payload = {}
+        if self._steering is not None:
+            payload[self.STEERING_KEY] = binCodec.quantize(self._steering)
+        if self._throttle is not None:
+            payload[self.THROTTLE_KEY] = binCodec.quantize(self._throttle)
+        payload[self.SCALE_KEY] = binCodec.QUANT_SCALE
+        return payload
+
+    def setSteering(self, modifier: float) -> None:
+        """
+        Set the steering modifier.
+
+        Params:
+            modifier:   The new modifier.
+        """
+        if self._raw is not None:
+            self._parse()
+        if self.QUANTIZED and modifier is not None:
+            modifier = binCodec.dequantize(binCodec.quantize(modifier))
+        if modifier != self._steering:
+            self._steering = modifier
+            self._markDirty()
+
+    def getSteering(self) -> float:
+        """
+        Get the steering mofifier.
+
+        Return:
+            The steering mofifier.
+        """
+        if self._raw is not None:
+            self._parse()
+        return self._steering
+
+    def setThrottle(self, modifier: float) -> None:
+        """
+        Set the throttle modifier.
+
+        Params:
+            modifier:   The new modifier.
+        """
+        if self._raw is not None:
+            self._parse()
+        if self.QUANTIZED and modifier is not None:
+            modifier = binCodec.dequantize(binCodec.quantize(modifier))
+        if modifier != self._throttle:
+            self._throttle = modifier
+            self._markDirty()
+
+    def getThrottle(self) -> float:
+        """
+        Get the throttle modifier.
+
+        Return:
+            The throttle modifier.
+        """
+        if self._raw is not None:
+            self._parse()
+        return self._throttle
+
+    def toBinary(self) -> bytes:
+        """
+        Get the message in its binary format.
+
+        Return:
+            The packed message.
+        """
+        if self._raw is not None:
+            self._parse()
+        return binCodec.packWhld(self._unit, self._steering, self._throttle,
+                                 quantized=self.QUANTIZED, seq=self._seq,
+                                 sentAt=self._sentAt)
+
+    def fromBinary(self, buf) -> None:
+        """
+        Set the message from its binary format.
+
+        Params:
+            buf:        The buffer containing the packed message.
+        """
+        self._unit, self._steering, self._throttle, self._seq, \
+            self._sentAt = binCodec.unpackWhld(buf)
+        self._markDirty()
@@ -1,3 +1,22 @@
-from .client import init, connect, disconnect, startLoop, stopLoop, publish, \
-    subscribe, unscubscribe, registerMsgCallback, unregisterMsgCallback     # noqa: F401 E501
-from .exceptions import MqttClientNotInit                                   # noqa: F401 E501
+from .client import MqttClient, init, getDefaultClient, connect, disconnect, \
+    isConnected, getMetrics, startLoop, stopLoop, publish, publishRaw, \
+    subscribe, unscubscribe, registerMsgCallback, unregisterMsgCallback, registerMsgHandler, \
+    unregisterMsgHandler                                                    # noqa: F401 E501
+from .msgRegistry import MsgRegistry                                        # noqa: F401 E501
+from .topicTrie import TopicTrie                                            # noqa: F401 E501
+from .asyncClient import AsyncMqttClient                                    # noqa: F401 E501
+from .exceptions import MqttClientNotInit, MqttPublishFailed, \
+    PublishQueueFull, UnknownQueuePolicy, InvalidTrafficLog, \
+    InvalidReplaySpeed                                                      # noqa: F401 E501
+from .statePublisher import WhldStatePublisher                              # noqa: F401 E501
+from .cmdSender import WhldCmdSender                                        # noqa: F401 E501
+from .publishQueue import PublishQueue                                      # noqa: F401 E501
+from .dispatcher import WorkerDispatcher, ReceivedMsg                        # noqa: F401 E501
+from .subAck import SubAck                                                  # noqa: F401 E501
+from .backoff import Backoff                                                # noqa: F401 E501
+from .diskBuffer import DiskBuffer                                          # noqa: F401 E501
+from .metrics import ClientMetrics, LatencyHistogram                        # noqa: F401 E501
+from .fleetRegistry import FleetRegistry                                    # noqa: F401 E501
+from .loopback import LoopbackBroker, LoopbackClient                        # noqa: F401 E501
+from .sequencing import SeqStamper, StaleFilter                             # noqa: F401 E501
+from .traffic import TrafficRecorder, TrafficReplayer                       # noqa: F401 E501
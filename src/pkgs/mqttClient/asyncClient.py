@@ -0,0 +1,456 @@
+import asyncio
+import paho.mqtt.client as mqtt
+
+from .backoff import Backoff
+from .client import MqttClient
+from .diskBuffer import DiskBuffer
+from .dispatcher import WorkerDispatcher
+from .exceptions import MqttPublishFailed
+from .subAck import SubAck
+from ..messages import BaseMessage
+
+
+class AsyncMqttClient(MqttClient):
+    """
+    The asyncio MQTT client. The paho socket is driven by the running
+    event loop through its reader and writer callbacks instead of a
+    network thread, the publications can be awaited until acknowledged
+    and the received messages are decoded into an async iterator.
+    The blocking paho connections run in the loop executor.
+    With a backoff, lost connections are retried by an event loop task.
+    With a disk buffer, the stored messages are forwarded by an event
+    loop task.
+    The awaitable methods are suffixed with Async, the inherited
+    publish, subscribe and unsubscribe keeping the MqttClient behavior
+    so the client can be given to the components using an MqttClient.
+    Every method must be called from the event loop thread.
+    """
+    MISC_PERIOD = 1.0
+
+    def __init__(self, appLogger: object, clientId: str, password: str,
+                 queueSize: int = 256, dispatcher: WorkerDispatcher = None,
+                 cleanSession: bool = True, backoff: Backoff = None,
+                 diskBuffer: DiskBuffer = None) -> None:
+        """
+        Constructor.
+
+        Params:
+            appLogger:      The app logger.
+            clientId:       The client ID.
+            password:       The password.
+            queueSize:      The maximum number of received messages
+                            waiting to be iterated, the oldest being
+                            dropped when full. Default: 256.
+            dispatcher:     The worker dispatcher running the message
+                            callbacks. Default: None, run them on the
+                            event loop.
+            cleanSession:   The clean session flag. Default: True.
+            backoff:        The reconnection backoff. Default: None,
+                            no reconnection.
+            diskBuffer:     The store and forward buffer of the messages
+                            published while disconnected. Default: None,
+                            left to paho in memory.
+        """
+        super().__init__(appLogger, clientId, password,
+                         dispatcher=dispatcher, cleanSession=cleanSession,
+                         backoff=backoff, diskBuffer=diskBuffer)
+        self._loop = None
+        self._miscTask = None
+        self._reconnectTask = None
+        self._fwdTask = None
+        self._connected = None
+        self._pending = {}
+        self._queueSize = queueSize
+        self._msgQueue = None
+        self._dropped = 0
+        self._metrics.addGauge('msgQueue', self._getQueueDepth)
+        self._client.on_socket_open = self._onSocketOpen
+        self._client.on_socket_close = self._onSocketClose
+        self._client.on_socket_register_write = self._onSocketRegisterWrite
+        self._client.on_socket_unregister_write = \
+            self._onSocketUnregisterWrite
+
+    def _isLoopThread(self) -> bool:
+        """
+        Check if the caller runs on the event loop thread, the socket
+        callbacks being also called from the connection executor.
+
+        Return:
+            True if called from the event loop thread, False otherwise.
+        """
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def _onSocketOpen(self, client, usrData, sock) -> None:
+        """
+        The on socket open callback. Watch the socket for reading and
+        start the periodic paho housekeeping.
+
+        Params:
+            client:     The client instance.
+            usrData:    The user data set on the client instance.
+            sock:       The opened socket.
+        """
+        if not self._isLoopThread():
+            self._loop.call_soon_threadsafe(self._onSocketOpen, client,
+                                            usrData, sock)
+            return
+        self._logger.debug('socket opened')
+        self._loop.add_reader(sock, self._client.loop_read)
+        self._miscTask = self._loop.create_task(self._miscLoop())
+
+    def _onSocketClose(self, client, usrData, sock) -> None:
+        """
+        The on socket close callback. Stop watching the socket and the
+        periodic paho housekeeping.
+
+        Params:
+            client:     The client instance.
+            usrData:    The user data set on the client instance.
+            sock:       The closed socket.
+        """
+        if not self._isLoopThread():
+            self._loop.call_soon_threadsafe(self._onSocketClose, client,
+                                            usrData, sock)
+            return
+        self._logger.debug('socket closed')
+        self._loop.remove_reader(sock)
+        self._loop.remove_writer(sock)
+        if self._miscTask is not None:
+            self._miscTask.cancel()
+            self._miscTask = None
+
+    def _onSocketRegisterWrite(self, client, usrData, sock) -> None:
+        """
+        The on socket register write callback, paho having packets
+        to write.
+
+        Params:
+            client:     The client instance.
+            usrData:    The user data set on the client instance.
+            sock:       The socket.
+        """
+        if not self._isLoopThread():
+            self._loop.call_soon_threadsafe(self._onSocketRegisterWrite,
+                                            client, usrData, sock)
+            return
+        self._loop.add_writer(sock, self._client.loop_write)
+
+    def _onSocketUnregisterWrite(self, client, usrData, sock) -> None:
+        """
+        The on socket unregister write callback, paho having no more
+        packets to write.
+
+        Params:
+            client:     The client instance.
+            usrData:    The user data set on the client instance.
+            sock:       The socket.
+        """
+        if not self._isLoopThread():
+            self._loop.call_soon_threadsafe(self._onSocketUnregisterWrite,
+                                            client, usrData, sock)
+            return
+        self._loop.remove_writer(sock)
+
+    async def _miscLoop(self) -> None:
+        """
+        The paho housekeeping loop (keep alive and retries), ending
+        with the connection.
+        """
+        while self._client.loop_misc() == mqtt.MQTT_ERR_SUCCESS:
+            await asyncio.sleep(self.MISC_PERIOD)
+
+    def _onConnect(self, client, usrData, flags, rc) -> None:
+        """
+        The on connection callback, resolving the pending connection.
+
+        Params:
+            client:     The client instance.
+            usrData:    The user data set on the client instance.
+            flags:      The connection flags from the broker.
+            rc:         The connection result.
+        """
+        super()._onConnect(client, usrData, flags, rc)
+        if self._connected is not None and not self._connected.done():
+            self._connected.set_result(rc)
+
+    def _onDisconnect(self, client, usrData, rc) -> None:
+        """
+        The on disconnect callback, starting the reconnection task when
+        the connection is lost.
+
+        Params:
+            client:     The client instance.
+            usrData:    The user data set on the client instance.
+            rc:         The connection result.
+        """
+        super()._onDisconnect(client, usrData, rc)
+        if self._backoff is not None and not self._disconnecting and \
+                self._reconnectTask is None:
+            self._reconnectTask = self._loop.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        """
+        The reconnection task, retrying with the backoff delays until
+        reconnected or disconnected.
+        """
+        try:
+            while not self._disconnecting:
+                delay = self._backoff.next()
+                self._logger.info(f"reconnecting in {delay:.2f} s")
+                await asyncio.sleep(delay)
+                if self._disconnecting:
+                    return
+                try:
+                    await self._loop.run_in_executor(None,
+                                                     self._client.reconnect)
+                    return
+                except (OSError, ValueError) as e:
+                    self._logger.warn(f"reconnection failed: {e}")
+        finally:
+            self._reconnectTask = None
+
+    def _startForward(self) -> None:
+        """
+        Start forwarding the stored messages, on an event loop task.
+        """
+        if self._fwdTask is None:
+            self._logger.info(f"forwarding {self._diskBuffer.getDepth()} "
+                              f"stored messages")
+            self._fwdTask = self._loop.create_task(self._forward())
+
+    async def _forward(self) -> None:
+        """
+        The forwarding task, publishing the stored messages in order at
+        the disk buffer rate while connected.
+        """
+        try:
+            while self.isConnected() and \
+                    self._diskBuffer.drain(self._publishRaw, maxCount=1):
+                await asyncio.sleep(self._diskBuffer.getPeriod())
+        finally:
+            self._fwdTask = None
+
+    def _onPublish(self, client, usrData, mid) -> None:
+        """
+        The on publish callback, resolving the publication awaiting
+        the message id.
+
+        Params:
+            client:     The client instance.
+            usrData:    The user data set on the client instance.
+            mid:        The message id.
+        """
+        super()._onPublish(client, usrData, mid)
+        future = self._pending.pop(mid, None)
+        if future is not None and not future.done():
+            future.set_result(mid)
+
+    def _onMessage(self, client, usrData, msg) -> None:
+        """
+        The on message callback. Messages not caught by a topic callback
+        are decoded once, given to the handlers registered for their
+        class and queued for the message iterator.
+
+        Params:
+            client:     The client instance.
+            usrData:    The user data set on the client instance.
+            msg:        The received message.
+        """
+        self._metrics.onReceive(self._metricsKey(msg.topic))
+        self._callReceiveHooks(msg)
+        try:
+            if self._dispatchCallbacks(client, usrData, msg):
+                return
+            decoded = self._registry.decode(msg.topic, msg.payload)
+            if decoded is not None:
+                for handler in self._registry.getHandlers(type(decoded)):
+                    handler(decoded)
+        except Exception as e:
+            self._logger.error(f"unable to handle message on "
+                               f"{msg.topic}: {e}")
+            return
+        if decoded is None:
+            self._logger.warn(f"uncaught message: {msg}")
+            return
+        msgQueue = self._getMsgQueue()
+        if msgQueue.full():
+            oldest = msgQueue.get_nowait()
+            self._dropped += 1
+            self._metrics.onDrop(self._metricsKey(oldest.getTopic()))
+        msgQueue.put_nowait(decoded)
+
+    def _getMsgQueue(self) -> asyncio.Queue:
+        """
+        Get the received message queue, created on first use so it is
+        bound to the running event loop.
+
+        Return:
+            The received message queue.
+        """
+        if self._msgQueue is None:
+            self._msgQueue = asyncio.Queue(maxsize=self._queueSize)
+        return self._msgQueue
+
+    def _getQueueDepth(self) -> int:
+        """
+        Get the number of received messages waiting to be iterated.
+
+        Return:
+            The received message queue depth.
+        """
+        return 0 if self._msgQueue is None else self._msgQueue.qsize()
+
+    def connect(self, ip: str, port: int) -> None:
+        """
+        Connect to the broker, the socket being driven by the running
+        event loop. The name resolution and the TCP connection block
+        the event loop, connectAsync running them in its executor.
+
+        Params:
+            ip:     The broker IP address.
+            port:   The broker listening port.
+        """
+        self._loop = asyncio.get_running_loop()
+        super().connect(ip, port)
+
+    async def connectAsync(self, ip: str, port: int) -> int:
+        """
+        Connect to the broker and wait for the connection result, the
+        blocking name resolution and TCP connection running in the event
+        loop executor and the socket being driven by the event loop.
+
+        Params:
+            ip:     The broker IP address.
+            port:   The broker listening port.
+
+        Return:
+            The connection result from the broker.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._connected = self._loop.create_future()
+        try:
+            await self._loop.run_in_executor(None, MqttClient.connect, self,
+                                             ip, port)
+            return await self._connected
+        finally:
+            self._connected = None
+
+    def startLoop(self) -> None:
+        """
+        The network thread is not used, the socket being driven
+        by the event loop.
+        """
+        self._logger.warn('network loop not used by the asyncio client')
+
+    def stopLoop(self) -> None:
+        """
+        The network thread is not used, the socket being driven
+        by the event loop.
+        """
+        self._logger.warn('network loop not used by the asyncio client')
+
+    async def publishAsync(self, msg: BaseMessage,
+                           timeout: float = None) -> int:
+        """
+        Publish a message and wait for its acknowledgement (PUBACK for
+        QoS 1, PUBCOMP for QoS 2, sent for QoS 0). While disconnected,
+        QoS 1 and 2 messages are queued by paho and sent on reconnection,
+        or stored in the disk buffer if any, completing at once.
+
+        Params:
+            msg:        The message to publish.
+            timeout:    The acknowledgement timeout, in seconds.
+                        Default: None, wait forever.
+
+        Return:
+            The message id, None if stored in the disk buffer.
+        """
+        info = self.publish(msg)
+        if info is None:
+            return None
+        queued = info.rc == mqtt.MQTT_ERR_NO_CONN and msg.getQos() > 0
+        if info.rc != mqtt.MQTT_ERR_SUCCESS and not queued:
+            raise MqttPublishFailed(info.rc)
+        if info.is_published():
+            return info.mid
+        future = asyncio.get_running_loop().create_future()
+        self._pending[info.mid] = future
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(info.mid, None)
+
+    async def _waitAck(self, ack: SubAck, timeout: float) -> SubAck:
+        """
+        Wait for a subscribe or unsubscribe request to complete.
+
+        Params:
+            ack:        The request acknowledgement.
+            timeout:    The acknowledgement timeout, in seconds.
+
+        Return:
+            The completed request acknowledgement.
+        """
+        if not ack.isDone():
+            future = asyncio.get_running_loop().create_future()
+            ack.addDoneCallback(lambda a: future.done() or
+                                future.set_result(a))
+            await asyncio.wait_for(future, timeout)
+        return ack
+
+    async def subscribeAsync(self, subs: tuple,
+                             timeout: float = None) -> SubAck:
+        """
+        Subscribe to a list of subscriptions, in a single packet, and
+        wait for the SUBACK.
+
+        Params:
+            subs:       The list of subscriptions to subscribe to.
+            timeout:    The acknowledgement timeout, in seconds.
+                        Default: None, wait forever.
+
+        Return:
+            The completed subscription acknowledgement, giving the
+            granted QoS of each topic.
+        """
+        return await self._waitAck(self.subscribe(subs), timeout)
+
+    async def unsubscribeAsync(self, subs: tuple,
+                               timeout: float = None) -> SubAck:
+        """
+        Unsubscribe from subscriptions, in a single packet, and wait for
+        the UNSUBACK.
+
+        Params:
+            subs:       The list of subscriptions to unsubscribe from.
+            timeout:    The acknowledgement timeout, in seconds.
+                        Default: None, wait forever.
+
+        Return:
+            The completed unsubscription acknowledgement.
+        """
+        return await self._waitAck(self.unsubscribe(subs), timeout)
+
+    async def messages(self):
+        """
+        Iterate over the received messages.
+
+        Return:
+            The async iterator of the decoded messages.
+        """
+        msgQueue = self._getMsgQueue()
+        while True:
+            yield await msgQueue.get()
+
+    def getDroppedCount(self) -> int:
+        """
+        Get the number of received messages dropped because the message
+        queue was full.
+
+        Return:
+            The number of dropped messages.
+        """
+        return self._dropped
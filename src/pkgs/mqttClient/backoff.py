@@ -0,0 +1,58 @@
+import random
+
+
+class Backoff:
+    """
+    The jittered exponential backoff of the reconnection attempts. The
+    delay cap doubles (by default) at each attempt up to the maximum
+    delay and the delay is drawn uniformly between 0 and the cap, so
+    a fleet losing its broker at once does not reconnect at once.
+    """
+    def __init__(self, minDelay: float = 1.0, maxDelay: float = 60.0,
+                 factor: float = 2.0, rand=random.random) -> None:
+        """
+        Constructor.
+
+        Params:
+            minDelay:   The delay cap of the first attempt, in seconds.
+                        Default: 1.0.
+            maxDelay:   The maximum delay cap, in seconds. Default: 60.0.
+            factor:     The delay cap growth factor. Default: 2.0.
+            rand:       The random function, in [0, 1).
+                        Default: random.random.
+        """
+        self._minDelay = minDelay
+        self._maxDelay = maxDelay
+        self._factor = factor
+        self._rand = rand
+        self._attempts = 0
+        self._cap = min(minDelay, maxDelay)
+
+    def next(self) -> float:
+        """
+        Get the delay of the next attempt.
+
+        Return:
+            The delay, in seconds.
+        """
+        cap = self._cap
+        if cap < self._maxDelay:
+            self._cap = min(self._maxDelay, cap * self._factor)
+        self._attempts += 1
+        return self._rand() * cap
+
+    def reset(self) -> None:
+        """
+        Reset the backoff after a successful connection.
+        """
+        self._attempts = 0
+        self._cap = min(self._minDelay, self._maxDelay)
+
+    def getAttempts(self) -> int:
+        """
+        Get the number of attempts since the last reset.
+
+        Return:
+            The number of attempts.
+        """
+        return self._attempts
@@ -1,275 +1,852 @@
+import threading
+
 import paho.mqtt.client as mqtt
 
+from .backoff import Backoff
+from .diskBuffer import DiskBuffer
+from .dispatcher import WorkerDispatcher
 from .exceptions import MqttClientNotInit
+from .metrics import ClientMetrics
+from .msgRegistry import MsgRegistry
+from .subAck import SubAck
+from .topicTrie import TopicTrie
 from ..messages import BaseMessage
 from ..messages import UnitCxnStateMsg
 
-client = None
-logger = None
-
-
-def init(appLogger: object, clientId: str, password: str) -> None:
-    """
-    Initialize the MQTT client.
 
-    Params:
-        appLogger:  The app logger.
-        clientId:   The client ID.
-        password:   The password.
-    """
-    global client
-    global logger
-    if logger is None and client is None:
-        logger = appLogger.getLogger(f"MQTT-{clientId.upper()}")
-        logger.info(f"creating MQTT client {clientId}")
-        client = mqtt.Client(client_id=clientId)
+class MqttClient:
+    """
+    The MQTT client. Each instance holds its own paho client, logger,
+    message registry and callbacks, so a process can drive several
+    broker connections. The message callbacks are indexed in a topic
+    trie, a received topic being matched in time proportional to its
+    depth whatever the number of registered filters.
+    With a backoff, the connection is managed by the client: lost
+    connections are retried after jittered exponential delays and the
+    subscriptions are restored in a single request, unless the broker
+    kept the persistent session.
+    With a disk buffer, the QoS 1 and 2 messages published while
+    disconnected are stored on disk and forwarded in order once
+    reconnected.
+    The published, acknowledged, received and dropped messages and the
+    publish to acknowledgement latencies are always recorded in the
+    client metrics.
+    """
+    def __init__(self, appLogger: object, clientId: str, password: str,
+                 dispatcher: WorkerDispatcher = None,
+                 cleanSession: bool = True, backoff: Backoff = None,
+                 diskBuffer: DiskBuffer = None, clientFactory=None) -> None:
+        """
+        Constructor.
+
+        Params:
+            appLogger:      The app logger.
+            clientId:       The client ID.
+            password:       The password.
+            dispatcher:     The worker dispatcher running the message
+                            callbacks. Default: None, run them on the
+                            network thread.
+            cleanSession:   The clean session flag, a persistent session
+                            keeping the subscriptions and the QoS 1 and 2
+                            messages while disconnected. Default: True.
+            backoff:        The reconnection backoff. Default: None,
+                            reconnections are left to paho.
+            diskBuffer:     The store and forward buffer of the messages
+                            published while disconnected. Default: None,
+                            left to paho in memory.
+            clientFactory:  The function creating the underlying client,
+                            with the paho Client signature, like the
+                            createClient method of a LoopbackBroker.
+                            Default: None, paho Client.
+        """
+        self._clientId = clientId
+        self._logger = appLogger.getLogger(f"MQTT-{clientId.upper()}")
+        self._logger.info(f"creating MQTT client {clientId}")
+        self._registry = MsgRegistry()
+        self._callbacks = TopicTrie()
+        self._dispatcher = dispatcher
+        self._ackLock = threading.Lock()
+        self._pendingAcks = {}
+        self._earlyAcks = {}
+        self._cleanSession = cleanSession
+        self._backoff = backoff
+        self._subscriptions = {}
+        self._disconnecting = False
+        self._stopEvent = threading.Event()
+        self._netThread = None
+        self._diskBuffer = diskBuffer
+        self._fwdThread = None
+        self._receiveHooks = ()
+        self._metrics = ClientMetrics()
+        if dispatcher is not None:
+            self._metrics.addGauge('dispatcher', dispatcher.getPendingCount)
+        if diskBuffer is not None:
+            self._metrics.addGauge('diskBuffer', diskBuffer.getDepth)
+        if clientFactory is None:
+            clientFactory = mqtt.Client
+        self._client = clientFactory(client_id=clientId,
+                                     clean_session=cleanSession)
         cxnMsg = UnitCxnStateMsg(clientId, {
             UnitCxnStateMsg.STATE_KEY: UnitCxnStateMsg.OFFLINE_STATE
         })
-        client.will_set(cxnMsg.getTopic(), cxnMsg.toJson(),
-                        qos=cxnMsg.getQos(), retain=True)
-        client.username_pw_set(clientId, password)
-        client.on_connect = _onConnect
-        client.on_disconnect = _onDisconnect
-        client.on_message = _onMessage
-        client.on_publish = _onPublish
-        client.on_subscribe = _onSubscribe
-        client.on_unsubscribe = _onUnsubscribe
-        client.on_log = _onLog
+        self._client.will_set(cxnMsg.getTopic(), cxnMsg.toWire(),
+                              qos=cxnMsg.getQos(), retain=True)
+        self._client.username_pw_set(clientId, password)
+        self._client.on_connect = self._onConnect
+        self._client.on_disconnect = self._onDisconnect
+        self._client.on_message = self._onMessage
+        self._client.on_publish = self._onPublish
+        self._client.on_subscribe = self._onSubscribe
+        self._client.on_unsubscribe = self._onUnsubscribe
+        self._client.on_log = self._onLog
+
+    def getClientId(self) -> str:
+        """
+        Get the client ID.
+
+        Return:
+            The client ID.
+        """
+        return self._clientId
+
+    def getLogger(self) -> object:
+        """
+        Get the client logger.
+
+        Return:
+            The client logger.
+        """
+        return self._logger
+
+    def getMetrics(self) -> ClientMetrics:
+        """
+        Get the client metrics.
+
+        Return:
+            The client metrics.
+        """
+        return self._metrics
+
+    def _metricsKey(self, topic: str) -> tuple:
+        """
+        Get the metrics key of a topic.
+
+        Params:
+            topic:      The topic.
+
+        Return:
+            The name and topic root of the class registered for the
+            topic, None and the first topic level if none is.
+        """
+        msgClass = self._registry.getMsgClass(topic)
+        if msgClass is None:
+            return None, topic.split('/', 1)[0]
+        return msgClass.__name__, msgClass.TOPIC_ROOT
+
+    def _onConnect(self, client, usrData, flags, rc) -> None:
+        """
+        The on connection callback.
+
+        Params:
+            client:     The client instance.
+            usrData:    The user data set on the client instance.
+            flags:      The connection flags from the broker.
+            rc:         The connection result.
+        """
+        self._logger.info(f"connection result: {rc}")
+        if rc != mqtt.CONNACK_ACCEPTED:
+            return
+        if self._backoff is not None:
+            self._backoff.reset()
+        if not self._cleanSession and flags.get('session present'):
+            self._logger.info('session resumed')
+        elif self._subscriptions:
+            self._resubscribe()
+        if self._diskBuffer is not None and self._diskBuffer.getDepth():
+            self._startForward()
+
+    def _onDisconnect(self, client, usrData, rc) -> None:
+        """
+        The on disconnect callback.
+
+        Params:
+            client:     The client instance.
+            usrData:    The user data set on the client instance.
+            rc:         The connection result.
+        """
+        self._logger.info(f"disconnection result: {rc}")
+        self._metrics.onDisconnect()
+
+    def _dispatchCallbacks(self, client, usrData, msg) -> bool:
+        """
+        Call the message callbacks whose topic filter matches the topic
+        of a received message.
+
+        Params:
+            client:     The client instance.
+            usrData:    The user data set on the client instance.
+            msg:        The received message.
+
+        Return:
+            True if a callback matched, False otherwise.
+        """
+        callbacks = self._callbacks.match(msg.topic)
+        for callback in callbacks:
+            callback(client, usrData, msg)
+        return len(callbacks) > 0
+
+    def _onMessage(self, client, usrData, msg) -> None:
+        """
+        The on message callback. Messages not caught by a topic callback
+        are decoded and given to the handlers registered for their class.
+
+        Params:
+            client:     The client instance.
+            usrData:    The user data set on the client instance.
+            msg:        The received message.
+        """
+        self._metrics.onReceive(self._metricsKey(msg.topic))
+        self._callReceiveHooks(msg)
+        try:
+            handled = self._dispatchCallbacks(client, usrData, msg) or \
+                self._registry.dispatch(msg.topic, msg.payload)
+        except Exception as e:
+            self._logger.error(f"unable to handle message on "
+                               f"{msg.topic}: {e}")
+            return
+        if not handled:
+            self._logger.warn(f"uncaught message: {msg}")
+
+    def _callReceiveHooks(self, msg) -> None:
+        """
+        Call the receive hooks with a received message.
+
+        Params:
+            msg:        The received message.
+        """
+        for hook in self._receiveHooks:
+            try:
+                hook(msg)
+            except Exception as e:
+                self._logger.error(f"receive hook failed on {msg.topic}: "
+                                   f"{e}")
+
+    def _onPublish(self, client, usrData, mid) -> None:
+        """
+        The on publish callback.
+
+        Params:
+            client:     The client instance.
+            usrData:    The user data set on the client instance.
+            mid:        The message id.
+        """
+        self._logger.debug(f"message {mid} published")
+        self._metrics.onAck(mid)
+
+    def _completeAck(self, mid: int, grantedQos: tuple = None) -> None:
+        """
+        Complete the subscribe or unsubscribe request of a message id,
+        keeping the result if the request is not tracked yet.
+
+        Params:
+            mid:        The message id.
+            grantedQos: The granted QoS of each topic. Default: None.
+        """
+        with self._ackLock:
+            ack = self._pendingAcks.pop(mid, None)
+            if ack is None:
+                self._earlyAcks[mid] = grantedQos
+                return
+        ack.complete(grantedQos)
+
+    def _trackAck(self, ack: SubAck) -> SubAck:
+        """
+        Track a sent subscribe or unsubscribe request until it is
+        acknowledged.
+
+        Params:
+            ack:        The request acknowledgement.
+
+        Return:
+            The request acknowledgement.
+        """
+        if ack.getRc() != mqtt.MQTT_ERR_SUCCESS:
+            ack.complete()
+            return ack
+        with self._ackLock:
+            if ack.getMid() not in self._earlyAcks:
+                self._pendingAcks[ack.getMid()] = ack
+                return ack
+            grantedQos = self._earlyAcks.pop(ack.getMid())
+        ack.complete(grantedQos)
+        return ack
+
+    def _onSubscribe(self, client, usrData, mid, qos) -> None:
+        """
+        The on subscribe callback.
+
+        Params:
+            client:     The client instance.
+            usrData:    The user data set on the client instance.
+            mid:        The message id.
+            qos:        The granted QoS by the broker.
+        """
+        self._logger.debug(f"subscribed to message {mid} with QoS: {qos}")
+        self._completeAck(mid, qos)
+
+    def _onUnsubscribe(self, client, usrData, mid) -> None:
+        """
+        The on unsubscribe callback.
+
+        Params:
+            client:     The client instance.
+            usrData:    The user data set on the client instance.
+            mid:        The message id.
+        """
+        self._logger.debug(f"unsubscribed from message {mid}")
+        self._completeAck(mid)
+
+    def _onLog(self, client, usrData, lvl, msg) -> None:
+        """
+        The on log callback.
+
+        Params:
+            client:     The client instance.
+            usrData:    The user data set on the client instance.
+            lvl:        The message log level.
+            msg:        The log message.
+        """
+        if lvl == mqtt.MQTT_LOG_DEBUG:
+            self._logger.debug(msg)
+        elif lvl == mqtt.MQTT_LOG_NOTICE or lvl == mqtt.MQTT_LOG_INFO:
+            self._logger.info(msg)
+        elif lvl == mqtt.MQTT_LOG_WARNING:
+            self._logger.warn(msg)
+        elif lvl == mqtt.MQTT_LOG_ERR:
+            self._logger.error(msg)
+        else:
+            self._logger.warn(f"unknown level log: {msg}")
+
+    def _resubscribe(self) -> SubAck:
+        """
+        Restore the tracked subscriptions in a single request.
+
+        Return:
+            The subscription acknowledgement.
+        """
+        self._logger.info(f"restoring {len(self._subscriptions)} "
+                          f"subscriptions")
+        return self._sendSubscribe(self.getSubscriptions())
+
+    def _networkLoop(self) -> None:
+        """
+        The managed network loop, reconnecting with the backoff delays
+        until stopped.
+        """
+        while not self._stopEvent.is_set():
+            if self._client.loop(timeout=1.0) == mqtt.MQTT_ERR_SUCCESS:
+                continue
+            if self._disconnecting:
+                self._stopEvent.wait(0.1)
+                continue
+            delay = self._backoff.next()
+            self._logger.info(f"reconnecting in {delay:.2f} s")
+            if self._stopEvent.wait(delay) or self._disconnecting:
+                continue
+            try:
+                self._client.reconnect()
+            except (OSError, ValueError) as e:
+                self._logger.warn(f"reconnection failed: {e}")
+
+    def _publishRaw(self, topic: str, payload: bytes, qos: int,
+                    retain: bool) -> mqtt.MQTTMessageInfo:
+        """
+        Publish an encoded message.
+
+        Params:
+            topic:      The message topic.
+            payload:    The message payload.
+            qos:        The message quality of service.
+            retain:     The message retention flag.
+
+        Return:
+            The publication info, holding the message id.
+        """
+        key = self._metricsKey(topic)
+        start = self._metrics.now()
+        info = self._client.publish(topic, payload=payload, qos=qos,
+                                    retain=retain)
+        if info.rc == mqtt.MQTT_ERR_SUCCESS or \
+                (info.rc == mqtt.MQTT_ERR_NO_CONN and qos > 0):
+            self._metrics.onPublish(info.mid, key, start, qos)
+        else:
+            self._metrics.onDrop(key)
+        return info
+
+    def _startForward(self) -> None:
+        """
+        Start forwarding the stored messages, on a thread.
+        """
+        if self._fwdThread is not None and self._fwdThread.is_alive():
+            return
+        self._logger.info(f"forwarding {self._diskBuffer.getDepth()} "
+                          f"stored messages")
+        self._fwdThread = threading.Thread(target=self._diskBuffer.forward,
+                                           args=(self._publishRaw,
+                                                 self.isConnected),
+                                           name=f"MQTT-FWD-{self._clientId}",
+                                           daemon=True)
+        self._fwdThread.start()
+
+    def connect(self, ip: str, port: int) -> None:
+        """
+        Connect to the broker.
+
+        Params:
+            ip:     The broker IP address.
+            port:   The broker listening port.
+        """
+        self._logger.info(f"trying to connect to broker: {ip}:{port}")
+        self._disconnecting = False
+        self._client.connect(ip, port=port)
+
+    def disconnect(self) -> None:
+        """
+        Disconnect from the broker.
+        """
+        self._logger.info('disconnecting from the broker')
+        self._disconnecting = True
+        self._client.disconnect()
+
+    def isConnected(self) -> bool:
+        """
+        Check if the client is connected to the broker.
+
+        Return:
+            True if the client is connected, False otherwise.
+        """
+        return self._client.is_connected()
+
+    def startLoop(self) -> None:
+        """
+        Start the network loop, managed by the client with a backoff.
+        """
+        self._logger.info('starting network loop')
+        if self._backoff is None:
+            self._client.loop_start()
+        elif self._netThread is None:
+            self._stopEvent.clear()
+            self._netThread = threading.Thread(target=self._networkLoop,
+                                               name=f"MQTT-{self._clientId}",
+                                               daemon=True)
+            self._netThread.start()
+
+    def stopLoop(self) -> None:
+        """
+        Stop the network loop.
+        """
+        self._logger.info('stopping network loop')
+        if self._backoff is None:
+            self._client.loop_stop()
+        elif self._netThread is not None:
+            self._stopEvent.set()
+            self._netThread.join()
+            self._netThread = None
+
+    def publish(self, msg: BaseMessage) -> mqtt.MQTTMessageInfo:
+        """
+        Publish a message.
+
+        Params:
+            msg:    The message to publish.
+
+        Return:
+            The publication info, holding the message id, None if the
+            message was stored in the disk buffer.
+        """
+        return self.publishRaw(msg.getTopic(), msg.toWire(), msg.getQos(),
+                               msg.getRetain())
+
+    def publishRaw(self, topic: str, payload: bytes, qos: int = 0,
+                   retain: bool = False) -> mqtt.MQTTMessageInfo:
+        """
+        Publish an encoded message, like a recorded one, stored in the
+        disk buffer as a published message would be.
+
+        Params:
+            topic:      The message topic.
+            payload:    The message payload.
+            qos:        The message quality of service. Default: 0.
+            retain:     The message retention flag. Default: False.
+
+        Return:
+            The publication info, holding the message id, None if the
+            message was stored in the disk buffer.
+        """
+        self._logger.debug(f"publishing message on topic {topic}")
+        if self._diskBuffer is not None and qos > 0 and \
+                (self._diskBuffer.getDepth() or not self.isConnected()):
+            if not self._diskBuffer.put(topic, payload, qos=qos,
+                                        retain=retain):
+                self._logger.warn(f"disk buffer full, message on topic "
+                                  f"{topic} dropped")
+                self._metrics.onDrop(self._metricsKey(topic))
+            elif self.isConnected():
+                self._startForward()
+            return None
+        return self._publishRaw(topic, payload, qos, retain)
+
+    def getSubscriptions(self) -> list:
+        """
+        Get the tracked subscriptions, restored on reconnection.
+
+        Return:
+            The list of subscriptions.
+        """
+        return [{'topic': topic, 'qos': qos}
+                for topic, qos in self._subscriptions.items()]
+
+    def subscribe(self, subs: tuple) -> SubAck:
+        """
+        Subscribe to a list of subscriptions, in a single packet. The
+        subscriptions are tracked to be restored on reconnection.
+
+        Params:
+            subs:   The list of subscriptions to subscribe to.
+
+        Return:
+            The subscription acknowledgement, giving the granted QoS
+            of each topic once received.
+        """
+        for sub in subs:
+            self._subscriptions[sub['topic']] = sub['qos']
+        return self._sendSubscribe(subs)
+
+    def _sendSubscribe(self, subs: tuple) -> SubAck:
+        """
+        Send a subscribe request for a list of subscriptions.
+
+        Params:
+            subs:   The list of subscriptions to subscribe to.
+
+        Return:
+            The subscription acknowledgement.
+        """
+        topics = [sub['topic'] for sub in subs]
+        if not topics:
+            ack = SubAck(topics)
+            ack.complete(())
+            return ack
+        self._logger.info(f"subscribing to {', '.join(topics)}")
+        rc, mid = self._client.subscribe([(sub['topic'], sub['qos'])
+                                          for sub in subs])
+        return self._trackAck(SubAck(topics, mid, rc))
+
+    def unsubscribe(self, subs: tuple) -> SubAck:
+        """
+        Unsubscribe from subscriptions, in a single packet.
+
+        Params:
+            subs:   The list of subscriptions to unsubscribe from.
+
+        Return:
+            The unsubscription acknowledgement.
+        """
+        topics = [sub['topic'] for sub in subs]
+        for topic in topics:
+            self._subscriptions.pop(topic, None)
+        if not topics:
+            ack = SubAck(topics)
+            ack.complete()
+            return ack
+        self._logger.info(f"unsubscribing from {', '.join(topics)}")
+        rc, mid = self._client.unsubscribe(topics)
+        return self._trackAck(SubAck(topics, mid, rc))
+
+    def addReceiveHook(self, hook) -> None:
+        """
+        Add a receive hook, called on the network thread with every
+        received message before its dispatch, like a traffic recorder.
+
+        Params:
+            hook:       The function called with the received paho
+                        message.
+        """
+        self._receiveHooks = self._receiveHooks + (hook,)
+
+    def removeReceiveHook(self, hook) -> None:
+        """
+        Remove a receive hook.
+
+        Params:
+            hook:       The hook to remove.
+        """
+        self._receiveHooks = tuple(registered for registered
+                                   in self._receiveHooks
+                                   if registered != hook)
+
+    def registerMsgCallback(self, topic: str, callback,
+                            maxConcurrency: int = None) -> None:
+        """
+        Register a message callback for the specified topic, replacing
+        the callback already registered for it.
+
+        Params:
+            topic:          The topic for which to register the callback.
+            callback:       The function to be called on message of the
+                            specified topic.
+            maxConcurrency: The maximum number of concurrent calls of the
+                            callback when a worker dispatcher is used.
+                            Default: None, no limit.
+        """
+        self._logger.debug(f"registering callback {callback.__name__} "
+                           f"for topic {topic}")
+        if self._dispatcher is not None:
+            callback = self._dispatcher.wrap(callback, maxConcurrency)
+        self._callbacks.remove(topic)
+        self._callbacks.add(topic, callback)
+
+    def unregisterMsgCallback(self, topic: str) -> None:
+        """
+        Unregister the callback for the specified topic.
+
+        Params:
+            topic:  The topic from which to unregister the callback.
+        """
+        self._logger.debug(f"unregistering callback from topic {topic}")
+        self._callbacks.remove(topic)
+
+    def registerMsgHandler(self, msgClass: type, handler) -> None:
+        """
+        Register a handler of decoded messages of the specified class.
+
+        Params:
+            msgClass:   The message class, resolved from the received
+                        topic through its TOPIC_FILTER.
+            handler:    The function to be called with each decoded
+                        message.
+        """
+        self._logger.debug(f"registering handler {handler.__name__} for "
+                           f"{msgClass.__name__}")
+        self._registry.addHandler(msgClass, handler)
+
+    def unregisterMsgHandler(self, msgClass: type, handler) -> None:
+        """
+        Unregister a handler of decoded messages of the specified class.
+
+        Params:
+            msgClass:   The message class.
+            handler:    The handler to unregister.
+        """
+        self._logger.debug(f"unregistering handler {handler.__name__} from "
+                           f"{msgClass.__name__}")
+        self._registry.removeHandler(msgClass, handler)
+
+
+defaultClient = None
+
+
+def init(appLogger: object, clientId: str, password: str,
+         dispatcher: WorkerDispatcher = None, cleanSession: bool = True,
+         backoff: Backoff = None, diskBuffer: DiskBuffer = None,
+         clientFactory=None) -> None:
+    """
+    Initialize the default MQTT client.
+
+    Params:
+        appLogger:      The app logger.
+        clientId:       The client ID.
+        password:       The password.
+        dispatcher:     The worker dispatcher running the message
+                        callbacks. Default: None, run them on the network
+                        thread.
+        cleanSession:   The clean session flag. Default: True.
+        backoff:        The reconnection backoff. Default: None,
+                        reconnections are left to paho.
+        diskBuffer:     The store and forward buffer of the messages
+                        published while disconnected. Default: None.
+        clientFactory:  The function creating the underlying client.
+                        Default: None, paho Client.
+    """
+    global defaultClient
+    if defaultClient is None:
+        defaultClient = MqttClient(appLogger, clientId, password,
+                                   dispatcher=dispatcher,
+                                   cleanSession=cleanSession,
+                                   backoff=backoff,
+                                   diskBuffer=diskBuffer,
+                                   clientFactory=clientFactory)
     else:
-        logger.warn(f"MQTT client {clientId} already initialized.")
+        defaultClient.getLogger().warn(f"MQTT client {clientId} already "
+                                       f"initialized.")
 
 
-def _onConnect(client, usrData, flags, rc) -> None:
+def getDefaultClient() -> MqttClient:
     """
-    The on connection callback.
+    Get the default MQTT client.
 
-    Params:
-        client:     The client instance.
-        usrData:    The user data set on the client instance.
-        flags:      The connection flags from the broker.
-        rc:         The connection result.
+    Return:
+        The default MQTT client.
     """
-    global logger
-    logger.info(f"connection result: {rc}")
+    if defaultClient is None:
+        raise MqttClientNotInit()
+    return defaultClient
 
 
-def _onDisconnect(client, usrData, rc) -> None:
+def connect(ip: str, port: int) -> None:
     """
-    The on disconnect callback.
+    Connect the default client to the broker.
 
     Params:
-        client:     The client instance.
-        usrData:    The user data set on the client instance.
-        rc:         The connection result.
+        ip:     The broker IP address.
+        port:   The broker listening port.
     """
-    global logger
-    logger.info(f"disconnection result: {rc}")
+    getDefaultClient().connect(ip, port)
 
 
-def _onMessage(client, usrData, msg) -> None:
+def disconnect() -> None:
     """
-    The on disconnect callback.
-
-    Params:
-        client:     The client instance.
-        usrData:    The user data set on the client instance.
-        msg:        The received message.
+    Disconnect the default client from the broker.
     """
-    global logger
-    logger.warn(f"uncaught message: {msg}")
+    getDefaultClient().disconnect()
 
 
-def _onPublish(client, usrData, mid) -> None:
+def isConnected() -> bool:
     """
-    The on publish callback.
+    Check if the default client is connected to the broker.
 
-    Params:
-        client:     The client instance.
-        usrData:    The user data set on the client instance.
-        mid:        The message id.
+    Return:
+        True if the client is connected, False otherwise.
     """
-    global logger
-    logger.debug(f"message {mid} published")
+    return getDefaultClient().isConnected()
 
 
-def _onSubscribe(client, usrData, mid, qos) -> None:
+def getMetrics() -> ClientMetrics:
     """
-    The on subscribe callback.
+    Get the default client metrics.
 
-    Params:
-        client:     The client instance.
-        usrData:    The user data set on the client instance.
-        mid:        The message id.
-        qos:        The granted QoS by the broker.
+    Return:
+        The client metrics.
     """
-    global logger
-    logger.debug(f"subscribed to message {mid} with QoS: {qos}")
+    return getDefaultClient().getMetrics()
 
 
-def _onUnsubscribe(client, usrData, mid) -> None:
+def startLoop() -> None:
     """
-    The on unsubscribe callback.
-
-    Params:
-        client:     The client instance.
-        usrData:    The user data set on the client instance.
-        mid:        The message id.
+    Start the default client network loop.
     """
-    global logger
-    logger.debug(f"unsubscribed from message {mid}")
+    getDefaultClient().startLoop()
 
 
-def _onLog(client, usrData, lvl, msg) -> None:
+def stopLoop() -> None:
     """
-    The on disconnect callback.
-
-    Params:
-        client:     The client instance.
-        usrData:    The user data set on the client instance.
-        lvl:        The message log level.
-        msg:        The log message.
-    """
-    global logger
-    if lvl == mqtt.MQTT_LOG_DEBUG:
-        logger.debug(msg)
-    elif lvl == mqtt.MQTT_LOG_NOTICE or lvl == mqtt.MQTT_LOG_INFO:
-        logger.info(msg)
-    elif lvl == mqtt.MQTT_LOG_WARNING:
-        logger.warn(msg)
-    elif lvl == mqtt.MQTT_LOG_ERR:
-        logger.error(msg)
-    else:
-        logger.warn(f"unknown level log: {msg}")
+    Stop the default client network loop.
+    """
+    getDefaultClient().stopLoop()
 
 
-def connect(ip: str, port: int) -> None:
+def publish(msg: BaseMessage) -> mqtt.MQTTMessageInfo:
     """
-    Connect to the broker.
+    Publish a message with the default client.
 
     Params:
-        ip:     The broker IP address.
-        port:   The broker listening port.
+        msg:    The message to publish.
+
+    Return:
+        The publication info, holding the message id.
     """
-    global client
-    global logger
-    if client is None or logger is None:
-        raise MqttClientNotInit()
-    logger.info(f"trying to connect to broker: {ip}:{port}")
-    client.connect(ip, port=port)
+    return getDefaultClient().publish(msg)
 
 
-def disconnect() -> None:
-    """
-    Disconnect from the broker.
+def publishRaw(topic: str, payload: bytes, qos: int = 0,
+               retain: bool = False) -> mqtt.MQTTMessageInfo:
     """
-    global client
-    global logger
-    if client is None or logger is None:
-        raise MqttClientNotInit()
-    logger.info('disconnecting from the broker')
-    client.disconnect()
+    Publish an encoded message with the default client.
 
+    Params:
+        topic:      The message topic.
+        payload:    The message payload.
+        qos:        The message quality of service. Default: 0.
+        retain:     The message retention flag. Default: False.
 
-def startLoop() -> None:
-    """
-    Start the network loop.
+    Return:
+        The publication info, holding the message id, None if the
+        message was stored in the disk buffer.
     """
-    global client
-    global logger
-    if client is None or logger is None:
-        raise MqttClientNotInit()
-    logger.info('starting network loop')
-    client.loop_start()
+    return getDefaultClient().publishRaw(topic, payload, qos, retain)
 
 
-def stopLoop() -> None:
+def subscribe(subs: tuple) -> SubAck:
     """
-    Stop the network loop.
+    Subscribe the default client to a list of subscriptions.
+
+    Params:
+        subs:   The list of subscriptions to subscribe to.
+
+    Return:
+        The subscription acknowledgement.
     """
-    global client
-    global logger
-    if client is None or logger is None:
-        raise MqttClientNotInit()
-    logger.info('stopping network loop')
-    client.loop_stop()
+    return getDefaultClient().subscribe(subs)
 
 
-def publish(msg: BaseMessage) -> None:
+def unscubscribe(subs: tuple) -> SubAck:
     """
-    Publish a message.
+    Unsubscribe the default client from subscriptions.
 
     Params:
-        msg:    The message to publish.
+        subs:   The list of subscriptions to unsubscribe from.
+
+    Return:
+        The unsubscription acknowledgement.
     """
-    global client
-    global logger
-    if client is None or logger is None:
-        raise MqttClientNotInit()
-    logger.debug(f"publishing message on topic {msg.getTopic()}")
-    client.publish(msg.getTopic(), payload=msg.toJson(),
-                   qos=msg.getQos(), retain=msg.getRetain())
+    return getDefaultClient().unsubscribe(subs)
 
 
-def subscribe(subs: tuple) -> None:
+def registerMsgCallback(topic: str, callback,
+                        maxConcurrency: int = None) -> None:
     """
-    Subscribe to a list of subscriptions.
+    Register a default client message callback for the specified topic.
 
     Params:
-        subs:   The list of subscriptions to subscribe to.
+        topic:          The topic for which to register the callback.
+        callback:       The function to be called on message of the
+                        specified topic.
+        maxConcurrency: The maximum number of concurrent calls of the
+                        callback when a worker dispatcher is used.
+                        Default: None, no limit.
     """
-    global client
-    global logger
-    if client is None or logger is None:
-        raise MqttClientNotInit()
-    for sub in subs:
-        logger.info(f"subscribing to {sub['topic']}")
-        client.subscribe(sub['topic'], qos=sub['qos'])
+    getDefaultClient().registerMsgCallback(topic, callback, maxConcurrency)
 
 
-def unscubscribe(subs: tuple) -> None:
+def unregisterMsgCallback(topic: str):
     """
-    Unsubscribe from subscriptions.
+    Unregister the default client callback for the specified topic.
 
     Params:
-        subs:   The list of subscriptions to unsubscribe from.
+        topic:  The topic from which to unregister the callback.
     """
-    global client
-    global logger
-    if client is None or logger is None:
-        raise MqttClientNotInit()
-    for sub in subs:
-        logger.info(f"unsubscribing from {sub['topic']}")
-        client.unsubscribe(sub['topic'])
+    getDefaultClient().unregisterMsgCallback(topic)
 
 
-def registerMsgCallback(topic: str, callback) -> None:
+def registerMsgHandler(msgClass: type, handler) -> None:
     """
-    Register a message callback for the specified topic.
+    Register a default client handler of decoded messages of the
+    specified class.
 
     Params:
-        topic:      The topic for which to register the callback.
-        callback:   The function to be called on message of the
-                    specified topic.
+        msgClass:   The message class.
+        handler:    The function to be called with each decoded message.
     """
-    global client
-    global logger
-    if client is None or logger is None:
-        raise MqttClientNotInit()
-    logger.debug(f"registering callback {callback.__name__} for topic {topic}")
-    client.message_callback_add(topic, callback)
+    getDefaultClient().registerMsgHandler(msgClass, handler)
 
 
-def unregisterMsgCallback(topic: str):
+def unregisterMsgHandler(msgClass: type, handler) -> None:
     """
-    Unregister the callback for the specified topic.
+    Unregister a default client handler of decoded messages of the
+    specified class.
 
     Params:
-        topic:  The topic from which to unregister the callback.
+        msgClass:   The message class.
+        handler:    The handler to unregister.
     """
-    global client
-    global logger
-    if client is None or logger is None:
-        raise MqttClientNotInit()
-    logger.debug(f"unregistering callback from topic {topic}")
-    client.message_callback_remove(topic)
+    getDefaultClient().unregisterMsgHandler(msgClass, handler)
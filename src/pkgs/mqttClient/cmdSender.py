@@ -0,0 +1,137 @@
+import threading
+import time
+
+from . import client
+from ..messages import UnitWhldCmdMsg
+
+
+class WhldCmdSender:
+    """
+    The wheeled unit command sender. Only the newest submitted command
+    of each unit topic is kept and the pending commands are published
+    at a fixed rate, older unsent commands being dropped rather than
+    queued, so bursty inputs neither load the broker nor delay the
+    commands. The flushes are driven either by the sender thread or by
+    calling poll periodically.
+    """
+    SUBMITTED_KEY = 'submitted'
+    SENT_KEY = 'sent'
+    DROPPED_KEY = 'dropped'
+
+    def __init__(self, rate: float = 50.0, publishFn=None,
+                 clock=time.monotonic) -> None:
+        """
+        Constructor.
+
+        Params:
+            rate:       The send rate, in flushes per second.
+                        Default: 50.0.
+            publishFn:  The function publishing a message.
+                        Default: None, use the mqttClient publish.
+            clock:      The monotonic clock, in seconds.
+                        Default: time.monotonic.
+        """
+        self._period = 1.0 / rate
+        self._publish = publishFn if publishFn is not None \
+            else client.publish
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._nextFlush = None
+        self._counts = [0, 0, 0]
+        self._stopEvent = threading.Event()
+        self._thread = None
+
+    def submit(self, msg: UnitWhldCmdMsg) -> None:
+        """
+        Submit a command, replacing the pending command of its unit.
+        The message must not be modified until it is sent.
+
+        Params:
+            msg:        The command message.
+        """
+        with self._lock:
+            if self._pending.pop(msg.getTopic(), None) is not None:
+                self._counts[2] += 1
+            self._pending[msg.getTopic()] = msg
+            self._counts[0] += 1
+
+    def getPendingCount(self) -> int:
+        """
+        Get the number of commands waiting for the next flush.
+
+        Return:
+            The number of pending commands.
+        """
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Publish the pending commands.
+
+        Return:
+            The number of published commands.
+        """
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+        for msg in pending.values():
+            self._publish(msg)
+        with self._lock:
+            self._counts[1] += len(pending)
+        return len(pending)
+
+    def poll(self) -> int:
+        """
+        Flush the pending commands if the send period expired. To be
+        called more often than the send rate when the sender thread
+        is not used.
+
+        Return:
+            The number of published commands.
+        """
+        now = self._clock()
+        if self._nextFlush is not None and now < self._nextFlush:
+            return 0
+        self._nextFlush = now + self._period
+        return self.flush()
+
+    def _run(self) -> None:
+        """
+        The sender thread loop.
+        """
+        while not self._stopEvent.wait(self._period):
+            self.flush()
+
+    def start(self) -> None:
+        """
+        Start the sender thread.
+        """
+        if self._thread is not None:
+            return
+        self._stopEvent.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name='WhldCmdSender', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the sender thread, the pending commands being flushed.
+        """
+        if self._thread is None:
+            return
+        self._stopEvent.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+
+    def getStats(self) -> dict:
+        """
+        Get the command counts.
+
+        Return:
+            The submitted, sent and dropped command counts.
+        """
+        return {self.SUBMITTED_KEY: self._counts[0],
+                self.SENT_KEY: self._counts[1],
+                self.DROPPED_KEY: self._counts[2]}
@@ -0,0 +1,289 @@
+import os
+import struct
+import threading
+import time
+import zlib
+
+import paho.mqtt.client as mqtt
+
+RECORD_HEADER = struct.Struct('<IIBBH')
+COPY_CHUNK = 1 << 16
+
+
+class DiskBuffer:
+    """
+    The disk-backed store and forward buffer of the QoS 1 and 2 messages
+    published while disconnected. The messages are appended to a log
+    file and forwarded in order, at a controlled rate, once reconnected.
+    The forwarded position is kept in a cursor file so the pending
+    messages survive a process restart, the log being compacted when
+    emptied or when room is needed. Each record is checked with a CRC32,
+    a torn record at the end of the log being discarded on opening.
+    Record layout: header (CRC32 of topic and payload, payload length,
+    QoS, retain flag, topic length), UTF-8 topic, payload.
+    """
+    STORED_KEY = 'stored'
+    FORWARDED_KEY = 'forwarded'
+    DROPPED_KEY = 'dropped'
+
+    def __init__(self, path: str, maxBytes: int = 16 * 1024 * 1024,
+                 rate: float = 50.0, fsync: bool = False) -> None:
+        """
+        Constructor.
+
+        Params:
+            path:       The log file path, the cursor being kept in
+                        path + '.cursor'.
+            maxBytes:   The maximum size of the pending messages, new
+                        messages being dropped when reached.
+                        Default: 16 MiB.
+            rate:       The forwarding rate, in messages per second.
+                        Default: 50.0.
+            fsync:      The flag to sync the log to disk on each append,
+                        for power loss safety. Default: False.
+        """
+        self._path = path
+        self._cursorPath = f"{path}.cursor"
+        self._maxBytes = maxBytes
+        self._period = 1.0 / rate
+        self._fsync = fsync
+        self._lock = threading.Lock()
+        self._counts = [0, 0, 0]
+        mode = 'r+b' if os.path.exists(path) else 'w+b'
+        self._file = open(path, mode)
+        self._readOffset = self._loadCursor()
+        self._writeOffset, self._depth = self._recover()
+
+    def _loadCursor(self) -> int:
+        """
+        Load the forwarded position.
+
+        Return:
+            The offset of the first pending record.
+        """
+        try:
+            with open(self._cursorPath, 'r') as cursorFile:
+                return int(cursorFile.read() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _saveCursor(self) -> None:
+        """
+        Save the forwarded position, atomically.
+        """
+        tmpPath = f"{self._cursorPath}.tmp"
+        with open(tmpPath, 'w') as cursorFile:
+            cursorFile.write(str(self._readOffset))
+        os.replace(tmpPath, self._cursorPath)
+
+    def _readRecord(self, offset: int) -> tuple:
+        """
+        Read a record.
+
+        Params:
+            offset:     The record offset.
+
+        Return:
+            The topic, payload, QoS, retain flag and record size, None
+            if the record is incomplete or corrupted.
+        """
+        self._file.seek(offset)
+        header = self._file.read(RECORD_HEADER.size)
+        if len(header) < RECORD_HEADER.size:
+            return None
+        crc, payloadLen, qos, retain, topicLen = RECORD_HEADER.unpack(header)
+        body = self._file.read(topicLen + payloadLen)
+        if len(body) < topicLen + payloadLen or zlib.crc32(body) != crc:
+            return None
+        return body[:topicLen].decode(), body[topicLen:], qos, bool(retain), \
+            RECORD_HEADER.size + len(body)
+
+    def _recover(self) -> tuple:
+        """
+        Scan the pending records, discarding a torn record at the end
+        of the log.
+
+        Return:
+            The end offset of the log and the number of pending records.
+        """
+        size = self._file.seek(0, os.SEEK_END)
+        if self._readOffset > size:
+            self._readOffset = 0
+        offset = self._readOffset
+        depth = 0
+        while offset < size:
+            record = self._readRecord(offset)
+            if record is None:
+                self._file.truncate(offset)
+                break
+            offset += record[-1]
+            depth += 1
+        return offset, depth
+
+    def _compact(self) -> None:
+        """
+        Move the pending records to the start of the log.
+        """
+        if self._readOffset == 0:
+            return
+        src = self._readOffset
+        dst = 0
+        while src < self._writeOffset:
+            self._file.seek(src)
+            chunk = self._file.read(min(COPY_CHUNK, self._writeOffset - src))
+            self._file.seek(dst)
+            self._file.write(chunk)
+            src += len(chunk)
+            dst += len(chunk)
+        self._file.truncate(dst)
+        self._file.flush()
+        self._readOffset = 0
+        self._writeOffset = dst
+        self._saveCursor()
+
+    def put(self, topic: str, payload: bytes, qos: int = 1,
+            retain: bool = False) -> bool:
+        """
+        Append a message to the log.
+
+        Params:
+            topic:      The message topic.
+            payload:    The message payload.
+            qos:        The message quality of service. Default: 1.
+            retain:     The message retention flag. Default: False.
+
+        Return:
+            True if the message was stored, False if it was dropped
+            because the buffer is full.
+        """
+        topicBytes = topic.encode()
+        body = topicBytes + bytes(payload)
+        record = RECORD_HEADER.pack(zlib.crc32(body), len(body) -
+                                    len(topicBytes), qos, retain,
+                                    len(topicBytes)) + body
+        with self._lock:
+            pending = self._writeOffset - self._readOffset
+            if pending + len(record) > self._maxBytes:
+                self._counts[2] += 1
+                return False
+            if self._writeOffset + len(record) > self._maxBytes:
+                self._compact()
+            self._file.seek(self._writeOffset)
+            self._file.write(record)
+            self._file.flush()
+            if self._fsync:
+                os.fsync(self._file.fileno())
+            self._writeOffset += len(record)
+            self._depth += 1
+            self._counts[0] += 1
+        return True
+
+    def drain(self, publishFn, maxCount: int = None) -> int:
+        """
+        Forward the pending messages in order, stopping at the first
+        message whose publication fails. A message refused by the client
+        is kept pending, while a QoS 1 or 2 message published while
+        disconnected is forwarded, paho keeping it to send it on
+        reconnection. The publications are made without the buffer lock
+        held, by a single forwarder at a time.
+
+        Params:
+            publishFn:  The function publishing a message, called with
+                        its topic, payload, QoS and retain flag, and
+                        returning its publication info.
+            maxCount:   The maximum number of messages to forward.
+                        Default: None, no limit.
+
+        Return:
+            The number of forwarded messages.
+        """
+        sent = 0
+        while maxCount is None or sent < maxCount:
+            with self._lock:
+                if self._depth == 0:
+                    break
+                topic, payload, qos, retain, size = \
+                    self._readRecord(self._readOffset)
+            info = publishFn(topic, payload, qos, retain)
+            if info.rc != mqtt.MQTT_ERR_SUCCESS and \
+                    (info.rc != mqtt.MQTT_ERR_NO_CONN or qos == 0):
+                break
+            with self._lock:
+                self._readOffset += size
+                self._depth -= 1
+                self._counts[1] += 1
+                if self._depth == 0:
+                    self._file.truncate(0)
+                    self._readOffset = self._writeOffset = 0
+                self._saveCursor()
+            sent += 1
+            if info.rc != mqtt.MQTT_ERR_SUCCESS:
+                break
+        return sent
+
+    def forward(self, publishFn, readyFn, sleepFn=time.sleep) -> int:
+        """
+        Forward the pending messages in order at the forwarding rate,
+        while ready (connected) and the publications succeed.
+
+        Params:
+            publishFn:  The function publishing a message, called with
+                        its topic, payload, QoS and retain flag, and
+                        returning its publication info.
+            readyFn:    The function telling if messages can be
+                        published.
+            sleepFn:    The sleep function. Default: time.sleep.
+
+        Return:
+            The number of forwarded messages.
+        """
+        sent = 0
+        while readyFn() and self.drain(publishFn, maxCount=1):
+            sent += 1
+            sleepFn(self._period)
+        return sent
+
+    def getPeriod(self) -> float:
+        """
+        Get the forwarding period.
+
+        Return:
+            The time between two forwarded messages, in seconds.
+        """
+        return self._period
+
+    def getDepth(self) -> int:
+        """
+        Get the number of pending messages.
+
+        Return:
+            The number of pending messages.
+        """
+        return self._depth
+
+    def getSize(self) -> int:
+        """
+        Get the size of the pending messages.
+
+        Return:
+            The size of the pending records, in bytes.
+        """
+        return self._writeOffset - self._readOffset
+
+    def getStats(self) -> dict:
+        """
+        Get the message counts since opened.
+
+        Return:
+            The stored, forwarded and dropped message counts.
+        """
+        return {self.STORED_KEY: self._counts[0],
+                self.FORWARDED_KEY: self._counts[1],
+                self.DROPPED_KEY: self._counts[2]}
+
+    def close(self) -> None:
+        """
+        Close the log.
+        """
+        with self._lock:
+            self._file.close()
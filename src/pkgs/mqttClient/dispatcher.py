@@ -0,0 +1,192 @@
+import collections
+import concurrent.futures
+import threading
+
+ReceivedMsg = collections.namedtuple('ReceivedMsg',
+                                     ('topic', 'payload', 'qos', 'retain'))
+
+
+class _CallbackEntry:
+    """
+    The dispatch state of a callback.
+    """
+    __slots__ = ('callback', 'limit', 'running', 'waiting')
+
+    def __init__(self, callback, limit: int) -> None:
+        """
+        Constructor.
+
+        Params:
+            callback:   The callback.
+            limit:      The maximum number of concurrent calls, None for
+                        no limit.
+        """
+        self.callback = callback
+        self.limit = limit
+        self.running = 0
+        self.waiting = collections.deque()
+
+
+class WorkerDispatcher:
+    """
+    The worker pool dispatcher of message callbacks. The callbacks are
+    run by an executor instead of the network thread, the messages of
+    a topic being handled one at a time in their reception order and
+    each callback running at most its concurrency limit at once.
+    With a process pool, the callbacks must be picklable (module level
+    functions) and are called with no client nor user data, and a
+    ReceivedMsg copy of the message.
+    """
+    DISPATCHED_KEY = 'dispatched'
+    COMPLETED_KEY = 'completed'
+    FAILED_KEY = 'failed'
+
+    def __init__(self, workers: int = 4, executor=None,
+                 onError=None) -> None:
+        """
+        Constructor.
+
+        Params:
+            workers:    The number of worker threads of the default
+                        executor. Default: 4.
+            executor:   The concurrent.futures executor running the
+                        callbacks. Default: None, a thread pool.
+            onError:    The function called with the callback and the
+                        exception when a callback fails. Default: None.
+        """
+        if executor is None:
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix='MsgCallback')
+        self._executor = executor
+        self._copyMsg = isinstance(executor,
+                                   concurrent.futures.ProcessPoolExecutor)
+        self._onError = onError
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._topics = {}
+        self._pending = 0
+        self._counts = [0, 0, 0]
+
+    def wrap(self, callback, maxConcurrency: int = None):
+        """
+        Wrap a paho message callback so its calls are dispatched to the
+        workers. A callback wrapped for several topics shares its
+        concurrency limit.
+
+        Params:
+            callback:       The message callback.
+            maxConcurrency: The maximum number of concurrent calls of the
+                            callback. Default: None, no limit.
+
+        Return:
+            The callback to register to paho.
+        """
+        with self._lock:
+            entry = self._entries.get(callback)
+            if entry is None:
+                entry = self._entries[callback] = \
+                    _CallbackEntry(callback, maxConcurrency)
+            else:
+                entry.limit = maxConcurrency
+
+        def dispatch(client, usrData, msg):
+            self.submit(entry, client, usrData, msg)
+        dispatch.__name__ = callback.__name__
+        return dispatch
+
+    def submit(self, entry: _CallbackEntry, client, usrData, msg) -> None:
+        """
+        Queue a callback call behind the pending calls of the message
+        topic.
+
+        Params:
+            entry:      The callback entry.
+            client:     The client instance.
+            usrData:    The user data set on the client instance.
+            msg:        The received message.
+        """
+        if self._copyMsg:
+            client = usrData = None
+            msg = ReceivedMsg(msg.topic, msg.payload, msg.qos, msg.retain)
+        with self._lock:
+            self._pending += 1
+            queue = self._topics.get(msg.topic)
+            if queue is not None:
+                queue.append((entry, (client, usrData, msg)))
+                return
+            self._topics[msg.topic] = \
+                collections.deque(((entry, (client, usrData, msg)),))
+            self._schedule(msg.topic)
+
+    def _schedule(self, topic: str) -> None:
+        """
+        Run the next call of a topic, or make it wait for its callback
+        to get under its concurrency limit. The lock must be held.
+
+        Params:
+            topic:      The topic.
+        """
+        queue = self._topics[topic]
+        entry, args = queue[0]
+        if entry.limit is not None and entry.running >= entry.limit:
+            entry.waiting.append(topic)
+            return
+        queue.popleft()
+        entry.running += 1
+        self._pending -= 1
+        self._counts[0] += 1
+        future = self._executor.submit(entry.callback, *args)
+        future.add_done_callback(lambda f: self._done(topic, entry, f))
+
+    def _done(self, topic: str, entry: _CallbackEntry, future) -> None:
+        """
+        Complete a call and run the next calls of its topic and of the
+        topics waiting for its callback.
+
+        Params:
+            topic:      The topic.
+            entry:      The callback entry.
+            future:     The future of the call.
+        """
+        error = None if future.cancelled() else future.exception()
+        with self._lock:
+            entry.running -= 1
+            self._counts[1 if error is None else 2] += 1
+            if entry.waiting:
+                self._schedule(entry.waiting.popleft())
+            if self._topics[topic]:
+                self._schedule(topic)
+            else:
+                del self._topics[topic]
+        if error is not None and self._onError is not None:
+            self._onError(entry.callback, error)
+
+    def getPendingCount(self) -> int:
+        """
+        Get the number of calls waiting for a worker.
+
+        Return:
+            The number of pending calls.
+        """
+        return self._pending
+
+    def getStats(self) -> dict:
+        """
+        Get the call counts.
+
+        Return:
+            The dispatched, completed and failed call counts.
+        """
+        with self._lock:
+            return {self.DISPATCHED_KEY: self._counts[0],
+                    self.COMPLETED_KEY: self._counts[1],
+                    self.FAILED_KEY: self._counts[2]}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut the executor down.
+
+        Params:
+            wait:       Wait for the running calls. Default: True.
+        """
+        self._executor.shutdown(wait=wait)
@@ -4,3 +4,44 @@ class MqttClientNotInit(Exception):
     """
     def __init__(self) -> None:
         super().__init__('MQTT client not initialized.')
+
+
+class MqttPublishFailed(Exception):
+    """
+    The MQTT publish failed exception.
+    """
+    def __init__(self, rc: int) -> None:
+        super().__init__(f"MQTT publish failed with result code {rc}.")
+        self.rc = rc
+
+
+class PublishQueueFull(Exception):
+    """
+    The outbound publish queue full exception.
+    """
+    def __init__(self, msgClass: str) -> None:
+        super().__init__(f"publish queue full, {msgClass} rejected.")
+
+
+class UnknownQueuePolicy(Exception):
+    """
+    The unknown publish queue policy exception.
+    """
+    def __init__(self, policy: str) -> None:
+        super().__init__(f"unknown publish queue policy: {policy}.")
+
+
+class InvalidTrafficLog(Exception):
+    """
+    The invalid traffic log exception.
+    """
+    def __init__(self, path: str) -> None:
+        super().__init__(f"invalid traffic log: {path}.")
+
+
+class InvalidReplaySpeed(Exception):
+    """
+    The invalid traffic replay speed exception.
+    """
+    def __init__(self, speed: float) -> None:
+        super().__init__(f"invalid replay speed: {speed}, must be above 0.")
@@ -0,0 +1,180 @@
+import threading
+
+from . import client
+from .subAck import SubAck
+from ..messages import UnitCxnStateMsg
+
+
+class FleetRegistry:
+    """
+    The fleet connection state registry. It follows the retained unit
+    connection state messages, each update being decoded once by the
+    client registry, and keeps the online units in an indexed set so
+    the state queries do not scan the fleet. An update costs a set
+    insertion or removal whatever the fleet size, so the retained flood
+    of a whole fleet at subscription is absorbed in linear time, and the
+    listeners are only notified of actual state changes. An empty
+    retained payload (cleared state) forgets the unit, while an invalid
+    payload raises, to be logged by the client.
+    """
+    def __init__(self, mqttClient: client.MqttClient = None) -> None:
+        """
+        Constructor.
+
+        Params:
+            mqttClient: The MQTT client. Default: None, use the default
+                        client.
+        """
+        self._client = mqttClient
+        self._lock = threading.Lock()
+        self._states = {}
+        self._online = set()
+        self._onlineView = frozenset()
+        self._dirty = False
+        self._listeners = ()
+
+    def _getClient(self) -> client.MqttClient:
+        """
+        Get the MQTT client.
+
+        Return:
+            The MQTT client, the default one if none was given.
+        """
+        if self._client is None:
+            return client.getDefaultClient()
+        return self._client
+
+    def start(self) -> SubAck:
+        """
+        Follow the unit connection states.
+
+        Return:
+            The subscription acknowledgement.
+        """
+        mqttClient = self._getClient()
+        mqttClient.registerMsgHandler(UnitCxnStateMsg, self.update)
+        return mqttClient.subscribe([{'topic': UnitCxnStateMsg.TOPIC_FILTER,
+                                      'qos': UnitCxnStateMsg.QOS}])
+
+    def stop(self) -> SubAck:
+        """
+        Stop following the unit connection states, the known states
+        being kept.
+
+        Return:
+            The unsubscription acknowledgement.
+        """
+        mqttClient = self._getClient()
+        mqttClient.unregisterMsgHandler(UnitCxnStateMsg, self.update)
+        return mqttClient.unsubscribe([{'topic': UnitCxnStateMsg.TOPIC_FILTER,
+                                        'qos': UnitCxnStateMsg.QOS}])
+
+    def update(self, msg: UnitCxnStateMsg) -> bool:
+        """
+        Update the state of a unit.
+
+        Params:
+            msg:        The unit connection state message.
+
+        Return:
+            True if the state of the unit changed, False otherwise.
+        """
+        unit = msg.getUnit()
+        online = msg.isOnline() if msg.getPayload() else None
+        with self._lock:
+            if online is None:
+                if self._states.pop(unit, None) is None:
+                    return False
+            elif self._states.get(unit) == online:
+                return False
+            else:
+                self._states[unit] = online
+            if online:
+                self._online.add(unit)
+            else:
+                self._online.discard(unit)
+            self._dirty = True
+            listeners = self._listeners
+        for listener in listeners:
+            listener(unit, online)
+        return True
+
+    def addListener(self, listener) -> None:
+        """
+        Add a state change listener, called on the client network thread.
+
+        Params:
+            listener:   The function called with the unit ID and its new
+                        state: True if online, False if offline, None if
+                        forgotten.
+        """
+        with self._lock:
+            self._listeners = self._listeners + (listener,)
+
+    def removeListener(self, listener) -> None:
+        """
+        Remove a state change listener.
+
+        Params:
+            listener:   The listener to remove.
+        """
+        with self._lock:
+            self._listeners = tuple(registered for registered
+                                    in self._listeners
+                                    if registered != listener)
+
+    def isOnline(self, unit: str) -> bool:
+        """
+        Check if a unit is online.
+
+        Params:
+            unit:       The unit ID.
+
+        Return:
+            True if the unit is online, False otherwise.
+        """
+        return unit in self._online
+
+    def isKnown(self, unit: str) -> bool:
+        """
+        Check if the state of a unit is known.
+
+        Params:
+            unit:       The unit ID.
+
+        Return:
+            True if a state was received for the unit, False otherwise.
+        """
+        return unit in self._states
+
+    def onlineUnits(self) -> frozenset:
+        """
+        Get the online units. The returned set is shared until the next
+        state change, so repeated queries do not copy the fleet.
+
+        Return:
+            The online unit IDs.
+        """
+        if self._dirty:
+            with self._lock:
+                self._onlineView = frozenset(self._online)
+                self._dirty = False
+        return self._onlineView
+
+    def getOnlineCount(self) -> int:
+        """
+        Get the number of online units.
+
+        Return:
+            The number of online units.
+        """
+        return len(self._online)
+
+    def getUnitCount(self) -> int:
+        """
+        Get the number of known units.
+
+        Return:
+            The number of units whose state is known.
+        """
+        return len(self._states)
@@ -0,0 +1,700 @@
+import itertools
+import queue
+import threading
+
+import paho.mqtt.client as mqtt
+
+from .topicTrie import TopicTrie
+
+
+def _toBytes(payload) -> bytes:
+    """
+    Convert a payload as paho does before sending it.
+
+    Params:
+        payload:    The payload (bytes-like, str, number or None).
+
+    Return:
+        The payload bytes.
+    """
+    if payload is None:
+        return b''
+    if isinstance(payload, str):
+        return payload.encode()
+    if isinstance(payload, (int, float)):
+        return str(payload).encode()
+    return bytes(payload)
+
+
+class _Session:
+    """
+    A loopback broker session, kept while disconnected unless clean.
+    """
+    __slots__ = ('clientId', 'cleanSession', 'client', 'subs', 'pending',
+                 'will')
+
+    def __init__(self, clientId: str, cleanSession: bool) -> None:
+        """
+        Constructor.
+
+        Params:
+            clientId:       The client ID.
+            cleanSession:   The clean session flag.
+        """
+        self.clientId = clientId
+        self.cleanSession = cleanSession
+        self.client = None
+        self.subs = {}
+        self.pending = []
+        self.will = None
+
+
+class LoopbackBroker:
+    """
+    The in-process MQTT broker, so the real clients and messages can be
+    run end to end in a single process with no network, for integration
+    tests and benchmarks. It routes the publications with the topic
+    wildcards, keeps the retained messages, publishes the last will of
+    the clients whose connection is lost (see dropClient), keeps the
+    persistent sessions, subscriptions and QoS 1 and 2 messages included,
+    and acknowledges the QoS 1 and 2 publications once routed (QoS 2 is
+    acknowledged like QoS 1). Its createClient method is the client
+    factory of MqttClient.
+    """
+    def __init__(self) -> None:
+        """
+        Constructor.
+        """
+        self._lock = threading.RLock()
+        self._subs = TopicTrie()
+        self._sessions = {}
+        self._retained = {}
+
+    def createClient(self, client_id: str = '', clean_session: bool = True,
+                     **kwargs) -> 'LoopbackClient':
+        """
+        Create a client of the broker, with the paho Client signature.
+
+        Params:
+            client_id:      The client ID.
+            clean_session:  The clean session flag. Default: True.
+
+        Return:
+            The loopback client.
+        """
+        return LoopbackClient(self, client_id=client_id,
+                              clean_session=clean_session)
+
+    def getClientIds(self) -> list:
+        """
+        Get the connected clients.
+
+        Return:
+            The IDs of the connected clients.
+        """
+        with self._lock:
+            return [clientId for clientId, session
+                    in self._sessions.items() if session.client is not None]
+
+    def getRetained(self, topic: str) -> bytes:
+        """
+        Get the retained message of a topic.
+
+        Params:
+            topic:      The topic.
+
+        Return:
+            The retained payload, None if none is retained.
+        """
+        with self._lock:
+            retained = self._retained.get(topic)
+        return None if retained is None else retained[0]
+
+    def connect(self, client: 'LoopbackClient', will: tuple) -> bool:
+        """
+        Connect a client, taking over the connection of a client with the
+        same ID.
+
+        Params:
+            client:     The client.
+            will:       The last will (topic, payload, qos, retain),
+                        None if not set.
+
+        Return:
+            True if a persistent session was resumed, False otherwise.
+        """
+        with self._lock:
+            session = self._sessions.get(client._clientId)
+            if session is not None and session.client is not None:
+                self._drop(session)
+            if session is not None and \
+                    (session.cleanSession or client._cleanSession):
+                self._clearSubs(session)
+                session = None
+            present = session is not None
+            if session is None:
+                session = self._sessions[client._clientId] = \
+                    _Session(client._clientId, client._cleanSession)
+            session.client = client
+            session.will = will
+            client._enqueue(client._handleConnack, present)
+            for topic, payload, qos, retain in session.pending:
+                client._enqueue(client._handleMessage, topic, payload, qos,
+                                retain)
+            session.pending = []
+        return present
+
+    def disconnect(self, client: 'LoopbackClient') -> None:
+        """
+        Disconnect a client, its last will being discarded.
+
+        Params:
+            client:     The client.
+        """
+        with self._lock:
+            session = self._sessions.get(client._clientId)
+            if session is None or session.client is not client:
+                return
+            session.will = None
+            self._close(session)
+
+    def dropClient(self, clientId: str) -> bool:
+        """
+        Simulate the loss of a client connection, publishing its last
+        will.
+
+        Params:
+            clientId:   The client ID.
+
+        Return:
+            True if the client was connected, False otherwise.
+        """
+        with self._lock:
+            session = self._sessions.get(clientId)
+            if session is None or session.client is None:
+                return False
+            self._drop(session)
+        return True
+
+    def _drop(self, session: _Session) -> None:
+        """
+        Close a lost connection and publish its last will, the lock
+        being held.
+
+        Params:
+            session:    The session of the client.
+        """
+        client = session.client
+        will = session.will
+        self._close(session)
+        client._enqueue(client._handleConnectionLost)
+        if will is not None:
+            self.publish(*will)
+
+    def _close(self, session: _Session) -> None:
+        """
+        Close a connection, the lock being held.
+
+        Params:
+            session:    The session of the client.
+        """
+        session.client._markClosed()
+        session.client = None
+        if session.cleanSession:
+            self._clearSubs(session)
+            del self._sessions[session.clientId]
+
+    def _clearSubs(self, session: _Session) -> None:
+        """
+        Remove the subscriptions of a session, the lock being held.
+
+        Params:
+            session:    The session.
+        """
+        for topicFilter in session.subs:
+            self._subs.remove(topicFilter, (session, topicFilter))
+        session.subs = {}
+
+    def publish(self, topic: str, payload: bytes, qos: int = 0,
+                retain: bool = False) -> None:
+        """
+        Route a publication to the matching subscriptions.
+
+        Params:
+            topic:      The topic.
+            payload:    The payload.
+            qos:        The quality of service. Default: 0.
+            retain:     The retention flag, an empty payload clearing the
+                        retained message. Default: False.
+        """
+        with self._lock:
+            if retain:
+                if payload:
+                    self._retained[topic] = (payload, qos)
+                else:
+                    self._retained.pop(topic, None)
+            granted = {}
+            for session, topicFilter in self._subs.match(topic):
+                granted[session] = max(granted.get(session, 0),
+                                       session.subs[topicFilter])
+            for session, subQos in granted.items():
+                self._deliver(session, topic, payload, min(qos, subQos),
+                              False)
+
+    def _deliver(self, session: _Session, topic: str, payload: bytes,
+                 qos: int, retain: bool) -> None:
+        """
+        Deliver a message to a session, the QoS 1 and 2 messages being
+        kept while a persistent session is disconnected. The lock must
+        be held.
+
+        Params:
+            session:    The session.
+            topic:      The topic.
+            payload:    The payload.
+            qos:        The delivery quality of service.
+            retain:     The retention flag.
+        """
+        if session.client is not None:
+            session.client._enqueue(session.client._handleMessage, topic,
+                                    payload, qos, retain)
+        elif qos > 0:
+            session.pending.append((topic, payload, qos, retain))
+
+    def subscribe(self, client: 'LoopbackClient', subs: list,
+                  mid: int) -> tuple:
+        """
+        Subscribe a client, its matching retained messages being
+        delivered after the acknowledgement.
+
+        Params:
+            client:     The client.
+            subs:       The (topic filter, QoS) subscriptions.
+            mid:        The message id of the request.
+
+        Return:
+            The granted QoS of each subscription.
+        """
+        with self._lock:
+            session = self._sessions[client._clientId]
+            for topicFilter, qos in subs:
+                if topicFilter not in session.subs:
+                    self._subs.add(topicFilter, (session, topicFilter))
+                session.subs[topicFilter] = qos
+            granted = tuple(qos for _, qos in subs)
+            retained = [(topic, payload, min(retainQos, qos))
+                        for topicFilter, qos in subs
+                        for topic, (payload, retainQos)
+                        in self._retained.items()
+                        if mqtt.topic_matches_sub(topicFilter, topic)]
+            client._enqueue(client._handleSuback, mid, granted)
+            for topic, payload, qos in retained:
+                self._deliver(session, topic, payload, qos, True)
+        return granted
+
+    def unsubscribe(self, client: 'LoopbackClient', topics: list) -> None:
+        """
+        Unsubscribe a client.
+
+        Params:
+            client:     The client.
+            topics:     The topic filters.
+        """
+        with self._lock:
+            session = self._sessions[client._clientId]
+            for topicFilter in topics:
+                if session.subs.pop(topicFilter, None) is not None:
+                    self._subs.remove(topicFilter, (session, topicFilter))
+
+
+class LoopbackClient:
+    """
+    The loopback broker client, implementing the part of the paho Client
+    interface used by MqttClient (hence the paho method names). As with
+    paho, the callbacks are called by the network loop (loop, or the
+    loop_start thread) and the QoS 1 and 2 messages published while
+    disconnected are sent on reconnection. The socket callbacks of the
+    asyncio client are not supported.
+    """
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self, broker: LoopbackBroker, client_id: str = '',
+                 clean_session: bool = True) -> None:
+        """
+        Constructor.
+
+        Params:
+            broker:         The loopback broker.
+            client_id:      The client ID.
+            clean_session:  The clean session flag. Default: True.
+        """
+        self._broker = broker
+        self._clientId = client_id
+        self._cleanSession = clean_session
+        self._userdata = None
+        self._username = None
+        self._will = None
+        self._lock = threading.Lock()
+        self._connected = False
+        self._connecting = False
+        self._lost = False
+        self._events = queue.Queue()
+        self._mids = itertools.count(1)
+        self._outbound = []
+        self._thread = None
+        self._stopEvent = threading.Event()
+        self._disconnectRequested = False
+        self.on_connect = None
+        self.on_disconnect = None
+        self.on_message = None
+        self.on_publish = None
+        self.on_subscribe = None
+        self.on_unsubscribe = None
+        self.on_log = None
+
+    def _enqueue(self, handler, *args) -> None:
+        """
+        Queue an event for the network loop.
+
+        Params:
+            handler:    The event handler.
+            args:       The handler arguments.
+        """
+        self._events.put((handler, args))
+
+    def _call(self, callback, *args) -> None:
+        """
+        Call a user callback if set.
+
+        Params:
+            callback:   The callback.
+            args:       The callback arguments, after the client and the
+                        user data.
+        """
+        if callback is not None:
+            callback(self, self._userdata, *args)
+
+    def _markClosed(self) -> None:
+        """
+        Mark the connection as closed, called by the broker. The client
+        lock is not taken, the broker lock being held.
+        """
+        self._connected = False
+
+    def _handleConnack(self, present: bool) -> None:
+        """
+        Handle the connection acknowledgement, sending the publications
+        queued while disconnected.
+
+        Params:
+            present:    The session present flag.
+        """
+        self._connecting = False
+        with self._lock:
+            self._connected = True
+            outbound, self._outbound = self._outbound, []
+            for info, topic, payload, qos, retain in outbound:
+                self._send(info, topic, payload, qos, retain)
+        self._call(self.on_connect, {'session present': int(present)},
+                   mqtt.CONNACK_ACCEPTED)
+
+    def _handleConnectionLost(self) -> None:
+        """
+        Handle the loss of the connection.
+        """
+        self._lost = True
+        self._call(self.on_disconnect, mqtt.MQTT_ERR_CONN_LOST)
+
+    def _handleMessage(self, topic: str, payload: bytes, qos: int,
+                       retain: bool) -> None:
+        """
+        Handle a delivered message.
+
+        Params:
+            topic:      The topic.
+            payload:    The payload.
+            qos:        The delivery quality of service.
+            retain:     The retention flag.
+        """
+        msg = mqtt.MQTTMessage(topic=topic.encode())
+        msg.payload = payload
+        msg.qos = qos
+        msg.retain = retain
+        self._call(self.on_message, msg)
+
+    def _handlePuback(self, info: mqtt.MQTTMessageInfo) -> None:
+        """
+        Handle a publication acknowledgement.
+
+        Params:
+            info:       The publication info.
+        """
+        info._set_as_published()
+        self._call(self.on_publish, info.mid)
+
+    def _handleSuback(self, mid: int, granted: tuple) -> None:
+        """
+        Handle a subscription acknowledgement.
+
+        Params:
+            mid:        The message id of the request.
+            granted:    The granted QoS of each subscription.
+        """
+        self._call(self.on_subscribe, mid, granted)
+
+    def _handleUnsuback(self, mid: int) -> None:
+        """
+        Handle an unsubscription acknowledgement.
+
+        Params:
+            mid:        The message id of the request.
+        """
+        self._call(self.on_unsubscribe, mid)
+
+    def user_data_set(self, userdata) -> None:
+        """
+        Set the user data given to the callbacks.
+
+        Params:
+            userdata:   The user data.
+        """
+        self._userdata = userdata
+
+    def username_pw_set(self, username: str, password: str = None) -> None:
+        """
+        Set the credentials, not checked by the loopback broker.
+
+        Params:
+            username:   The username.
+            password:   The password. Default: None.
+        """
+        self._username = username
+
+    def will_set(self, topic: str, payload=None, qos: int = 0,
+                 retain: bool = False, properties=None) -> None:
+        """
+        Set the last will, published by the broker if the connection is
+        lost.
+
+        Params:
+            topic:      The will topic.
+            payload:    The will payload. Default: None.
+            qos:        The will quality of service. Default: 0.
+            retain:     The will retention flag. Default: False.
+        """
+        self._will = (topic, _toBytes(payload), qos, retain)
+
+    def connect(self, host: str = 'loopback', port: int = 1883,
+                keepalive: int = 60, **kwargs) -> int:
+        """
+        Connect to the loopback broker, the host and port being ignored.
+
+        Return:
+            The result code.
+        """
+        self._disconnectRequested = False
+        self._connecting = True
+        self._lost = False
+        self._broker.connect(self, self._will)
+        return mqtt.MQTT_ERR_SUCCESS
+
+    def reconnect(self) -> int:
+        """
+        Reconnect to the loopback broker.
+
+        Return:
+            The result code.
+        """
+        return self.connect()
+
+    def disconnect(self, **kwargs) -> int:
+        """
+        Disconnect from the loopback broker, the last will being
+        discarded.
+
+        Return:
+            The result code.
+        """
+        self._disconnectRequested = True
+        if not self._connected and not self._connecting:
+            return mqtt.MQTT_ERR_NO_CONN
+        self._broker.disconnect(self)
+        self._connecting = False
+        self._enqueue(self._handleDisconnect)
+        return mqtt.MQTT_ERR_SUCCESS
+
+    def _handleDisconnect(self) -> None:
+        """
+        Handle a requested disconnection.
+        """
+        self._call(self.on_disconnect, mqtt.MQTT_ERR_SUCCESS)
+
+    def is_connected(self) -> bool:
+        """
+        Check if the client is connected.
+
+        Return:
+            True if the client is connected, False otherwise.
+        """
+        return self._connected
+
+    def _send(self, info: mqtt.MQTTMessageInfo, topic: str, payload: bytes,
+              qos: int, retain: bool) -> None:
+        """
+        Send a publication to the broker, acknowledged once routed.
+
+        Params:
+            info:       The publication info.
+            topic:      The topic.
+            payload:    The payload.
+            qos:        The quality of service.
+            retain:     The retention flag.
+        """
+        self._broker.publish(topic, payload, qos=qos, retain=retain)
+        self._enqueue(self._handlePuback, info)
+
+    def publish(self, topic: str, payload=None, qos: int = 0,
+                retain: bool = False, properties=None) -> mqtt.MQTTMessageInfo:
+        """
+        Publish a message.
+
+        Params:
+            topic:      The topic.
+            payload:    The payload. Default: None.
+            qos:        The quality of service. Default: 0.
+            retain:     The retention flag. Default: False.
+
+        Return:
+            The publication info, NO_CONN while disconnected, the QoS 1
+            and 2 messages being sent on reconnection.
+        """
+        info = mqtt.MQTTMessageInfo(next(self._mids))
+        payload = _toBytes(payload)
+        with self._lock:
+            if self._connected:
+                self._send(info, topic, payload, qos, retain)
+            else:
+                info.rc = mqtt.MQTT_ERR_NO_CONN
+                if qos > 0:
+                    self._outbound.append((info, topic, payload, qos,
+                                           retain))
+        return info
+
+    def _normalizeSubs(self, topic, qos: int) -> list:
+        """
+        Normalize the subscriptions as paho accepts them.
+
+        Params:
+            topic:      The topic filter, (topic filter, QoS) tuple or
+                        list of those tuples.
+            qos:        The QoS of a single topic filter.
+
+        Return:
+            The (topic filter, QoS) subscriptions.
+        """
+        if isinstance(topic, str):
+            return [(topic, qos)]
+        if isinstance(topic, tuple):
+            return [topic]
+        return list(topic)
+
+    def subscribe(self, topic, qos: int = 0, **kwargs) -> tuple:
+        """
+        Subscribe to topic filters.
+
+        Params:
+            topic:      The topic filter, (topic filter, QoS) tuple or
+                        list of those tuples.
+            qos:        The QoS of a single topic filter. Default: 0.
+
+        Return:
+            The result code and message id.
+        """
+        if not self._connected:
+            return mqtt.MQTT_ERR_NO_CONN, None
+        mid = next(self._mids)
+        self._broker.subscribe(self, self._normalizeSubs(topic, qos), mid)
+        return mqtt.MQTT_ERR_SUCCESS, mid
+
+    def unsubscribe(self, topic, **kwargs) -> tuple:
+        """
+        Unsubscribe from topic filters.
+
+        Params:
+            topic:      The topic filter or list of topic filters.
+
+        Return:
+            The result code and message id.
+        """
+        if not self._connected:
+            return mqtt.MQTT_ERR_NO_CONN, None
+        mid = next(self._mids)
+        topics = [topic] if isinstance(topic, str) else list(topic)
+        self._broker.unsubscribe(self, topics)
+        self._enqueue(self._handleUnsuback, mid)
+        return mqtt.MQTT_ERR_SUCCESS, mid
+
+    def loop(self, timeout: float = 1.0, max_packets: int = 1) -> int:
+        """
+        Run the queued events, waiting for the first one up to the
+        timeout.
+
+        Params:
+            timeout:        The maximum wait time, in seconds.
+                            Default: 1.0.
+            max_packets:    Unused, for paho compatibility.
+
+        Return:
+            SUCCESS while connected, CONN_LOST if the connection was
+            lost, NO_CONN otherwise.
+        """
+        wait = self._connected or self._connecting
+        while True:
+            try:
+                handler, args = self._events.get(block=wait,
+                                                 timeout=timeout)
+            except queue.Empty:
+                break
+            handler(*args)
+            wait = False
+        if self._connected:
+            return mqtt.MQTT_ERR_SUCCESS
+        if self._lost:
+            return mqtt.MQTT_ERR_CONN_LOST
+        return mqtt.MQTT_ERR_NO_CONN
+
+    def _threadLoop(self) -> None:
+        """
+        The loop_start thread, reconnecting after the reconnect delay
+        when the connection is lost.
+        """
+        while not self._stopEvent.is_set():
+            rc = self.loop(timeout=0.1)
+            if rc == mqtt.MQTT_ERR_CONN_LOST and \
+                    not self._stopEvent.wait(self.RECONNECT_DELAY) and \
+                    not self._disconnectRequested:
+                self.reconnect()
+            elif rc == mqtt.MQTT_ERR_NO_CONN:
+                self._stopEvent.wait(0.1)
+
+    def loop_start(self) -> None:
+        """
+        Start the network loop thread.
+        """
+        if self._thread is not None:
+            return
+        self._stopEvent.clear()
+        self._thread = threading.Thread(target=self._threadLoop,
+                                        name=f"LOOPBACK-{self._clientId}",
+                                        daemon=True)
+        self._thread.start()
+
+    def loop_stop(self, force: bool = False) -> None:
+        """
+        Stop the network loop thread.
+        """
+        if self._thread is None:
+            return
+        self._stopEvent.set()
+        self._thread.join()
+        self._thread = None
@@ -0,0 +1,344 @@
+import bisect
+import threading
+import time
+
+LATENCY_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5,
+                   1.0, 2.0, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """
+    The latency histogram, counting the observed latencies in fixed
+    buckets so an observation costs a binary search and an increment.
+    The last bucket counts the latencies above the highest bound.
+    """
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS) -> None:
+        """
+        Constructor.
+
+        Params:
+            buckets:    The sorted bucket upper bounds, in seconds.
+                        Default: 1 ms to 10 s.
+        """
+        self._bounds = tuple(buckets)
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._count = 0
+        self._sum = 0.0
+
+    def observe(self, latency: float) -> None:
+        """
+        Count a latency.
+
+        Params:
+            latency:    The latency, in seconds.
+        """
+        self._counts[bisect.bisect_left(self._bounds, latency)] += 1
+        self._count += 1
+        self._sum += latency
+
+    def getCount(self) -> int:
+        """
+        Get the number of observed latencies.
+
+        Return:
+            The number of observed latencies.
+        """
+        return self._count
+
+    def getMean(self) -> float:
+        """
+        Get the mean latency.
+
+        Return:
+            The mean latency, in seconds, None if nothing was observed.
+        """
+        return self._sum / self._count if self._count else None
+
+    def getBuckets(self) -> list:
+        """
+        Get the bucket counts.
+
+        Return:
+            The (upper bound, count) of each bucket, the last bound
+            being infinite.
+        """
+        return list(zip(self._bounds + (float('inf'),), self._counts))
+
+    def getPercentile(self, percent: float) -> float:
+        """
+        Get the upper bound of the bucket holding a percentile.
+
+        Params:
+            percent:    The percentile, from 0 to 100.
+
+        Return:
+            The bucket upper bound, in seconds, None if nothing was
+            observed.
+        """
+        if not self._count:
+            return None
+        rank = percent / 100.0 * self._count
+        total = 0
+        for bound, count in self.getBuckets():
+            total += count
+            if total >= rank:
+                return bound
+        return float('inf')
+
+
+class ClientMetrics:
+    """
+    The MQTT client metrics: message counters by event, message class
+    and topic root, publish to acknowledgement latency histograms and
+    gauges (messages in flight and the depths of registered queues).
+    Only the QoS 1 and 2 publications are in flight: the QoS 0 ones are
+    timed until sent, and forgotten on disconnection since paho drops
+    the unsent ones without a publish callback.
+    Recording an event costs a dictionary update under a lock, so the
+    metrics can be left on at production rates.
+    The counters and histograms are keyed by (message class name, topic
+    root), the class name being None for topics of no registered class.
+    """
+    PUBLISHED_KEY = 'published'
+    ACKED_KEY = 'acked'
+    RECEIVED_KEY = 'received'
+    DROPPED_KEY = 'dropped'
+    IN_FLIGHT_KEY = 'inFlight'
+    EVENTS = (PUBLISHED_KEY, ACKED_KEY, RECEIVED_KEY, DROPPED_KEY)
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS,
+                 clock=time.monotonic) -> None:
+        """
+        Constructor.
+
+        Params:
+            buckets:    The latency histogram bucket upper bounds, in
+                        seconds. Default: 1 ms to 10 s.
+            clock:      The clock function, in seconds.
+                        Default: time.monotonic.
+        """
+        self._buckets = buckets
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._gauges = {}
+        self._inFlight = {}
+        self._sending = {}
+        self._earlyAcks = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Reset the counters and histograms, the messages in flight being
+        kept.
+        """
+        with self._lock:
+            self._counts = {event: {} for event in self.EVENTS}
+            self._latencies = {}
+
+    def now(self) -> float:
+        """
+        Get the current time, to time a publication.
+
+        Return:
+            The clock time, in seconds.
+        """
+        return self._clock()
+
+    def _count(self, event: str, key: tuple) -> None:
+        """
+        Increment a counter, the lock being held.
+
+        Params:
+            event:      The event.
+            key:        The (message class name, topic root) key.
+        """
+        counts = self._counts[event]
+        counts[key] = counts.get(key, 0) + 1
+
+    def _observe(self, key: tuple, latency: float) -> None:
+        """
+        Count an acknowledgement and its latency, the lock being held.
+
+        Params:
+            key:        The (message class name, topic root) key.
+            latency:    The publish to acknowledgement latency, in
+                        seconds.
+        """
+        self._count(self.ACKED_KEY, key)
+        histogram = self._latencies.get(key)
+        if histogram is None:
+            histogram = self._latencies[key] = \
+                LatencyHistogram(self._buckets)
+        histogram.observe(latency)
+
+    def onPublish(self, mid: int, key: tuple, start: float = None,
+                  qos: int = 1) -> None:
+        """
+        Record a publication, in flight until acknowledged, or until
+        sent for QoS 0.
+
+        Params:
+            mid:        The message id.
+            key:        The (message class name, topic root) key.
+            start:      The publication start time, from the clock.
+                        Default: None, now.
+            qos:        The publication quality of service. Default: 1.
+        """
+        if start is None:
+            start = self._clock()
+        with self._lock:
+            self._count(self.PUBLISHED_KEY, key)
+            ackTime = self._earlyAcks.pop(mid, None)
+            if ackTime is None:
+                pending = self._inFlight if qos > 0 else self._sending
+                pending[mid] = (start, key)
+            else:
+                self._observe(key, ackTime - start)
+
+    def onAck(self, mid: int) -> None:
+        """
+        Record the acknowledgement of a publication (PUBACK for QoS 1,
+        PUBCOMP for QoS 2, sent for QoS 0). An acknowledgement received
+        before its publication is recorded is kept until it is.
+
+        Params:
+            mid:        The message id.
+        """
+        now = self._clock()
+        with self._lock:
+            published = self._inFlight.pop(mid, None)
+            if published is None:
+                published = self._sending.pop(mid, None)
+            if published is None:
+                self._earlyAcks[mid] = now
+            else:
+                self._observe(published[1], now - published[0])
+
+    def onDisconnect(self) -> None:
+        """
+        Record a disconnection, forgetting the QoS 0 publications not
+        sent yet and the acknowledgements of unrecorded publications.
+        """
+        with self._lock:
+            self._sending.clear()
+            self._earlyAcks.clear()
+
+    def onReceive(self, key: tuple) -> None:
+        """
+        Record a received message.
+
+        Params:
+            key:        The (message class name, topic root) key.
+        """
+        with self._lock:
+            self._count(self.RECEIVED_KEY, key)
+
+    def onDrop(self, key: tuple) -> None:
+        """
+        Record a dropped message.
+
+        Params:
+            key:        The (message class name, topic root) key.
+        """
+        with self._lock:
+            self._count(self.DROPPED_KEY, key)
+
+    def addGauge(self, name: str, gaugeFn) -> None:
+        """
+        Add a gauge, read when the gauges are read.
+
+        Params:
+            name:       The gauge name.
+            gaugeFn:    The function returning the gauge value, like
+                        the getDepth method of a queue.
+        """
+        self._gauges[name] = gaugeFn
+
+    def removeGauge(self, name: str) -> None:
+        """
+        Remove a gauge.
+
+        Params:
+            name:       The gauge name.
+        """
+        self._gauges.pop(name, None)
+
+    def getCounters(self, event: str = None) -> dict:
+        """
+        Get the message counters.
+
+        Params:
+            event:      The event. Default: None, every event.
+
+        Return:
+            The counts by key of the event, by event if no event is
+            given.
+        """
+        with self._lock:
+            if event is not None:
+                return dict(self._counts[event])
+            return {name: dict(counts)
+                    for name, counts in self._counts.items()}
+
+    def getCount(self, event: str, msgClass: str = None,
+                 topicRoot: str = None) -> int:
+        """
+        Get the total count of an event.
+
+        Params:
+            event:      The event.
+            msgClass:   The message class name. Default: None, any.
+            topicRoot:  The topic root. Default: None, any.
+
+        Return:
+            The count of the matching keys.
+        """
+        with self._lock:
+            return sum(count for (name, root), count
+                       in self._counts[event].items()
+                       if (msgClass is None or name == msgClass) and
+                       (topicRoot is None or root == topicRoot))
+
+    def getLatency(self, key: tuple) -> LatencyHistogram:
+        """
+        Get the publish to acknowledgement latency histogram of a key.
+
+        Params:
+            key:        The (message class name, topic root) key.
+
+        Return:
+            The latency histogram, None if nothing was acknowledged.
+        """
+        return self._latencies.get(key)
+
+    def getLatencies(self) -> dict:
+        """
+        Get the publish to acknowledgement latency histograms.
+
+        Return:
+            The latency histograms by key.
+        """
+        with self._lock:
+            return dict(self._latencies)
+
+    def getInFlight(self) -> int:
+        """
+        Get the number of QoS 1 and 2 publications waiting for their
+        acknowledgement.
+
+        Return:
+            The number of messages in flight.
+        """
+        return len(self._inFlight)
+
+    def getGauges(self) -> dict:
+        """
+        Read the gauges.
+
+        Return:
+            The gauge values by name, with the messages in flight.
+        """
+        gauges = {self.IN_FLIGHT_KEY: self.getInFlight()}
+        for name, gaugeFn in list(self._gauges.items()):
+            gauges[name] = gaugeFn()
+        return gauges
@@ -0,0 +1,144 @@
+from .topicTrie import TopicTrie
+from ..messages import BaseMessage, UnitCxnStateMsg, UnitWhldCmdMsg, \
+    UnitWhldStateMsg
+
+DEFAULT_MSG_CLASSES = (UnitCxnStateMsg, UnitWhldCmdMsg, UnitWhldStateMsg)
+
+
+class MsgRegistry:
+    """
+    The topic to message class registry. The topic filters are kept in
+    a topic trie so a received topic is resolved in time proportional
+    to its depth, the unit ID being taken from the topic by the message
+    class when decoding.
+    """
+    def __init__(self, msgClasses: tuple = DEFAULT_MSG_CLASSES,
+                 lazy: bool = True) -> None:
+        """
+        Constructor.
+
+        Params:
+            msgClasses: The message classes to register on their
+                        TOPIC_FILTER. Default: the RC mission messages.
+            lazy:       The lazy decoding flag, the payloads being parsed
+                        only when a handler needs them. Default: True.
+        """
+        self._lazy = lazy
+        self._index = TopicTrie()
+        self._handlers = {}
+        for msgClass in msgClasses:
+            self.register(msgClass)
+
+    def register(self, msgClass: type, topicFilter: str = None) -> None:
+        """
+        Register a message class for a topic filter.
+
+        Params:
+            msgClass:       The message class.
+            topicFilter:    The topic filter. Default: None, use the
+                            class TOPIC_FILTER.
+        """
+        if topicFilter is None:
+            topicFilter = msgClass.TOPIC_FILTER
+        if msgClass not in self._index.get(topicFilter):
+            self._index.add(topicFilter, msgClass)
+        self._handlers.setdefault(msgClass, ())
+
+    def unregister(self, msgClass: type, topicFilter: str = None) -> None:
+        """
+        Unregister a message class from a topic filter.
+
+        Params:
+            msgClass:       The message class.
+            topicFilter:    The topic filter. Default: None, use the
+                            class TOPIC_FILTER.
+        """
+        if topicFilter is None:
+            topicFilter = msgClass.TOPIC_FILTER
+        self._index.remove(topicFilter, msgClass)
+
+    def getMsgClass(self, topic: str) -> type:
+        """
+        Get the message class registered for a topic.
+
+        Params:
+            topic:      The topic.
+
+        Return:
+            The message class, None if no class matches the topic.
+        """
+        matches = self._index.match(topic)
+        return matches[0] if matches else None
+
+    def decode(self, topic: str, payload) -> BaseMessage:
+        """
+        Decode a received payload with the class registered for its topic.
+
+        Params:
+            topic:      The topic on which the payload was received.
+            payload:    The received payload.
+
+        Return:
+            The decoded message, None if no class matches the topic.
+        """
+        msgClass = self.getMsgClass(topic)
+        if msgClass is None:
+            return None
+        return msgClass.decode(payload, topic, lazy=self._lazy)
+
+    def addHandler(self, msgClass: type, handler) -> None:
+        """
+        Add a handler of decoded messages, registering the message class
+        on its TOPIC_FILTER if needed.
+
+        Params:
+            msgClass:   The message class.
+            handler:    The function called with each decoded message.
+        """
+        if msgClass not in self._handlers:
+            self.register(msgClass)
+        self._handlers[msgClass] = self._handlers[msgClass] + (handler,)
+
+    def removeHandler(self, msgClass: type, handler) -> None:
+        """
+        Remove a handler of decoded messages.
+
+        Params:
+            msgClass:   The message class.
+            handler:    The handler to remove.
+        """
+        handlers = self._handlers.get(msgClass, ())
+        self._handlers[msgClass] = tuple(h for h in handlers
+                                         if h != handler)
+
+    def getHandlers(self, msgClass: type) -> tuple:
+        """
+        Get the handlers of decoded messages of a class.
+
+        Params:
+            msgClass:   The message class.
+
+        Return:
+            The handlers of the class.
+        """
+        return self._handlers.get(msgClass, ())
+
+    def dispatch(self, topic: str, payload) -> bool:
+        """
+        Decode a received payload once and call the handlers of its class.
+
+        Params:
+            topic:      The topic on which the payload was received.
+            payload:    The received payload.
+
+        Return:
+            True if the message was handled, False otherwise.
+        """
+        msgClass = self.getMsgClass(topic)
+        handlers = self._handlers.get(msgClass)
+        if not handlers:
+            return False
+        msg = msgClass.decode(payload, topic, lazy=self._lazy)
+        for handler in handlers:
+            handler(msg)
+        return True
@@ -0,0 +1,340 @@
+import collections
+import threading
+
+from . import client
+from .exceptions import PublishQueueFull, UnknownQueuePolicy
+from ..messages import BaseMessage
+
+
+class PublishQueue:
+    """
+    The bounded outbound publish queue. The messages are kept in front
+    of the client and only handed to it while it is ready (connected)
+    and the publications in flight are below a maximum, so an outage or
+    a slow broker fills this bounded queue instead of the unbounded paho
+    one. When the queue is full, the policy of the message class decides
+    what happens:
+        - block:        wait for room, up to the block timeout.
+        - drop oldest:  drop the oldest queued message of the same class,
+                        or the new message if none of its class is
+                        queued, so a class never evicts another one.
+        - drop newest:  drop the new message.
+        - reject:       raise a PublishQueueFull exception.
+    A message whose publication fails is counted as dropped and reported
+    to the error function, the sender thread going on with the next one.
+    """
+    BLOCK = 'block'
+    DROP_OLDEST = 'drop oldest'
+    DROP_NEWEST = 'drop newest'
+    REJECT = 'reject'
+    POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST, REJECT)
+    QUEUED_KEY = 'queued'
+    SENT_KEY = 'sent'
+    DROPPED_KEY = 'dropped'
+    REJECTED_KEY = 'rejected'
+    QUEUED_COUNT = 0
+    SENT_COUNT = 1
+    DROPPED_COUNT = 2
+    REJECTED_COUNT = 3
+
+    def __init__(self, maxSize: int = 1024, policy: str = DROP_OLDEST,
+                 policies: dict = None, blockTimeout: float = None,
+                 publishFn=None, readyFn=None, maxInFlight: int = 64,
+                 inFlightFn=None, onError=None,
+                 pollPeriod: float = 0.1) -> None:
+        """
+        Constructor.
+
+        Params:
+            maxSize:        The maximum number of queued messages.
+                            Default: 1024.
+            policy:         The default full queue policy.
+                            Default: drop oldest.
+            policies:       The full queue policies by message class.
+                            Default: None, the default policy for all.
+            blockTimeout:   The maximum time, in seconds, a blocked put
+                            waits for room before being rejected.
+                            Default: None, wait forever.
+            publishFn:      The function publishing a message.
+                            Default: None, use the mqttClient publish.
+            readyFn:        The function telling if messages can be
+                            published. Default: None, use the mqttClient
+                            isConnected when publishFn is not given,
+                            always ready otherwise.
+            maxInFlight:    The maximum number of publications waiting
+                            for their acknowledgement, the draining
+                            pausing when reached. Default: 64.
+            inFlightFn:     The function giving the number of
+                            publications in flight. Default: None, use
+                            the mqttClient metrics when publishFn is not
+                            given, no maximum otherwise.
+            onError:        The function called with the message and the
+                            exception when a publication fails.
+                            Default: None, log it with the mqttClient
+                            logger when publishFn is not given, ignore it
+                            otherwise.
+            pollPeriod:     The period, in seconds, at which the sender
+                            thread checks the readiness and the
+                            publications in flight while messages are
+                            waiting. Default: 0.1.
+        """
+        self._checkPolicy(policy)
+        self._maxSize = maxSize
+        self._policy = policy
+        self._policies = {}
+        for msgClass, classPolicy in (policies or {}).items():
+            self.setPolicy(msgClass, classPolicy)
+        self._blockTimeout = blockTimeout
+        if publishFn is None:
+            publishFn = client.publish
+            readyFn = client.isConnected if readyFn is None else readyFn
+            if inFlightFn is None:
+                inFlightFn = self._clientInFlight
+            if onError is None:
+                onError = self._logClientError
+        self._publish = publishFn
+        self._ready = readyFn if readyFn is not None else lambda: True
+        self._maxInFlight = maxInFlight
+        self._inFlight = inFlightFn
+        self._onError = onError
+        self._pollPeriod = pollPeriod
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        self._counts = {}
+        self._running = False
+        self._thread = None
+
+    def _checkPolicy(self, policy: str) -> None:
+        """
+        Check that a policy is known.
+
+        Params:
+            policy:     The policy.
+        """
+        if policy not in self.POLICIES:
+            raise UnknownQueuePolicy(policy)
+
+    def setPolicy(self, msgClass: type, policy: str) -> None:
+        """
+        Set the full queue policy of a message class.
+
+        Params:
+            msgClass:   The message class.
+            policy:     The policy.
+        """
+        self._checkPolicy(policy)
+        self._policies[msgClass] = policy
+
+    def getPolicy(self, msgClass: type) -> str:
+        """
+        Get the full queue policy of a message class.
+
+        Params:
+            msgClass:   The message class.
+
+        Return:
+            The policy.
+        """
+        return self._policies.get(msgClass, self._policy)
+
+    @staticmethod
+    def _clientInFlight() -> int:
+        """
+        Get the number of publications in flight of the default client.
+
+        Return:
+            The number of publications in flight.
+        """
+        return client.getMetrics().getInFlight()
+
+    @staticmethod
+    def _logClientError(msg: BaseMessage, error: Exception) -> None:
+        """
+        Log a failed publication with the default client logger.
+
+        Params:
+            msg:        The message.
+            error:      The publication exception.
+        """
+        client.getDefaultClient().getLogger().error(
+            f"unable to publish message on {msg.getTopic()}: {error}")
+
+    def _isReady(self) -> bool:
+        """
+        Check if a message can be handed to the client.
+
+        Return:
+            True if the client is ready and the publications in flight
+            are below the maximum, False otherwise.
+        """
+        if not self._ready():
+            return False
+        return self._inFlight is None or \
+            self._inFlight() < self._maxInFlight
+
+    def _count(self, msgClass: type, index: int) -> None:
+        """
+        Increment a counter of a message class.
+
+        Params:
+            msgClass:   The message class.
+            index:      The counter index (QUEUED_COUNT, SENT_COUNT,
+                        DROPPED_COUNT or REJECTED_COUNT).
+        """
+        counts = self._counts.get(msgClass)
+        if counts is None:
+            counts = self._counts[msgClass] = [0, 0, 0, 0]
+        counts[index] += 1
+
+    def _dropOldest(self, msgClass: type) -> bool:
+        """
+        Drop the oldest queued message of a class.
+
+        Params:
+            msgClass:   The message class.
+
+        Return:
+            True if a message was dropped, False if none is queued.
+        """
+        for index, queued in enumerate(self._queue):
+            if type(queued) is msgClass:
+                del self._queue[index]
+                return True
+        return False
+
+    def put(self, msg: BaseMessage) -> bool:
+        """
+        Queue a message to publish, applying the policy of its class if
+        the queue is full.
+
+        Params:
+            msg:        The message.
+
+        Return:
+            True if the message was queued, False if it was dropped.
+        """
+        msgClass = type(msg)
+        policy = self.getPolicy(msgClass)
+        with self._cond:
+            if len(self._queue) >= self._maxSize:
+                if policy == self.BLOCK:
+                    if not self._cond.wait_for(lambda: len(self._queue) <
+                                               self._maxSize,
+                                               self._blockTimeout):
+                        self._count(msgClass, self.REJECTED_COUNT)
+                        raise PublishQueueFull(msgClass.__name__)
+                elif policy == self.REJECT:
+                    self._count(msgClass, self.REJECTED_COUNT)
+                    raise PublishQueueFull(msgClass.__name__)
+                elif policy == self.DROP_OLDEST and \
+                        self._dropOldest(msgClass):
+                    self._count(msgClass, self.DROPPED_COUNT)
+                else:
+                    self._count(msgClass, self.DROPPED_COUNT)
+                    return False
+            self._queue.append(msg)
+            self._count(msgClass, self.QUEUED_COUNT)
+            self._cond.notify_all()
+        return True
+
+    def drain(self, maxCount: int = None) -> int:
+        """
+        Publish the queued messages while the client is ready and the
+        publications in flight are below the maximum.
+
+        Params:
+            maxCount:   The maximum number of messages to publish.
+                        Default: None, no limit.
+
+        Return:
+            The number of published messages, failed publications
+            excluded.
+        """
+        sent = 0
+        while (maxCount is None or sent < maxCount) and self._isReady():
+            with self._cond:
+                if not self._queue:
+                    break
+                msg = self._queue.popleft()
+                self._cond.notify_all()
+            try:
+                self._publish(msg)
+            except Exception as e:
+                with self._cond:
+                    self._count(type(msg), self.DROPPED_COUNT)
+                if self._onError is not None:
+                    self._onError(msg, e)
+                continue
+            with self._cond:
+                self._count(type(msg), self.SENT_COUNT)
+            sent += 1
+        return sent
+
+    def _run(self) -> None:
+        """
+        The sender thread loop.
+        """
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or
+                                    not self._running, self._pollPeriod)
+                if not self._running:
+                    return
+            self.drain()
+            if self._queue and not self._isReady():
+                with self._cond:
+                    self._cond.wait_for(lambda: not self._running,
+                                        self._pollPeriod)
+
+    def start(self) -> None:
+        """
+        Start the sender thread.
+        """
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run,
+                                        name='PublishQueue', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the sender thread, the queued messages being kept.
+        """
+        if self._thread is None:
+            return
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join()
+        self._thread = None
+
+    def getDepth(self) -> int:
+        """
+        Get the number of queued messages.
+
+        Return:
+            The queue depth.
+        """
+        return len(self._queue)
+
+    def getStats(self, msgClass: type = None) -> dict:
+        """
+        Get the queue counts.
+
+        Params:
+            msgClass:   The message class. Default: None, sum every class.
+
+        Return:
+            The queued, sent, dropped and rejected message counts.
+        """
+        with self._cond:
+            if msgClass is not None:
+                counts = self._counts.get(msgClass, (0, 0, 0, 0))
+            else:
+                counts = [sum(c[i] for c in self._counts.values())
+                          for i in range(4)]
+        return {self.QUEUED_KEY: counts[self.QUEUED_COUNT],
+                self.SENT_KEY: counts[self.SENT_COUNT],
+                self.DROPPED_KEY: counts[self.DROPPED_COUNT],
+                self.REJECTED_KEY: counts[self.REJECTED_COUNT]}
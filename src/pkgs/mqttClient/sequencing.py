@@ -0,0 +1,196 @@
+import time
+
+from ..messages import BaseMessage
+
+
+class SeqStamper:
+    """
+    The sending side of the message sequencing. Each topic gets its own
+    monotonic sequence number, starting at 1.
+    """
+    def __init__(self, clock=time.time) -> None:
+        """
+        Constructor.
+
+        Params:
+            clock:      The wall clock, in seconds since the epoch.
+                        Default: time.time.
+        """
+        self._clock = clock
+        self._seqs = {}
+
+    def stamp(self, msg: BaseMessage) -> BaseMessage:
+        """
+        Stamp a message with the next sequence number of its topic and
+        the current time.
+
+        Params:
+            msg:        The message to stamp.
+
+        Return:
+            The stamped message, to be published.
+        """
+        topic = msg.getTopic()
+        seq = self._seqs.get(topic, 0) + 1
+        self._seqs[topic] = seq
+        msg.stamp(seq, self._clock())
+        return msg
+
+
+class StaleFilter:
+    """
+    The receiving side of the message sequencing. It wraps a message
+    handler, dropping the messages older than the last one received on
+    their topic or sent more than the maximum age ago, and keeps the
+    one-way latency statistics of each unit. A sequence number going
+    back with a later send time, or by more than the reset gap, is taken
+    as a sender restart and passed. Latencies rely on the sender and
+    receiver clocks being synchronized.
+    """
+    PASSED_KEY = 'passed'
+    OUT_OF_ORDER_KEY = 'out of order'
+    STALE_KEY = 'stale'
+    COUNT_KEY = 'count'
+    MIN_KEY = 'min'
+    MAX_KEY = 'max'
+    MEAN_KEY = 'mean'
+    LAST_KEY = 'last'
+
+    def __init__(self, handler, maxAgeMs: float = None,
+                 resetGap: int = 1000, clock=time.time) -> None:
+        """
+        Constructor.
+
+        Params:
+            handler:    The handler of the messages that are not dropped.
+            maxAgeMs:   The maximum message age, in milliseconds.
+                        Default: None, no maximum age.
+            resetGap:   The sequence number drop from which the sender is
+                        considered restarted rather than out of order.
+                        Default: 1000.
+            clock:      The wall clock, in seconds since the epoch.
+                        Default: time.time.
+        """
+        self._handler = handler
+        self._maxAgeMs = maxAgeMs
+        self._resetGap = resetGap
+        self._clock = clock
+        self._lastSeqs = {}
+        self._counts = {}
+        self._latencies = {}
+        self.__name__ = f"StaleFilter({getattr(handler, '__name__', '')})"
+
+    def __call__(self, msg: BaseMessage) -> bool:
+        """
+        Give the message to the handler unless it is out of order or stale.
+
+        Params:
+            msg:        The received message.
+
+        Return:
+            True if the message was handled, False if it was dropped.
+        """
+        unit = msg.getUnit()
+        counts = self._counts.get(unit)
+        if counts is None:
+            counts = self._counts[unit] = [0, 0, 0]
+        seq = msg.getSeq()
+        sentAt = msg.getSentAt()
+        if seq is not None:
+            topic = msg.getTopic()
+            last = self._lastSeqs.get(topic)
+            if last is not None and last[0] >= seq and \
+                    last[0] - seq <= self._resetGap and \
+                    not self._isRestart(sentAt, last[1]):
+                counts[1] += 1
+                return False
+            self._lastSeqs[topic] = (seq, sentAt)
+        if sentAt is not None:
+            latency = (self._clock() - sentAt) * 1000
+            self._addLatency(unit, latency)
+            if self._maxAgeMs is not None and latency > self._maxAgeMs:
+                counts[2] += 1
+                return False
+        counts[0] += 1
+        self._handler(msg)
+        return True
+
+    @staticmethod
+    def _isRestart(sentAt: float, lastSentAt: float) -> bool:
+        """
+        Check if a message with a sequence number not above the last one
+        comes from a restarted sender, its sequence starting over: it was
+        then sent after the last message, unlike a reordered or duplicated
+        message.
+
+        Params:
+            sentAt:     The message send time.
+            lastSentAt: The send time of the last message of the topic.
+
+        Return:
+            True if the sender restarted, False otherwise.
+        """
+        return sentAt is not None and lastSentAt is not None and \
+            sentAt > lastSentAt
+
+    def _addLatency(self, unit: str, latency: float) -> None:
+        """
+        Add a latency sample to the unit statistics.
+
+        Params:
+            unit:       The unit ID.
+            latency:    The latency, in milliseconds.
+        """
+        stats = self._latencies.get(unit)
+        if stats is None:
+            self._latencies[unit] = [1, latency, latency, latency, latency]
+            return
+        stats[0] += 1
+        if latency < stats[1]:
+            stats[1] = latency
+        if latency > stats[2]:
+            stats[2] = latency
+        stats[3] += (latency - stats[3]) / stats[0]
+        stats[4] = latency
+
+    def getStats(self, unit: str) -> dict:
+        """
+        Get the filtering counts of a unit.
+
+        Params:
+            unit:       The unit ID.
+
+        Return:
+            The passed, out of order and stale message counts.
+        """
+        counts = self._counts.get(unit, (0, 0, 0))
+        return {self.PASSED_KEY: counts[0],
+                self.OUT_OF_ORDER_KEY: counts[1],
+                self.STALE_KEY: counts[2]}
+
+    def getLatencyStats(self, unit: str) -> dict:
+        """
+        Get the one-way latency statistics of a unit.
+
+        Params:
+            unit:       The unit ID.
+
+        Return:
+            The sample count and the min, max, mean and last latencies,
+            in milliseconds, None if no stamped message was received.
+        """
+        stats = self._latencies.get(unit)
+        if stats is None:
+            return None
+        return {self.COUNT_KEY: stats[0], self.MIN_KEY: stats[1],
+                self.MAX_KEY: stats[2], self.MEAN_KEY: stats[3],
+                self.LAST_KEY: stats[4]}
+
+    def getUnits(self) -> tuple:
+        """
+        Get the units from which messages were received.
+
+        Return:
+            The unit IDs.
+        """
+        return tuple(self._counts)
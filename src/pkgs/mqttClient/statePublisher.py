@@ -0,0 +1,128 @@
+import time
+
+from . import client
+from ..messages import UnitWhldStateMsg
+
+
+class WhldStatePublisher:
+    """
+    The wheeled unit state publisher. A unit state is only published
+    when a modifier moved by at least the deadband since the last
+    published state, or when the maximum interval expired so receivers
+    still get refreshed.
+    """
+    PUBLISHED_KEY = 'published'
+    SUPPRESSED_KEY = 'suppressed'
+
+    def __init__(self, deadband: float = 0.01, maxInterval: float = 1.0,
+                 publishFn=None, clock=time.monotonic) -> None:
+        """
+        Constructor.
+
+        Params:
+            deadband:       The minimum modifier change to publish.
+                            Default: 0.01.
+            maxInterval:    The maximum time, in seconds, between two
+                            publications of a unit state. Default: 1.0.
+            publishFn:      The function publishing a message.
+                            Default: None, use the mqttClient publish.
+            clock:          The monotonic clock, in seconds.
+                            Default: time.monotonic.
+        """
+        self._deadband = deadband
+        self._maxInterval = maxInterval
+        self._publish = publishFn if publishFn is not None \
+            else client.publish
+        self._clock = clock
+        self._msgs = {}
+        self._lastSent = {}
+        self._counts = {}
+
+    def update(self, unit: str, steering: float, throttle: float) -> bool:
+        """
+        Update a unit state, publishing it if needed.
+
+        Params:
+            unit:       The unit ID.
+            steering:   The steering state.
+            throttle:   The throttle state.
+
+        Return:
+            True if the state was published, False if it was suppressed.
+        """
+        now = self._clock()
+        lastSent = self._lastSent.get(unit)
+        if lastSent is not None and \
+                abs(steering - lastSent[0]) < self._deadband and \
+                abs(throttle - lastSent[1]) < self._deadband and \
+                now - lastSent[2] < self._maxInterval:
+            self._counts[unit][1] += 1
+            return False
+        self._send(unit, steering, throttle, now)
+        return True
+
+    def refresh(self) -> int:
+        """
+        Republish the units whose maximum interval expired. To be called
+        periodically when the states are not updated continuously.
+
+        Return:
+            The number of published states.
+        """
+        now = self._clock()
+        expired = [(unit, lastSent) for unit, lastSent
+                   in self._lastSent.items()
+                   if now - lastSent[2] >= self._maxInterval]
+        for unit, lastSent in expired:
+            self._send(unit, lastSent[0], lastSent[1], now)
+        return len(expired)
+
+    def _send(self, unit: str, steering: float, throttle: float,
+              now: float) -> None:
+        """
+        Publish a unit state.
+
+        Params:
+            unit:       The unit ID.
+            steering:   The steering state.
+            throttle:   The throttle state.
+            now:        The current time.
+        """
+        msg = self._msgs.get(unit)
+        if msg is None:
+            msg = self._msgs[unit] = UnitWhldStateMsg(unit)
+            self._counts[unit] = [0, 0]
+        msg.setSteering(steering)
+        msg.setThrottle(throttle)
+        self._publish(msg)
+        self._lastSent[unit] = (steering, throttle, now)
+        self._counts[unit][0] += 1
+
+    def forget(self, unit: str) -> None:
+        """
+        Forget a unit, its next state being published unconditionally.
+
+        Params:
+            unit:       The unit ID.
+        """
+        self._msgs.pop(unit, None)
+        self._lastSent.pop(unit, None)
+        self._counts.pop(unit, None)
+
+    def getStats(self, unit: str = None) -> dict:
+        """
+        Get the publish counts.
+
+        Params:
+            unit:       The unit ID. Default: None, sum every unit.
+
+        Return:
+            The published and suppressed state counts.
+        """
+        if unit is not None:
+            counts = self._counts.get(unit, (0, 0))
+        else:
+            counts = [sum(c[0] for c in self._counts.values()),
+                      sum(c[1] for c in self._counts.values())]
+        return {self.PUBLISHED_KEY: counts[0],
+                self.SUPPRESSED_KEY: counts[1]}
@@ -0,0 +1,134 @@
+import threading
+
+import paho.mqtt.client as mqtt
+
+
+class SubAck:
+    """
+    The acknowledgement of a multi-topic subscribe or unsubscribe
+    request, sent as a single packet. It completes when the broker
+    acknowledges the whole request, the SUBACK giving the granted QoS
+    of each topic (FAILURE when refused). An UNSUBACK carries no result
+    per topic. A request paho could not send completes at once with its
+    result code and no granted QoS.
+    """
+    FAILURE = 0x80
+
+    def __init__(self, topics: tuple, mid: int = None,
+                 rc: int = mqtt.MQTT_ERR_SUCCESS) -> None:
+        """
+        Constructor.
+
+        Params:
+            topics:     The topics of the request.
+            mid:        The message id of the request. Default: None.
+            rc:         The paho result code of the request.
+                        Default: success.
+        """
+        self._topics = tuple(topics)
+        self._mid = mid
+        self._rc = rc
+        self._granted = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    def getTopics(self) -> tuple:
+        """
+        Get the topics of the request.
+
+        Return:
+            The topics.
+        """
+        return self._topics
+
+    def getMid(self) -> int:
+        """
+        Get the message id of the request.
+
+        Return:
+            The message id, None if the request was not sent.
+        """
+        return self._mid
+
+    def getRc(self) -> int:
+        """
+        Get the paho result code of the request.
+
+        Return:
+            The result code.
+        """
+        return self._rc
+
+    def complete(self, grantedQos: tuple = None) -> None:
+        """
+        Complete the request and call its done callbacks.
+
+        Params:
+            grantedQos: The granted QoS of each topic, in the request
+                        order. Default: None, no result per topic.
+        """
+        with self._lock:
+            if grantedQos is not None:
+                self._granted = dict(zip(self._topics, grantedQos))
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def addDoneCallback(self, callback) -> None:
+        """
+        Add a function called with the acknowledgement once completed,
+        at once if already completed.
+
+        Params:
+            callback:   The function.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def isDone(self) -> bool:
+        """
+        Check if the request is completed.
+
+        Return:
+            True if the request is completed, False otherwise.
+        """
+        return self._event.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Wait for the request to complete.
+
+        Params:
+            timeout:    The maximum wait time, in seconds.
+                        Default: None, wait forever.
+
+        Return:
+            True if the request is completed, False on timeout.
+        """
+        return self._event.wait(timeout)
+
+    def getGrantedQos(self) -> dict:
+        """
+        Get the granted QoS of each topic.
+
+        Return:
+            The granted QoS by topic, None until a SUBACK is received.
+        """
+        return self._granted
+
+    def getFailedTopics(self) -> list:
+        """
+        Get the topics whose subscription was refused.
+
+        Return:
+            The refused topics.
+        """
+        if self._granted is None:
+            return []
+        return [topic for topic, qos in self._granted.items()
+                if qos == self.FAILURE]
@@ -0,0 +1,142 @@
+class _TrieNode:
+    """
+    A topic trie node.
+    """
+    __slots__ = ('children', 'values')
+
+    def __init__(self) -> None:
+        """
+        Constructor.
+        """
+        self.children = {}
+        self.values = ()
+
+
+class TopicTrie:
+    """
+    An index of MQTT topic filters, including the '+' and '#' wildcards,
+    matching a topic in time proportional to its depth rather than to
+    the number of filters.
+    """
+    SEPARATOR = '/'
+    SINGLE_LEVEL = '+'
+    MULTI_LEVEL = '#'
+
+    def __init__(self) -> None:
+        """
+        Constructor.
+        """
+        self._root = _TrieNode()
+        self._count = 0
+
+    def __len__(self) -> int:
+        """
+        Get the number of indexed values.
+
+        Return:
+            The number of indexed values.
+        """
+        return self._count
+
+    def add(self, topicFilter: str, value: object) -> None:
+        """
+        Add a value for a topic filter.
+
+        Params:
+            topicFilter:    The topic filter.
+            value:          The value to index.
+        """
+        node = self._root
+        for level in topicFilter.split(self.SEPARATOR):
+            child = node.children.get(level)
+            if child is None:
+                child = node.children[level] = _TrieNode()
+            node = child
+        node.values = node.values + (value,)
+        self._count += 1
+
+    def remove(self, topicFilter: str, value: object = None) -> None:
+        """
+        Remove a value, or every value, of a topic filter.
+
+        Params:
+            topicFilter:    The topic filter.
+            value:          The value to remove. Default: None, remove
+                            every value of the filter.
+        """
+        path = [self._root]
+        levels = topicFilter.split(self.SEPARATOR)
+        for level in levels:
+            node = path[-1].children.get(level)
+            if node is None:
+                return
+            path.append(node)
+        node = path[-1]
+        count = len(node.values)
+        if value is None:
+            node.values = ()
+        else:
+            node.values = tuple(v for v in node.values if v != value)
+        self._count -= count - len(node.values)
+        for level, parent in zip(reversed(levels), reversed(path[:-1])):
+            child = parent.children[level]
+            if child.values or child.children:
+                break
+            del parent.children[level]
+
+    def get(self, topicFilter: str) -> tuple:
+        """
+        Get the values of a topic filter, without wildcard matching.
+
+        Params:
+            topicFilter:    The topic filter.
+
+        Return:
+            The values of the filter.
+        """
+        node = self._root
+        for level in topicFilter.split(self.SEPARATOR):
+            node = node.children.get(level)
+            if node is None:
+                return ()
+        return node.values
+
+    def match(self, topic: str) -> list:
+        """
+        Get the values of every filter matching a topic. As per the MQTT
+        specification, wildcards do not match the first level of topics
+        starting with '$'.
+
+        Params:
+            topic:          The topic.
+
+        Return:
+            The matching values.
+        """
+        matches = []
+        nodes = (self._root,)
+        wildcards = not topic.startswith('$')
+        for level in topic.split(self.SEPARATOR):
+            nextNodes = []
+            for node in nodes:
+                children = node.children
+                child = children.get(level)
+                if child is not None:
+                    nextNodes.append(child)
+                if wildcards:
+                    child = children.get(self.SINGLE_LEVEL)
+                    if child is not None:
+                        nextNodes.append(child)
+                    child = children.get(self.MULTI_LEVEL)
+                    if child is not None:
+                        matches.extend(child.values)
+            if not nextNodes:
+                return matches
+            nodes = nextNodes
+            wildcards = True
+        for node in nodes:
+            matches.extend(node.values)
+            child = node.children.get(self.MULTI_LEVEL)
+            if child is not None:
+                matches.extend(child.values)
+        return matches
@@ -0,0 +1,317 @@
+import mmap
+import os
+import struct
+import threading
+import time
+
+from . import client
+from .exceptions import InvalidReplaySpeed, InvalidTrafficLog
+from .msgRegistry import MsgRegistry
+
+MAGIC = b'RCTL\x01'
+RECORD_HEADER = struct.Struct('<dHBI')
+TOPIC_HEADER = struct.Struct('<H')
+NEW_TOPIC = 0x80
+RETAIN_FLAG = 0x01
+QOS_SHIFT = 1
+INLINE_TOPIC = 0xFFFF
+
+
+def _readRecords(buf, topics: list):
+    """
+    Read the records of a traffic log, stopping at a torn record.
+
+    Params:
+        buf:        The log content (bytes or mmap), starting with its
+                    magic.
+        topics:     The interned topics table, filled while reading.
+
+    Return:
+        A generator of (arrival time, topic, qos, retain, payload start,
+        payload end) tuples, the payload end being the record end.
+    """
+    offset = len(MAGIC)
+    size = len(buf)
+    while offset + RECORD_HEADER.size <= size:
+        arrival, index, flags, payloadLen = \
+            RECORD_HEADER.unpack_from(buf, offset)
+        pos = offset + RECORD_HEADER.size
+        if flags & NEW_TOPIC or index == INLINE_TOPIC:
+            if pos + TOPIC_HEADER.size > size:
+                return
+            topicLen, = TOPIC_HEADER.unpack_from(buf, pos)
+            pos += TOPIC_HEADER.size
+            if pos + topicLen > size:
+                return
+            topic = buf[pos:pos + topicLen].decode()
+            pos += topicLen
+            if flags & NEW_TOPIC:
+                topics.append(topic)
+        elif index < len(topics):
+            topic = topics[index]
+        else:
+            return
+        offset = pos + payloadLen
+        if offset > size:
+            return
+        yield arrival, topic, (flags >> QOS_SHIFT) & 0x03, \
+            bool(flags & RETAIN_FLAG), pos, offset
+
+
+class TrafficRecorder:
+    """
+    The received traffic recorder. Hooked on the client receive path,
+    it appends the topic, QoS, retain flag, payload and arrival time of
+    each received message to a compact binary log: a fixed 15 bytes
+    record header, each topic being written once and then referred to
+    by its index (up to 65535 topics, the next ones being written in
+    each record). Recording to an existing log appends to it, a torn
+    record at its end being discarded.
+    """
+    def __init__(self, path: str, mqttClient: client.MqttClient = None,
+                 clock=time.time) -> None:
+        """
+        Constructor.
+
+        Params:
+            path:       The log file path.
+            mqttClient: The MQTT client. Default: None, use the default
+                        client.
+            clock:      The arrival time clock, in seconds.
+                        Default: time.time.
+        """
+        self._path = path
+        self._client = mqttClient
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._topics = {}
+        self._count = 0
+        self._file = self._open()
+
+    def _open(self):
+        """
+        Open the log for appending, interning its topics again.
+
+        Return:
+            The log file.
+        """
+        path = self._path
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            logFile = open(path, 'wb')
+            logFile.write(MAGIC)
+            return logFile
+        logFile = open(path, 'r+b')
+        with mmap.mmap(logFile.fileno(), 0,
+                       access=mmap.ACCESS_READ) as buf:
+            if buf[:len(MAGIC)] != MAGIC:
+                logFile.close()
+                raise InvalidTrafficLog(path)
+            topics = []
+            end = len(MAGIC)
+            for record in _readRecords(buf, topics):
+                end = record[-1]
+        self._topics = {topic: index for index, topic in enumerate(topics)}
+        logFile.truncate(end)
+        logFile.seek(0, os.SEEK_END)
+        return logFile
+
+    def _getClient(self) -> client.MqttClient:
+        """
+        Get the MQTT client.
+
+        Return:
+            The MQTT client, the default one if none was given.
+        """
+        if self._client is None:
+            return client.getDefaultClient()
+        return self._client
+
+    def start(self) -> None:
+        """
+        Start recording the messages received by the client.
+        """
+        self._getClient().addReceiveHook(self._onReceive)
+
+    def stop(self) -> None:
+        """
+        Stop recording, the log being flushed.
+        """
+        self._getClient().removeReceiveHook(self._onReceive)
+        with self._lock:
+            self._file.flush()
+
+    def _onReceive(self, msg) -> None:
+        """
+        The receive hook.
+
+        Params:
+            msg:        The received paho message.
+        """
+        self.record(msg.topic, msg.payload, msg.qos, msg.retain)
+
+    def record(self, topic: str, payload, qos: int = 0,
+               retain: bool = False, arrival: float = None) -> None:
+        """
+        Append a message to the log.
+
+        Params:
+            topic:      The message topic.
+            payload:    The message payload (bytes or str).
+            qos:        The message QoS. Default: 0.
+            retain:     The message retain flag. Default: False.
+            arrival:    The arrival time, in seconds. Default: None, the
+                        recording time.
+        """
+        if arrival is None:
+            arrival = self._clock()
+        if isinstance(payload, str):
+            payload = payload.encode()
+        flags = (qos & 0x03) << QOS_SHIFT
+        if retain:
+            flags |= RETAIN_FLAG
+        with self._lock:
+            index = self._topics.get(topic)
+            if index is None:
+                topicBytes = topic.encode()
+                index = len(self._topics)
+                if index < INLINE_TOPIC:
+                    self._topics[topic] = index
+                    flags |= NEW_TOPIC
+                else:
+                    index = INLINE_TOPIC
+                header = RECORD_HEADER.pack(arrival, index, flags,
+                                            len(payload)) + \
+                    TOPIC_HEADER.pack(len(topicBytes)) + topicBytes
+            else:
+                header = RECORD_HEADER.pack(arrival, index, flags,
+                                            len(payload))
+            self._file.write(header)
+            self._file.write(payload)
+            self._count += 1
+
+    def getCount(self) -> int:
+        """
+        Get the number of messages recorded since opening.
+
+        Return:
+            The number of recorded messages.
+        """
+        return self._count
+
+    def close(self) -> None:
+        """
+        Close the log.
+        """
+        with self._lock:
+            self._file.close()
+
+
+class TrafficReplayer:
+    """
+    The recorded traffic replayer. The log is read through a memory
+    map and its messages republished as recorded, payload bytes
+    included, at the recorded pace, a multiple of it, or as fast as
+    possible. The publication times follow the recorded arrival times
+    from the replay start, so the pauses do not accumulate the
+    publishing time drift. The messages are published through the
+    client publishRaw, so they are stored in its disk buffer as
+    published messages would be. When replaying selected units, the
+    message registry gives the unit of each message from its topic,
+    without decoding the payload, the messages of topics without a
+    registered class being skipped and counted.
+    """
+    def __init__(self, path: str, registry: MsgRegistry = None) -> None:
+        """
+        Constructor.
+
+        Params:
+            path:       The log file path.
+            registry:   The message registry giving the message classes
+                        of the topics, to select the units. Default: None,
+                        a registry of the default message classes.
+        """
+        self._path = path
+        self._registry = MsgRegistry() if registry is None else registry
+        self._skipped = 0
+
+    def records(self):
+        """
+        Read the recorded messages.
+
+        Return:
+            A generator of (arrival time, topic, qos, retain, payload)
+            tuples, in recording order.
+        """
+        with open(self._path, 'rb') as logFile:
+            if os.fstat(logFile.fileno()).st_size < len(MAGIC):
+                raise InvalidTrafficLog(self._path)
+            with mmap.mmap(logFile.fileno(), 0,
+                           access=mmap.ACCESS_READ) as buf:
+                if buf[:len(MAGIC)] != MAGIC:
+                    raise InvalidTrafficLog(self._path)
+                for arrival, topic, qos, retain, start, end in \
+                        _readRecords(buf, []):
+                    yield arrival, topic, qos, retain, buf[start:end]
+
+    def replay(self, speed: float = 1.0, units: tuple = None,
+               mqttClient: client.MqttClient = None, publishFn=None,
+               sleepFn=time.sleep, clock=time.monotonic) -> int:
+        """
+        Replay the recorded messages.
+
+        Params:
+            speed:      The replay speed, above 0, 2.0 replaying twice as
+                        fast as recorded. Default: 1.0. None to replay as
+                        fast as possible.
+            units:      The IDs of the units whose messages are replayed.
+                        Default: None, all of them.
+            mqttClient: The MQTT client. Default: None, use the default
+                        client.
+            publishFn:  The function publishing a message, called with
+                        its topic, payload, QoS and retain flag.
+                        Default: None, the client publishRaw.
+            sleepFn:    The sleep function, in seconds.
+                        Default: time.sleep.
+            clock:      The monotonic clock, in seconds.
+                        Default: time.monotonic.
+
+        Return:
+            The number of replayed messages.
+        """
+        if speed is not None and not speed > 0:
+            raise InvalidReplaySpeed(speed)
+        if publishFn is None:
+            if mqttClient is None:
+                mqttClient = client.getDefaultClient()
+            publishFn = mqttClient.publishRaw
+        units = None if units is None else frozenset(units)
+        self._skipped = 0
+        count = 0
+        origin = None
+        for arrival, topic, qos, retain, payload in self.records():
+            if units is not None:
+                msgClass = self._registry.getMsgClass(topic)
+                if msgClass is None:
+                    self._skipped += 1
+                    continue
+                if msgClass.getUnitFromTopic(topic) not in units:
+                    continue
+            if speed is not None:
+                if origin is None:
+                    origin = (arrival, clock())
+                delay = origin[1] + (arrival - origin[0]) / speed - clock()
+                if delay > 0:
+                    sleepFn(delay)
+            publishFn(topic, payload, qos, retain)
+            count += 1
+        return count
+
+    def getSkippedCount(self) -> int:
+        """
+        Get the number of messages skipped by the last replay of selected
+        units because no message class is registered for their topic.
+
+        Return:
+            The number of skipped messages.
+        """
+        return self._skipped
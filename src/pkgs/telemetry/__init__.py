@@ -0,0 +1,2 @@
+from .ringBuffer import RingBuffer                  # noqa: F401
+from .whldTelemetry import WhldTelemetry            # noqa: F401
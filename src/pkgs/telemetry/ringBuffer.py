@@ -0,0 +1,142 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    The fixed size ring buffer of timestamped samples, preallocated as
+    a single NumPy array with one row per field (the timestamp first)
+    so no Python object is kept per sample. The oldest samples are
+    overwritten once full. The timestamps must not decrease, so the
+    windows are found by binary search and returned as views whenever
+    they do not wrap around.
+    """
+    TIME_ROW = 0
+
+    def __init__(self, capacity: int, fields: int = 2) -> None:
+        """
+        Constructor.
+
+        Params:
+            capacity:   The maximum number of samples.
+            fields:     The number of fields of a sample, besides its
+                        timestamp. Default: 2.
+        """
+        self._data = np.zeros((fields + 1, capacity))
+        self._capacity = capacity
+        self._head = 0
+        self._count = 0
+
+    def getCapacity(self) -> int:
+        """
+        Get the maximum number of samples.
+
+        Return:
+            The buffer capacity.
+        """
+        return self._capacity
+
+    def getCount(self) -> int:
+        """
+        Get the number of samples.
+
+        Return:
+            The number of samples kept.
+        """
+        return self._count
+
+    def clear(self) -> None:
+        """
+        Drop every sample.
+        """
+        self._head = 0
+        self._count = 0
+
+    def append(self, timestamp: float, *values: float) -> None:
+        """
+        Append a sample.
+
+        Params:
+            timestamp:  The sample timestamp, in seconds.
+            values:     The sample fields.
+        """
+        column = self._data[:, self._head]
+        column[0] = timestamp
+        column[1:] = values
+        self._head = (self._head + 1) % self._capacity
+        if self._count < self._capacity:
+            self._count += 1
+
+    def extend(self, samples: np.ndarray) -> None:
+        """
+        Append samples at once.
+
+        Params:
+            samples:    The samples, one row per field (the timestamp
+                        first) and one column per sample.
+        """
+        samples = np.asarray(samples)[:, -self._capacity:]
+        count = samples.shape[1]
+        first = min(count, self._capacity - self._head)
+        self._data[:, self._head:self._head + first] = samples[:, :first]
+        self._data[:, :count - first] = samples[:, first:]
+        self._head = (self._head + count) % self._capacity
+        self._count = min(self._count + count, self._capacity)
+
+    def _segments(self) -> tuple:
+        """
+        Get the samples in chronological order.
+
+        Return:
+            The older and newer segments of the samples, as views.
+        """
+        if self._count < self._capacity:
+            return self._data[:, :self._count], self._data[:, :0]
+        return self._data[:, self._head:], self._data[:, :self._head]
+
+    def getSamples(self) -> np.ndarray:
+        """
+        Get every sample in chronological order.
+
+        Return:
+            The samples, one row per field (the timestamp first).
+        """
+        return self.since(-np.inf)
+
+    def since(self, start: float) -> np.ndarray:
+        """
+        Get the samples from a time, in chronological order.
+
+        Params:
+            start:      The start time, in seconds.
+
+        Return:
+            The samples, one row per field (the timestamp first), a view
+            of the buffer if the window does not wrap around.
+        """
+        older, newer = self._segments()
+        idx = np.searchsorted(older[self.TIME_ROW], start)
+        if idx == older.shape[1]:
+            idx = np.searchsorted(newer[self.TIME_ROW], start)
+            return newer[:, idx:]
+        if newer.shape[1] == 0:
+            return older[:, idx:]
+        return np.concatenate((older[:, idx:], newer), axis=1)
+
+    def last(self, count: int) -> np.ndarray:
+        """
+        Get the latest samples, in chronological order.
+
+        Params:
+            count:      The maximum number of samples.
+
+        Return:
+            The samples, one row per field (the timestamp first).
+        """
+        count = min(count, self._count)
+        if count == 0:
+            return self._data[:, :0]
+        start = self._head - count
+        if start >= 0:
+            return self._data[:, start:self._head]
+        return np.concatenate((self._data[:, start:],
+                               self._data[:, :self._head]), axis=1)
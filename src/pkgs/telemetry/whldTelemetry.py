@@ -0,0 +1,202 @@
+import time
+
+import numpy as np
+
+from .ringBuffer import RingBuffer
+from ..messages import UnitWhldStateMsg
+from ..mqttClient import client
+from ..mqttClient.subAck import SubAck
+
+
+class WhldTelemetry:
+    """
+    The wheeled unit state history. The steering and throttle of each
+    unit are kept with their reception time in a preallocated ring
+    buffer, so the history neither grows nor keeps message objects,
+    and the window queries (mean, max, resampling) are vectorized.
+    The samples rows are the timestamp, the steering and the throttle.
+    """
+    TIME_ROW = 0
+    STEERING_ROW = 1
+    THROTTLE_ROW = 2
+
+    def __init__(self, capacity: int = 1024,
+                 mqttClient: client.MqttClient = None,
+                 clock=time.monotonic) -> None:
+        """
+        Constructor.
+
+        Params:
+            capacity:   The number of samples kept per unit.
+                        Default: 1024.
+            mqttClient: The MQTT client. Default: None, use the default
+                        client.
+            clock:      The clock timestamping the samples, in seconds.
+                        Default: time.monotonic.
+        """
+        self._capacity = capacity
+        self._client = mqttClient
+        self._clock = clock
+        self._buffers = {}
+
+    def _getClient(self) -> client.MqttClient:
+        """
+        Get the MQTT client.
+
+        Return:
+            The MQTT client, the default one if none was given.
+        """
+        if self._client is None:
+            return client.getDefaultClient()
+        return self._client
+
+    def start(self) -> SubAck:
+        """
+        Record the wheeled unit states.
+
+        Return:
+            The subscription acknowledgement.
+        """
+        mqttClient = self._getClient()
+        mqttClient.registerMsgHandler(UnitWhldStateMsg, self.update)
+        return mqttClient.subscribe([{'topic': UnitWhldStateMsg.TOPIC_FILTER,
+                                      'qos': 0}])
+
+    def stop(self) -> SubAck:
+        """
+        Stop recording the wheeled unit states, the history being kept.
+
+        Return:
+            The unsubscription acknowledgement.
+        """
+        mqttClient = self._getClient()
+        mqttClient.unregisterMsgHandler(UnitWhldStateMsg, self.update)
+        return mqttClient.unsubscribe([{'topic': UnitWhldStateMsg.TOPIC_FILTER,
+                                        'qos': 0}])
+
+    def update(self, msg: UnitWhldStateMsg) -> None:
+        """
+        Record a wheeled unit state.
+
+        Params:
+            msg:        The wheeled unit state message.
+        """
+        self.record(msg.getUnit(), msg.getSteering(), msg.getThrottle())
+
+    def record(self, unit: str, steering: float, throttle: float,
+               timestamp: float = None) -> None:
+        """
+        Record a unit state sample.
+
+        Params:
+            unit:       The unit ID.
+            steering:   The steering state.
+            throttle:   The throttle state.
+            timestamp:  The sample time, in seconds. Default: None, now.
+        """
+        buffer = self._buffers.get(unit)
+        if buffer is None:
+            buffer = self._buffers[unit] = RingBuffer(self._capacity)
+        buffer.append(self._clock() if timestamp is None else timestamp,
+                      steering, throttle)
+
+    def getUnits(self) -> list:
+        """
+        Get the recorded units.
+
+        Return:
+            The IDs of the units with a history.
+        """
+        return list(self._buffers)
+
+    def getBuffer(self, unit: str) -> RingBuffer:
+        """
+        Get the history of a unit.
+
+        Params:
+            unit:       The unit ID.
+
+        Return:
+            The ring buffer of the unit, None if not recorded.
+        """
+        return self._buffers.get(unit)
+
+    def getWindow(self, unit: str, seconds: float = None) -> np.ndarray:
+        """
+        Get the latest samples of a unit.
+
+        Params:
+            unit:       The unit ID.
+            seconds:    The window duration. Default: None, the whole
+                        history.
+
+        Return:
+            The samples in chronological order, one row per field (time,
+            steering, throttle), empty if the unit is not recorded.
+        """
+        buffer = self._buffers.get(unit)
+        if buffer is None:
+            return np.zeros((3, 0))
+        if seconds is None:
+            return buffer.getSamples()
+        return buffer.since(self._clock() - seconds)
+
+    def getMean(self, unit: str, seconds: float = None) -> np.ndarray:
+        """
+        Get the mean state of a unit over a window.
+
+        Params:
+            unit:       The unit ID.
+            seconds:    The window duration. Default: None, the whole
+                        history.
+
+        Return:
+            The mean steering and throttle, None if the window is empty.
+        """
+        window = self.getWindow(unit, seconds)
+        if window.shape[1] == 0:
+            return None
+        return window[self.STEERING_ROW:].mean(axis=1)
+
+    def getMax(self, unit: str, seconds: float = None) -> np.ndarray:
+        """
+        Get the maximum state of a unit over a window.
+
+        Params:
+            unit:       The unit ID.
+            seconds:    The window duration. Default: None, the whole
+                        history.
+
+        Return:
+            The maximum steering and throttle, None if the window is
+            empty.
+        """
+        window = self.getWindow(unit, seconds)
+        if window.shape[1] == 0:
+            return None
+        return window[self.STEERING_ROW:].max(axis=1)
+
+    def resample(self, unit: str, period: float,
+                 seconds: float = None) -> np.ndarray:
+        """
+        Resample the state of a unit over a window on a regular time
+        grid, by linear interpolation.
+
+        Params:
+            unit:       The unit ID.
+            period:     The resampling period, in seconds.
+            seconds:    The window duration. Default: None, the whole
+                        history.
+
+        Return:
+            The resampled states, one row per field (time, steering,
+            throttle), from the first sample of the window.
+        """
+        window = self.getWindow(unit, seconds)
+        if window.shape[1] == 0:
+            return window
+        times = window[self.TIME_ROW]
+        grid = np.arange(times[0], np.nextafter(times[-1], np.inf), period)
+        return np.vstack((grid,
+                          np.interp(grid, times, window[self.STEERING_ROW]),
+                          np.interp(grid, times, window[self.THROTTLE_ROW])))
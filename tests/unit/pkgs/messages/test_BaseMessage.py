@@ -1,12 +1,15 @@
 import json
 from unittest import TestCase
+from unittest.mock import patch
 
 import os
 import sys
 
 sys.path.append(os.path.abspath('./src'))
 
-from pkgs.messages import BaseMessage   # noqa: E402
+from pkgs.messages import BaseMessage, \
+    BinaryFormatNotSupported            # noqa: E402
+from pkgs.messages import serializer    # noqa: E402
 
 
 class TestBaseMessage(TestCase):
@@ -119,3 +122,289 @@ class TestBaseMessage(TestCase):
                                    'payload': self.testPayload})
         testResult = self.testMsg.toJson()
         self.assertEqual(testResult, expectedJson)
+
+    def test_toBinaryNotSupported(self):
+        """
+        The toBinary method must raise a BinaryFormatNotSupported exception
+        when the message has no binary format.
+        """
+        with self.assertRaises(BinaryFormatNotSupported):
+            self.testMsg.toBinary()
+
+    def test_fromBinaryNotSupported(self):
+        """
+        The fromBinary method must raise a BinaryFormatNotSupported exception
+        when the message has no binary format.
+        """
+        with self.assertRaises(BinaryFormatNotSupported):
+            self.testMsg.fromBinary(b'\x01\x00\x00')
+
+    def test_toWireJson(self):
+        """
+        The toWire method must return the JSON bytes when the class
+        wire format is JSON.
+        """
+        self.assertEqual(self.testMsg.toWire(), self.testMsg.toBytes())
+
+    def test_toWireBinary(self):
+        """
+        The toWire method must return the binary message when the class
+        wire format is binary.
+        """
+        expectedBin = b'binary message'
+        with patch.object(BaseMessage, 'WIRE_FORMAT',
+                          BaseMessage.BINARY_FORMAT), \
+                patch.object(BaseMessage, 'toBinary',
+                             return_value=expectedBin) as mockedToBinary:
+            testResult = self.testMsg.toWire()
+            mockedToBinary.assert_called_once()
+        self.assertEqual(testResult, expectedBin)
+
+    def test_fromWireJson(self):
+        """
+        The fromWire method must decode JSON payloads, as string or bytes.
+        """
+        expectedUnit = 'new unit'
+        expectedPayload = {'new payload key': 'new payload value'}
+        testJson = json.dumps({'unit id': expectedUnit,
+                               'payload': expectedPayload})
+        for testPayload in [testJson, testJson.encode()]:
+            self.testMsg._unit = None
+            self.testMsg._payload = None
+            self.testMsg.fromWire(testPayload)
+            self.assertEqual(expectedUnit, self.testMsg._unit)
+            self.assertEqual(expectedPayload, self.testMsg._payload)
+
+    def test_fromWireBinary(self):
+        """
+        The fromWire method must decode non JSON payloads as binary.
+        """
+        testPayload = b'\x01\x00\x00'
+        with patch.object(BaseMessage, 'fromBinary') as mockedFromBinary:
+            self.testMsg.fromWire(testPayload)
+            mockedFromBinary.assert_called_once_with(testPayload)
+
+    def test_fromWireEmpty(self):
+        """
+        The fromWire method must clear the payload and stamp of the
+        message for an empty payload, lazily or not.
+        """
+        for lazy in [False, True]:
+            self.testMsg.setPayload({'key': 'value'})
+            self.testMsg.stamp(1, 2.0)
+            self.testMsg.fromWire(b'', lazy=lazy)
+            self.assertIsNone(self.testMsg.getPayload())
+            self.assertIsNone(self.testMsg.getSeq())
+            self.assertEqual(self.testMsg.getUnit(), self.testUnit)
+
+    def test_toJsonCached(self):
+        """
+        The toJson method must encode the message only once while
+        its content does not change.
+        """
+        with patch('pkgs.messages.baseMsg.json.dumps',
+                   return_value='encoded') as mockedDumps:
+            firstResult = self.testMsg.toJson()
+            secondResult = self.testMsg.toJson()
+            mockedDumps.assert_called_once()
+        self.assertEqual(firstResult, secondResult)
+
+    def test_toWireBinaryCached(self):
+        """
+        The toWire method must pack the binary message only once while
+        its content does not change.
+        """
+        with patch.object(BaseMessage, 'WIRE_FORMAT',
+                          BaseMessage.BINARY_FORMAT), \
+                patch.object(BaseMessage, 'toBinary',
+                             return_value=b'binary') as mockedToBinary:
+            self.testMsg.toWire()
+            self.testMsg.toWire()
+            mockedToBinary.assert_called_once()
+
+    def test_clearCache(self):
+        """
+        The clearCache method must drop the cached encodings, the next
+        encoding being computed again.
+        """
+        testJson = self.testMsg.toJson()
+        self.testMsg.clearCache()
+        self.assertIsNone(self.testMsg._json)
+        self.assertIsNot(self.testMsg.toJson(), testJson)
+        self.assertEqual(self.testMsg.toJson(), testJson)
+
+    def test_setPayloadInvalidateCache(self):
+        """
+        The setPayload method must invalidate the cached encodings
+        when the payload changes.
+        """
+        expectedPayload = {'new payload key': 'new payload value'}
+        expectedJson = json.dumps({'unit id': self.testUnit,
+                                   'payload': expectedPayload})
+        self.testMsg.toJson()
+        self.testMsg.setPayload(expectedPayload)
+        self.assertIsNone(self.testMsg._json)
+        self.assertEqual(self.testMsg.toJson(), expectedJson)
+
+    def test_setPayloadSameKeepCache(self):
+        """
+        The setPayload method must keep the cached encodings
+        when the payload is unchanged.
+        """
+        self.testMsg.toJson()
+        self.testMsg.setPayload(dict(self.testPayload))
+        self.assertIsNotNone(self.testMsg._json)
+
+    def test_setPayloadSameObjectInvalidateCache(self):
+        """
+        The setPayload method must invalidate the cached encodings
+        when the current payload object is set back, as it might
+        have been modified in place.
+        """
+        self.testMsg.toJson()
+        self.testMsg.setPayload(self.testMsg.getPayload())
+        self.assertIsNone(self.testMsg._json)
+
+    def test_fromJsonInvalidateCache(self):
+        """
+        The fromJson method must invalidate the cached encodings.
+        """
+        testJson = json.dumps({'unit id': 'new unit', 'payload': {}})
+        self.testMsg.toJson()
+        self.testMsg.fromJson(testJson)
+        self.assertEqual(self.testMsg.toJson(), testJson)
+
+    def test_reset(self):
+        """
+        The reset method must clear the payload and keep the topic
+        of a base message.
+        """
+        expectedUnit = 'new unit'
+        self.testMsg.reset(expectedUnit)
+        self.assertEqual(self.testMsg.getUnit(), expectedUnit)
+        self.assertEqual(self.testMsg.getTopic(), self.testTopic)
+        self.assertIsNone(self.testMsg.getPayload())
+
+    def test_toBytes(self):
+        """
+        The toBytes method must return the JSON bytes representing
+        the message with every backend.
+        """
+        expectedMsg = {'unit id': self.testUnit, 'payload': self.testPayload}
+        for backend in serializer.getAvailableBackends():
+            with patch.object(serializer, 'dumps',
+                              serializer._backends[backend][0]):
+                self.testMsg._markDirty()
+                testResult = self.testMsg.toBytes()
+            self.assertIsInstance(testResult, bytes)
+            self.assertEqual(json.loads(testResult), expectedMsg)
+
+    def test_toBytesCached(self):
+        """
+        The toBytes method must encode the message only once while
+        its content does not change.
+        """
+        with patch.object(serializer, 'dumps',
+                          return_value=b'encoded') as mockedDumps:
+            self.testMsg.toBytes()
+            self.testMsg.toBytes()
+            mockedDumps.assert_called_once()
+
+    def test_fromBytes(self):
+        """
+        The fromBytes method must update the unit and payload from
+        JSON bytes or memoryview with every backend.
+        """
+        expectedUnit = 'new unit'
+        expectedPayload = {'new payload key': 'new payload value'}
+        testBytes = json.dumps({'unit id': expectedUnit,
+                                'payload': expectedPayload}).encode()
+        for backend in serializer.getAvailableBackends():
+            for testBuf in [testBytes, memoryview(testBytes)]:
+                self.testMsg.reset(self.testUnit)
+                with patch.object(serializer, 'loads',
+                                  serializer._backends[backend][1]):
+                    self.testMsg.fromBytes(testBuf)
+                self.assertEqual(expectedUnit, self.testMsg._unit)
+                self.assertEqual(expectedPayload, self.testMsg._payload)
+
+    def test_decode(self):
+        """
+        The decode method must create a message on the received topic
+        from its payload.
+        """
+        testBuf = memoryview(self.testMsg.toBytes())
+        testResult = BaseMessage.decode(testBuf, self.testTopic)
+        self.assertEqual(testResult.getTopic(), self.testTopic)
+        self.assertEqual(testResult.getUnit(), self.testUnit)
+        self.assertEqual(testResult.getPayload(), self.testPayload)
+
+    def test_decodeLazy(self):
+        """
+        A lazily decoded message must keep its raw payload until its
+        unit or payload is needed.
+        """
+        testBuf = self.testMsg.toBytes()
+        with patch.object(serializer, 'loads',
+                          wraps=serializer.loads) as mockedLoads:
+            testResult = BaseMessage.decode(testBuf, self.testTopic,
+                                            lazy=True)
+            mockedLoads.assert_not_called()
+            self.assertEqual(testResult.getUnit(), self.testUnit)
+            self.assertEqual(testResult.getPayload(), self.testPayload)
+            mockedLoads.assert_called_once()
+        self.assertIsNone(testResult._raw)
+
+    def test_lazyEncode(self):
+        """
+        A lazily decoded message must be parsed before being encoded.
+        """
+        testResult = BaseMessage.decode(self.testMsg.toBytes(),
+                                        self.testTopic, lazy=True)
+        self.assertEqual(testResult.toJson(), self.testMsg.toJson())
+
+    def test_lazySetPayload(self):
+        """
+        Setting the payload of a lazily decoded message must not be
+        overwritten by the raw payload.
+        """
+        expectedPayload = {'new payload key': 'new payload value'}
+        testResult = BaseMessage.decode(self.testMsg.toBytes(),
+                                        self.testTopic, lazy=True)
+        testResult.setPayload(expectedPayload)
+        self.assertEqual(testResult.getPayload(), expectedPayload)
+        self.assertEqual(testResult.getUnit(), self.testUnit)
+
+    def test_resetLazy(self):
+        """
+        The reset method must drop the raw payload.
+        """
+        testResult = BaseMessage.decode(self.testMsg.toBytes(),
+                                        self.testTopic, lazy=True)
+        testResult.reset('new unit')
+        self.assertIsNone(testResult.getPayload())
+
+    def test_stamp(self):
+        """
+        The stamp method must save the sequence number and send time,
+        the send time defaulting to the current time.
+        """
+        self.testMsg.toJson()
+        with patch('pkgs.messages.baseMsg.time.time', return_value=12.5):
+            self.testMsg.stamp(3)
+        self.assertEqual(self.testMsg.getSeq(), 3)
+        self.assertEqual(self.testMsg.getSentAt(), 12.5)
+        self.assertIsNone(self.testMsg._json)
+
+    def test_stampJsonRoundTrip(self):
+        """
+        The stamp must only be in the JSON encodings when set and must be
+        decoded back.
+        """
+        self.assertNotIn('seq', json.loads(self.testMsg.toJson()))
+        self.testMsg.stamp(7, 100.25)
+        for testEncoded in [self.testMsg.toJson(), self.testMsg.toBytes()]:
+            testResult = BaseMessage.decode(testEncoded, self.testTopic,
+                                            lazy=True)
+            self.assertEqual(testResult.getSeq(), 7)
+            self.assertEqual(testResult.getSentAt(), 100.25)
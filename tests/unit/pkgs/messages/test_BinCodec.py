@@ -0,0 +1,145 @@
+import struct
+from unittest import TestCase
+
+import os
+import sys
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.messages import binCodec, UnsupportedMsgVersion   # noqa: E402
+
+
+class TestBinCodec(TestCase):
+    """
+    The binCodec module test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.testUnit = 'test unit'
+        self.testSteering = 0.64
+        self.testThrottle = -0.16
+
+    def test_packWhldLayout(self):
+        """
+        The packWhld function must pack the header, the unit ID and
+        the modifiers.
+        """
+        unitBytes = self.testUnit.encode()
+        expectedBin = struct.pack('<BBB', binCodec.VERSION, 0,
+                                  len(unitBytes)) + unitBytes + \
+            struct.pack('<dd', self.testSteering, self.testThrottle)
+        testResult = binCodec.packWhld(self.testUnit, self.testSteering,
+                                       self.testThrottle)
+        self.assertEqual(testResult, expectedBin)
+
+    def test_unpackWhld(self):
+        """
+        The unpackWhld function must return the packed unit ID and modifiers
+        from bytes or memoryview buffers.
+        """
+        testBin = binCodec.packWhld(self.testUnit, self.testSteering,
+                                    self.testThrottle)
+        for testBuf in [testBin, memoryview(testBin)]:
+            testResult = binCodec.unpackWhld(testBuf)
+            self.assertEqual(testResult, (self.testUnit, self.testSteering,
+                                          self.testThrottle, None, None))
+
+    def test_unpackWhldBadVersion(self):
+        """
+        The unpackWhld function must raise an UnsupportedMsgVersion exception
+        when the version is unknown.
+        """
+        testBin = bytearray(binCodec.packWhld(self.testUnit,
+                                              self.testSteering,
+                                              self.testThrottle))
+        testBin[0] = binCodec.VERSION + 1
+        with self.assertRaises(UnsupportedMsgVersion):
+            binCodec.unpackWhld(testBin)
+
+    def test_quantize(self):
+        """
+        The quantize function must scale the modifier to int16 and clamp
+        it to [-1, 1].
+        """
+        self.assertEqual(binCodec.quantize(1.0), binCodec.QUANT_SCALE)
+        self.assertEqual(binCodec.quantize(-1.0), -binCodec.QUANT_SCALE)
+        self.assertEqual(binCodec.quantize(0.0), 0)
+        self.assertEqual(binCodec.quantize(1.5), binCodec.QUANT_SCALE)
+        self.assertEqual(binCodec.quantize(-2.0), -binCodec.QUANT_SCALE)
+
+    def test_quantizePrecision(self):
+        """
+        The quantization error must be at most half the resolution.
+        """
+        maxError = 0.5 / binCodec.QUANT_SCALE
+        for idx in range(-100, 101):
+            modifier = idx / 100
+            testResult = binCodec.dequantize(binCodec.quantize(modifier))
+            self.assertLessEqual(abs(testResult - modifier), maxError)
+
+    def test_packWhldQuantized(self):
+        """
+        The packWhld function must pack the modifiers as int16 and set
+        the quantized flag when quantized.
+        """
+        unitBytes = self.testUnit.encode()
+        expectedBin = struct.pack('<BBB', binCodec.VERSION,
+                                  binCodec.FLAG_QUANTIZED,
+                                  len(unitBytes)) + unitBytes + \
+            struct.pack('<hh', binCodec.quantize(self.testSteering),
+                        binCodec.quantize(self.testThrottle))
+        testResult = binCodec.packWhld(self.testUnit, self.testSteering,
+                                       self.testThrottle, quantized=True)
+        self.assertEqual(testResult, expectedBin)
+
+    def test_unpackWhldQuantized(self):
+        """
+        The unpackWhld function must dequantize quantized modifiers.
+        """
+        testBin = binCodec.packWhld(self.testUnit, self.testSteering,
+                                    self.testThrottle, quantized=True)
+        unit, steering, throttle, seq, sentAt = \
+            binCodec.unpackWhld(memoryview(testBin))
+        self.assertEqual(unit, self.testUnit)
+        self.assertAlmostEqual(steering, self.testSteering, places=4)
+        self.assertAlmostEqual(throttle, self.testThrottle, places=4)
+
+    def test_packWhldUnset(self):
+        """
+        The unset modifiers must be packed as NaN, or QUANT_UNSET when
+        quantized, and unpacked as None.
+        """
+        for quantized in [False, True]:
+            testBin = binCodec.packWhld(self.testUnit, 0.5, None,
+                                        quantized=quantized)
+            unit, steering, throttle, seq, sentAt = \
+                binCodec.unpackWhld(testBin)
+            self.assertAlmostEqual(steering, 0.5, places=4)
+            self.assertIsNone(throttle)
+            testBin = binCodec.packWhld(self.testUnit, None, None,
+                                        quantized=quantized)
+            self.assertEqual(binCodec.unpackWhld(testBin)[1:3],
+                             (None, None))
+        self.assertEqual(testBin[-binCodec.WHLD_QUANT_BODY.size:],
+                         struct.pack('<hh', binCodec.QUANT_UNSET,
+                                     binCodec.QUANT_UNSET))
+
+    def test_packWhldStamped(self):
+        """
+        The packWhld function must append the stamp and set the stamped
+        flag when a sequence number is given.
+        """
+        testSeq = 42
+        testSentAt = 1234.5
+        for quantized in [False, True]:
+            testBin = binCodec.packWhld(self.testUnit, self.testSteering,
+                                        self.testThrottle,
+                                        quantized=quantized, seq=testSeq,
+                                        sentAt=testSentAt)
+            self.assertTrue(testBin[1] & binCodec.FLAG_STAMPED)
+            self.assertEqual(testBin[-binCodec.STAMP.size:],
+                             struct.pack('<Qd', testSeq, testSentAt))
+            testResult = binCodec.unpackWhld(testBin)
+            self.assertEqual(testResult[3:], (testSeq, testSentAt))
@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+import os
+import sys
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.messages import MsgPool, UnitWhldCmdMsg   # noqa: E402
+
+
+class TestMsgPool(TestCase):
+    """
+    The MsgPool class test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.testSize = 2
+        self.testPool = MsgPool(UnitWhldCmdMsg, size=self.testSize)
+
+    def test_acquireEmpty(self):
+        """
+        The acquire method must create a new message when the pool is empty.
+        """
+        testMsg = self.testPool.acquire('unit 1')
+        self.assertIsInstance(testMsg, UnitWhldCmdMsg)
+        self.assertEqual(testMsg.getUnit(), 'unit 1')
+
+    def test_acquireReuse(self):
+        """
+        The acquire method must reuse and reset a released message.
+        """
+        testMsg = self.testPool.acquire('unit 1')
+        testMsg.setSteering(0.5)
+        self.testPool.release(testMsg)
+        testResult = self.testPool.acquire('unit 2')
+        self.assertIs(testResult, testMsg)
+        self.assertEqual(testResult.getUnit(), 'unit 2')
+        self.assertEqual(testResult.getTopic(),
+                         UnitWhldCmdMsg('unit 2').getTopic())
+        self.assertIsNone(testResult.getSteering())
+        self.assertEqual(self.testPool.getFreeCount(), 0)
+
+    def test_releaseFull(self):
+        """
+        The release method must drop the message when the pool is full.
+        """
+        for idx in range(self.testSize + 1):
+            self.testPool.release(UnitWhldCmdMsg(f"unit {idx}"))
+        self.assertEqual(self.testPool.getFreeCount(), self.testSize)
@@ -0,0 +1,73 @@
+from unittest import TestCase
+
+import os
+import sys
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.messages import serializer, UnknownSerializerBackend  # noqa: E402
+
+
+class TestSerializer(TestCase):
+    """
+    The serializer module test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.initBackend = serializer.getBackend()
+        self.testObj = {'unit id': 'test unit',
+                        'payload': {'steering': 0.5, 'throttle': -0.25}}
+
+    def tearDown(self):
+        """
+        Test cases teardown.
+        """
+        serializer.setBackend(self.initBackend)
+
+    def test_defaultBackend(self):
+        """
+        The fastest available backend must be selected by default.
+        """
+        expectedBackend = serializer.ORJSON_BACKEND \
+            if serializer.orjson is not None else serializer.STDLIB_BACKEND
+        self.assertEqual(self.initBackend, expectedBackend)
+
+    def test_stdlibAlwaysAvailable(self):
+        """
+        The standard library backend must always be available.
+        """
+        self.assertIn(serializer.STDLIB_BACKEND,
+                      serializer.getAvailableBackends())
+
+    def test_roundTrip(self):
+        """
+        Every backend must dump bytes and load them back from bytes,
+        bytearray, memoryview or str.
+        """
+        for backend in serializer.getAvailableBackends():
+            serializer.setBackend(backend)
+            testBytes = serializer.dumps(self.testObj)
+            self.assertIsInstance(testBytes, bytes)
+            for testData in [testBytes, bytearray(testBytes),
+                             memoryview(testBytes), testBytes.decode()]:
+                self.assertEqual(serializer.loads(testData), self.testObj)
+
+    def test_setBackend(self):
+        """
+        The setBackend function must select the backend functions.
+        """
+        serializer.setBackend(serializer.STDLIB_BACKEND)
+        self.assertEqual(serializer.getBackend(), serializer.STDLIB_BACKEND)
+        self.assertIs(serializer.dumps, serializer._stdlibDumps)
+        self.assertIs(serializer.loads, serializer._stdlibLoads)
+
+    def test_setBackendUnknown(self):
+        """
+        The setBackend function must raise an UnknownSerializerBackend
+        exception and keep the current backend if the backend is unknown.
+        """
+        with self.assertRaises(UnknownSerializerBackend):
+            serializer.setBackend('unknown')
+        self.assertEqual(serializer.getBackend(), self.initBackend)
@@ -6,7 +6,7 @@ import sys
 
 sys.path.append(os.path.abspath('./src'))
 
-from pkgs.messages import UnitCxnStateMsg   # noqa: E402
+from pkgs.messages import UnitCxnStateMsg, UnitMismatch     # noqa: E402
 
 
 class TestUnitCxnStateMsg(TestCase):
@@ -79,3 +79,76 @@ class TestUnitCxnStateMsg(TestCase):
         self.assertTrue(self.testMsg.isOnline())
         self.testMsg.setAsOffline()
         self.assertFalse(self.testMsg.isOnline())
+
+    def test_setStateKeepCache(self):
+        """
+        Setting the current state again must keep the cached encodings
+        while changing it must invalidate them.
+        """
+        self.testMsg.toJson()
+        self.testMsg.setAsOnline()
+        self.assertIsNotNone(self.testMsg._json)
+        self.testMsg.setAsOffline()
+        self.assertIsNone(self.testMsg._json)
+
+    def test_slots(self):
+        """
+        The message must not carry a per instance dictionary.
+        """
+        self.assertFalse(hasattr(self.testMsg, '__dict__'))
+
+    def test_reset(self):
+        """
+        The reset method must update the unit and topic.
+        """
+        expectedUnit = 'new unit'
+        self.testMsg.reset(expectedUnit)
+        self.assertEqual(self.testMsg.getUnit(), expectedUnit)
+        self.assertEqual(self.testMsg.getTopic(),
+                         f"{UnitCxnStateMsg.TOPIC_ROOT}/{expectedUnit}")
+
+    def test_getUnitFromTopic(self):
+        """
+        The getUnitFromTopic method must return the unit ID of the topic.
+        """
+        testResult = UnitCxnStateMsg.getUnitFromTopic(self.testMsg.getTopic())
+        self.assertEqual(testResult, self.testUnit)
+
+    def test_decode(self):
+        """
+        The decode method must create the message from a received payload.
+        """
+        testBuf = memoryview(self.testMsg.toWire())
+        testResult = UnitCxnStateMsg.decode(testBuf, self.testMsg.getTopic())
+        self.assertIsInstance(testResult, UnitCxnStateMsg)
+        self.assertEqual(testResult.getUnit(), self.testUnit)
+        self.assertEqual(testResult.getTopic(), self.testMsg.getTopic())
+        self.assertTrue(testResult.isOnline())
+
+    def test_decodeLazy(self):
+        """
+        A lazily decoded message must get its unit from the topic and
+        parse its state on first use.
+        """
+        testBuf = self.testMsg.toWire()
+        testResult = UnitCxnStateMsg.decode(testBuf, self.testMsg.getTopic(),
+                                            lazy=True)
+        self.assertEqual(testResult.getUnit(), self.testUnit)
+        self.assertIs(testResult._raw, testBuf)
+        self.assertTrue(testResult.isOnline())
+        self.assertIsNone(testResult._raw)
+
+    def test_decodeUnitMismatch(self):
+        """
+        The decoding must raise a UnitMismatch exception for a payload of
+        another unit than the topic one, the topic unit being kept.
+        """
+        testTopic = UnitCxnStateMsg('other unit').getTopic()
+        testBuf = self.testMsg.toWire()
+        with self.assertRaises(UnitMismatch):
+            UnitCxnStateMsg.decode(testBuf, testTopic)
+        testResult = UnitCxnStateMsg.decode(testBuf, testTopic, lazy=True)
+        self.assertEqual(testResult.getUnit(), 'other unit')
+        with self.assertRaises(UnitMismatch):
+            testResult.getPayload()
+        self.assertEqual(testResult.getUnit(), 'other unit')
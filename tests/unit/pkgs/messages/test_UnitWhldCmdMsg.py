@@ -1,3 +1,4 @@
+import json
 from unittest import TestCase
 from unittest.mock import patch
 
@@ -6,7 +7,8 @@ import sys
 
 sys.path.append(os.path.abspath('./src'))
 
-from pkgs.messages import UnitWhldCmdMsg     # noqa: E402 F401
+from pkgs.messages import binCodec, UnitMismatch, \
+    UnitWhldCmdMsg                                     # noqa: E402 F401
 
 
 class TestUnitWhldCmdMsg(TestCase):
@@ -23,7 +25,7 @@ class TestUnitWhldCmdMsg(TestCase):
         self.testPayload[UnitWhldCmdMsg.THROTTLE_KEY] = -0.16
         self.testMsg = UnitWhldCmdMsg(self.testUnit, payload=self.testPayload)
 
-    @patch('pkgs.messages.unitWhldCmdMsg.BaseMessage.__init__')
+    @patch('pkgs.messages.whldMsg.BaseMessage.__init__')
     def test_constructor(self, mockedSuperConst):
         """
         The constructor must initialize the base class with
@@ -40,11 +42,10 @@ class TestUnitWhldCmdMsg(TestCase):
         """
         The setSteering method must save the new steering modifier.
         """
-        self.testMsg._payload = None
+        self.testMsg.reset()
         expectedModifier = -0.92
         self.testMsg.setSteering(expectedModifier)
-        self.assertEqual(self.testMsg._payload[UnitWhldCmdMsg.STEERING_KEY],
-                         expectedModifier)
+        self.assertEqual(self.testMsg._steering, expectedModifier)
 
     def test_getSteering(self):
         """
@@ -58,16 +59,271 @@ class TestUnitWhldCmdMsg(TestCase):
         """
         The setThrottle method must save the new throttle modifier.
         """
-        self.testMsg._payload = None
+        self.testMsg.reset()
         expectedModifier = 0.05
         self.testMsg.setThrottle(expectedModifier)
-        self.assertEqual(self.testMsg._payload[UnitWhldCmdMsg.THROTTLE_KEY],
-                         expectedModifier)
+        self.assertEqual(self.testMsg._throttle, expectedModifier)
 
     def test_getThrottle(self):
         """
         The getThrottle method must return the current throttle modifier.
         """
         testResult = self.testMsg.getThrottle()
-        self.assertEqual(self.testMsg._payload[UnitWhldCmdMsg.THROTTLE_KEY],
-                         testResult)
+        self.assertEqual(self.testMsg._throttle, testResult)
+
+    def test_toBinary(self):
+        """
+        The toBinary method must pack the unit ID and the modifiers.
+        """
+        steering = self.testPayload[UnitWhldCmdMsg.STEERING_KEY]
+        throttle = self.testPayload[UnitWhldCmdMsg.THROTTLE_KEY]
+        expectedBin = binCodec.packWhld(self.testUnit, steering, throttle)
+        testResult = self.testMsg.toBinary()
+        self.assertEqual(testResult, expectedBin)
+
+    def test_fromBinary(self):
+        """
+        The fromBinary method must update the unit and modifiers
+        from the packed message.
+        """
+        expectedUnit = 'new unit'
+        expectedSteering = -0.25
+        expectedThrottle = 0.75
+        testBin = binCodec.packWhld(expectedUnit, expectedSteering,
+                                    expectedThrottle)
+        self.testMsg.fromBinary(memoryview(testBin))
+        self.assertEqual(self.testMsg.getUnit(), expectedUnit)
+        self.assertEqual(self.testMsg.getSteering(), expectedSteering)
+        self.assertEqual(self.testMsg.getThrottle(), expectedThrottle)
+
+    def test_binaryUnsetModifier(self):
+        """
+        A message with a single modifier set must round trip through the
+        binary format, quantized or not.
+        """
+        testTopic = self.testMsg.getTopic()
+        for quantized in [False, True]:
+            with patch.object(UnitWhldCmdMsg, 'QUANTIZED', quantized):
+                testMsg = UnitWhldCmdMsg(self.testUnit)
+                testMsg.setSteering(0.5)
+                testResult = UnitWhldCmdMsg.decode(testMsg.toBinary(),
+                                                   testTopic)
+            self.assertEqual(testResult.getPayload(), testMsg.getPayload())
+            self.assertIsNone(testResult.getThrottle())
+
+    def test_wireRoundTrip(self):
+        """
+        A binary wire message must be decoded by fromWire.
+        """
+        testMsg = UnitWhldCmdMsg('other unit')
+        binFormat = UnitWhldCmdMsg.BINARY_FORMAT
+        with patch.object(UnitWhldCmdMsg, 'WIRE_FORMAT', binFormat):
+            testMsg.fromWire(self.testMsg.toWire())
+        self.assertEqual(testMsg.getUnit(), self.testUnit)
+        self.assertEqual(testMsg.getPayload(), self.testPayload)
+
+    def test_wireFormatsCache(self):
+        """
+        Each wire format must be cached in its own slot, a change
+        invalidating all of them.
+        """
+        binFormat = UnitWhldCmdMsg.BINARY_FORMAT
+        with patch.object(UnitWhldCmdMsg, 'WIRE_FORMAT', binFormat):
+            testBinary = self.testMsg.toWire()
+            self.assertIs(self.testMsg.toWire(), testBinary)
+        testBytes = self.testMsg.toBytes()
+        self.assertIs(self.testMsg._binary, testBinary)
+        self.assertIs(self.testMsg._jsonBytes, testBytes)
+        self.assertIsNone(self.testMsg._json)
+        self.testMsg.setSteering(0.125)
+        self.assertEqual((self.testMsg._json, self.testMsg._jsonBytes,
+                          self.testMsg._binary), (None, None, None))
+
+    def test_setModifiersCache(self):
+        """
+        Setting unchanged modifiers must keep the cached encodings
+        while changing them must invalidate them.
+        """
+        steering = self.testPayload[UnitWhldCmdMsg.STEERING_KEY]
+        throttle = self.testPayload[UnitWhldCmdMsg.THROTTLE_KEY]
+        self.testMsg.toJson()
+        self.testMsg.setSteering(steering)
+        self.testMsg.setThrottle(throttle)
+        self.assertIsNotNone(self.testMsg._json)
+        self.testMsg.setSteering(-steering)
+        self.assertIsNone(self.testMsg._json)
+        self.testMsg.toJson()
+        self.testMsg.setThrottle(-throttle)
+        self.assertIsNone(self.testMsg._json)
+
+    def test_fromBinaryInvalidateCache(self):
+        """
+        The fromBinary method must invalidate the cached encodings.
+        """
+        self.testMsg.toJson()
+        self.testMsg.fromBinary(binCodec.packWhld('new unit', 0.0, 0.0))
+        self.assertIsNone(self.testMsg._json)
+
+    def test_slots(self):
+        """
+        The message must not carry a per instance dictionary.
+        """
+        self.assertFalse(hasattr(self.testMsg, '__dict__'))
+
+    def test_getPayload(self):
+        """
+        The getPayload method must return the modifiers as a dictionary
+        or None if no modifier is set.
+        """
+        self.assertEqual(self.testMsg.getPayload(), self.testPayload)
+        self.testMsg.reset()
+        self.assertIsNone(self.testMsg.getPayload())
+
+    def test_setPayload(self):
+        """
+        The setPayload method must save the modifiers of the dictionary.
+        """
+        expectedSteering = 0.1
+        expectedThrottle = 0.2
+        testPayload = {}
+        testPayload[UnitWhldCmdMsg.STEERING_KEY] = expectedSteering
+        testPayload[UnitWhldCmdMsg.THROTTLE_KEY] = expectedThrottle
+        self.testMsg.setPayload(testPayload)
+        self.assertEqual(self.testMsg._steering, expectedSteering)
+        self.assertEqual(self.testMsg._throttle, expectedThrottle)
+
+    def test_reset(self):
+        """
+        The reset method must clear the modifiers and update the unit
+        and topic when a new unit is given.
+        """
+        expectedUnit = 'new unit'
+        expectedTopic = UnitWhldCmdMsg(expectedUnit).getTopic()
+        self.testMsg.toJson()
+        self.testMsg.reset(expectedUnit)
+        self.assertEqual(self.testMsg.getUnit(), expectedUnit)
+        self.assertEqual(self.testMsg.getTopic(), expectedTopic)
+        self.assertIsNone(self.testMsg._steering)
+        self.assertIsNone(self.testMsg._throttle)
+        self.assertIsNone(self.testMsg._json)
+
+    def test_getUnitFromTopic(self):
+        """
+        The getUnitFromTopic method must return the unit ID of the topic.
+        """
+        testResult = UnitWhldCmdMsg.getUnitFromTopic(self.testMsg.getTopic())
+        self.assertEqual(testResult, self.testUnit)
+
+    def test_decode(self):
+        """
+        The decode method must create the message from a received JSON
+        or binary payload.
+        """
+        testTopic = self.testMsg.getTopic()
+        testBufs = [self.testMsg.toBytes(),
+                    memoryview(self.testMsg.toBinary())]
+        for testBuf in testBufs:
+            testResult = UnitWhldCmdMsg.decode(testBuf, testTopic)
+            self.assertIsInstance(testResult, UnitWhldCmdMsg)
+            self.assertEqual(testResult.getTopic(), testTopic)
+            self.assertEqual(testResult.getUnit(), self.testUnit)
+            self.assertEqual(testResult.getPayload(), self.testPayload)
+
+    def test_quantizedSetters(self):
+        """
+        The setters must snap the modifiers to the quantization grid
+        when the class is quantized.
+        """
+        with patch.object(UnitWhldCmdMsg, 'QUANTIZED', True):
+            self.testMsg.setSteering(0.5)
+            self.testMsg.setThrottle(-0.3)
+        self.assertEqual(self.testMsg.getSteering(),
+                         binCodec.quantize(0.5) / binCodec.QUANT_SCALE)
+        self.assertEqual(self.testMsg.getThrottle(),
+                         binCodec.quantize(-0.3) / binCodec.QUANT_SCALE)
+
+    def test_quantizedJson(self):
+        """
+        The quantized json payload must carry the int16 modifiers and
+        their scale, and round trip to the same modifiers.
+        """
+        with patch.object(UnitWhldCmdMsg, 'QUANTIZED', True):
+            self.testMsg.setPayload(self.testPayload)
+            testJson = json.loads(self.testMsg.toJson())
+            testBytes = self.testMsg.toBytes()
+        testPayload = testJson[UnitWhldCmdMsg.PAYLOAD_KEY]
+        scale = testPayload[UnitWhldCmdMsg.SCALE_KEY]
+        steering = testPayload[UnitWhldCmdMsg.STEERING_KEY]
+        throttle = testPayload[UnitWhldCmdMsg.THROTTLE_KEY]
+        self.assertEqual(scale, binCodec.QUANT_SCALE)
+        self.assertIsInstance(steering, int)
+        self.assertIsInstance(throttle, int)
+        testResult = UnitWhldCmdMsg.decode(testBytes, self.testMsg.getTopic())
+        self.assertEqual(testResult.getPayload(), self.testMsg.getPayload())
+
+    def test_quantizedBinary(self):
+        """
+        The quantized binary message must round trip to the same
+        modifiers.
+        """
+        with patch.object(UnitWhldCmdMsg, 'QUANTIZED', True):
+            self.testMsg.setPayload(self.testPayload)
+            testBin = self.testMsg.toBinary()
+        testResult = UnitWhldCmdMsg.decode(testBin, self.testMsg.getTopic())
+        self.assertEqual(testResult.getPayload(), self.testMsg.getPayload())
+
+    def test_decodeLazy(self):
+        """
+        A lazily decoded message must get its unit from the topic without
+        parsing and parse the payload on first use.
+        """
+        testTopic = self.testMsg.getTopic()
+        testBufs = [self.testMsg.toBytes(), self.testMsg.toBinary()]
+        for testBuf in testBufs:
+            testResult = UnitWhldCmdMsg.decode(testBuf, testTopic, lazy=True)
+            self.assertEqual(testResult.getUnit(), self.testUnit)
+            self.assertIs(testResult._raw, testBuf)
+            self.assertEqual(testResult.getSteering(),
+                             self.testMsg.getSteering())
+            self.assertIsNone(testResult._raw)
+            self.assertEqual(testResult.getThrottle(),
+                             self.testMsg.getThrottle())
+
+    def test_decodeLazyUnitMismatch(self):
+        """
+        A lazily decoded message must keep its topic unit, a binary
+        payload of another unit raising a UnitMismatch exception when
+        parsed.
+        """
+        testTopic = UnitWhldCmdMsg('other unit').getTopic()
+        testResult = UnitWhldCmdMsg.decode(self.testMsg.toBinary(),
+                                           testTopic, lazy=True)
+        self.assertEqual(testResult.getUnit(), 'other unit')
+        with self.assertRaises(UnitMismatch):
+            testResult.getSteering()
+        self.assertEqual(testResult.getUnit(), 'other unit')
+
+    def test_lazySetter(self):
+        """
+        Setting a modifier of a lazily decoded message must keep the other
+        modifier of the raw payload.
+        """
+        testTopic = self.testMsg.getTopic()
+        testBin = self.testMsg.toBinary()
+        testResult = UnitWhldCmdMsg.decode(testBin, testTopic, lazy=True)
+        testResult.setSteering(0.0)
+        self.assertEqual(testResult.getSteering(), 0.0)
+        self.assertEqual(testResult.getThrottle(), self.testMsg.getThrottle())
+        testResult = UnitWhldCmdMsg.decode(testBin, testTopic, lazy=True)
+        self.assertEqual(testResult.toBinary(), testBin)
+
+    def test_stampBinaryRoundTrip(self):
+        """
+        The stamp must be packed in the binary format and decoded back.
+        """
+        self.testMsg.stamp(9, 50.5)
+        testBin = self.testMsg.toBinary()
+        testResult = UnitWhldCmdMsg.decode(testBin, self.testMsg.getTopic())
+        self.assertEqual(testResult.getSeq(), 9)
+        self.assertEqual(testResult.getSentAt(), 50.5)
+        self.assertEqual(testResult.getPayload(), self.testPayload)
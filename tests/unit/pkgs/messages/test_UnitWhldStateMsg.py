@@ -1,3 +1,4 @@
+import json
 from unittest import TestCase
 from unittest.mock import patch
 
@@ -6,7 +7,7 @@ import sys
 
 sys.path.append(os.path.abspath('./src'))
 
-from pkgs.messages import UnitWhldStateMsg     # noqa: E402
+from pkgs.messages import binCodec, UnitWhldStateMsg     # noqa: E402
 
 
 class TestUnitWhldStateMsg(TestCase):
@@ -25,7 +26,7 @@ class TestUnitWhldStateMsg(TestCase):
         self.testPayload[UnitWhldStateMsg.THROTTLE_KEY] = self.initThrottle
         self.testMsg = UnitWhldStateMsg(self.testUnit, self.testPayload)
 
-    @patch('pkgs.messages.unitWhldStateMsg.BaseMessage.__init__')
+    @patch('pkgs.messages.whldMsg.BaseMessage.__init__')
     def test_constructor(self, mockedSuperConst):
         """
         The constructor must initialize the base class
@@ -42,13 +43,11 @@ class TestUnitWhldStateMsg(TestCase):
         The setSteering method must update the steering modifier
         in the message payload.
         """
-        self.testMsg._payload = None
+        self.testMsg.reset()
         expectedSteering = -1.0
         self.testMsg.setSteering(expectedSteering)
-        self.assertEqual(self.testMsg._payload[UnitWhldStateMsg.STEERING_KEY],
-                         expectedSteering)
-        self.assertFalse(hasattr(self.testMsg._payload,
-                                 UnitWhldStateMsg.THROTTLE_KEY))
+        self.assertEqual(self.testMsg._steering, expectedSteering)
+        self.assertIsNone(self.testMsg._throttle)
 
     def test_getSteering(self):
         """
@@ -63,13 +62,11 @@ class TestUnitWhldStateMsg(TestCase):
         The setThrottle method must update the throttle modifier
         in the message payload.
         """
-        self.testMsg._payload = None
+        self.testMsg.reset()
         expectedThrottle = 0.4
         self.testMsg.setThrottle(expectedThrottle)
-        self.assertEqual(self.testMsg._payload[UnitWhldStateMsg.THROTTLE_KEY],
-                         expectedThrottle)
-        self.assertFalse(hasattr(self.testMsg._payload,
-                                 UnitWhldStateMsg.STEERING_KEY))
+        self.assertEqual(self.testMsg._throttle, expectedThrottle)
+        self.assertIsNone(self.testMsg._steering)
 
     def test_getThrottle(self):
         """
@@ -78,3 +75,215 @@ class TestUnitWhldStateMsg(TestCase):
         testResult = self.testMsg.getThrottle()
         self.assertEqual(testResult,
                          self.testPayload[UnitWhldStateMsg.THROTTLE_KEY])
+
+    def test_toBinary(self):
+        """
+        The toBinary method must pack the unit ID and the modifiers.
+        """
+        steering = self.testPayload[UnitWhldStateMsg.STEERING_KEY]
+        throttle = self.testPayload[UnitWhldStateMsg.THROTTLE_KEY]
+        expectedBin = binCodec.packWhld(self.testUnit, steering, throttle)
+        testResult = self.testMsg.toBinary()
+        self.assertEqual(testResult, expectedBin)
+
+    def test_fromBinary(self):
+        """
+        The fromBinary method must update the unit and modifiers
+        from the packed message.
+        """
+        expectedUnit = 'new unit'
+        expectedSteering = -0.25
+        expectedThrottle = 0.75
+        testBin = binCodec.packWhld(expectedUnit, expectedSteering,
+                                    expectedThrottle)
+        self.testMsg.fromBinary(memoryview(testBin))
+        self.assertEqual(self.testMsg.getUnit(), expectedUnit)
+        self.assertEqual(self.testMsg.getSteering(), expectedSteering)
+        self.assertEqual(self.testMsg.getThrottle(), expectedThrottle)
+
+    def test_wireRoundTrip(self):
+        """
+        A binary wire message must be decoded by fromWire.
+        """
+        testMsg = UnitWhldStateMsg('other unit')
+        binFormat = UnitWhldStateMsg.BINARY_FORMAT
+        with patch.object(UnitWhldStateMsg, 'WIRE_FORMAT', binFormat):
+            testMsg.fromWire(self.testMsg.toWire())
+        self.assertEqual(testMsg.getUnit(), self.testUnit)
+        self.assertEqual(testMsg.getPayload(), self.testPayload)
+
+    def test_setModifiersCache(self):
+        """
+        Setting unchanged modifiers must keep the cached encodings
+        while changing them must invalidate them.
+        """
+        steering = self.testPayload[UnitWhldStateMsg.STEERING_KEY]
+        throttle = self.testPayload[UnitWhldStateMsg.THROTTLE_KEY]
+        self.testMsg.toJson()
+        self.testMsg.setSteering(steering)
+        self.testMsg.setThrottle(throttle)
+        self.assertIsNotNone(self.testMsg._json)
+        self.testMsg.setSteering(-steering)
+        self.assertIsNone(self.testMsg._json)
+        self.testMsg.toJson()
+        self.testMsg.setThrottle(-throttle)
+        self.assertIsNone(self.testMsg._json)
+
+    def test_fromBinaryInvalidateCache(self):
+        """
+        The fromBinary method must invalidate the cached encodings.
+        """
+        self.testMsg.toJson()
+        self.testMsg.fromBinary(binCodec.packWhld('new unit', 0.0, 0.0))
+        self.assertIsNone(self.testMsg._json)
+
+    def test_slots(self):
+        """
+        The message must not carry a per instance dictionary.
+        """
+        self.assertFalse(hasattr(self.testMsg, '__dict__'))
+
+    def test_getPayload(self):
+        """
+        The getPayload method must return the modifiers as a dictionary
+        or None if no modifier is set.
+        """
+        self.assertEqual(self.testMsg.getPayload(), self.testPayload)
+        self.testMsg.reset()
+        self.assertIsNone(self.testMsg.getPayload())
+
+    def test_setPayload(self):
+        """
+        The setPayload method must save the modifiers of the dictionary.
+        """
+        expectedSteering = 0.1
+        expectedThrottle = 0.2
+        testPayload = {}
+        testPayload[UnitWhldStateMsg.STEERING_KEY] = expectedSteering
+        testPayload[UnitWhldStateMsg.THROTTLE_KEY] = expectedThrottle
+        self.testMsg.setPayload(testPayload)
+        self.assertEqual(self.testMsg._steering, expectedSteering)
+        self.assertEqual(self.testMsg._throttle, expectedThrottle)
+
+    def test_reset(self):
+        """
+        The reset method must clear the modifiers and update the unit
+        and topic when a new unit is given.
+        """
+        expectedUnit = 'new unit'
+        expectedTopic = UnitWhldStateMsg(expectedUnit).getTopic()
+        self.testMsg.toJson()
+        self.testMsg.reset(expectedUnit)
+        self.assertEqual(self.testMsg.getUnit(), expectedUnit)
+        self.assertEqual(self.testMsg.getTopic(), expectedTopic)
+        self.assertIsNone(self.testMsg._steering)
+        self.assertIsNone(self.testMsg._throttle)
+        self.assertIsNone(self.testMsg._json)
+
+    def test_getUnitFromTopic(self):
+        """
+        The getUnitFromTopic method must return the unit ID of the topic.
+        """
+        testResult = UnitWhldStateMsg.getUnitFromTopic(self.testMsg.getTopic())
+        self.assertEqual(testResult, self.testUnit)
+
+    def test_decode(self):
+        """
+        The decode method must create the message from a received JSON
+        or binary payload.
+        """
+        testTopic = self.testMsg.getTopic()
+        testBufs = [self.testMsg.toBytes(),
+                    memoryview(self.testMsg.toBinary())]
+        for testBuf in testBufs:
+            testResult = UnitWhldStateMsg.decode(testBuf, testTopic)
+            self.assertIsInstance(testResult, UnitWhldStateMsg)
+            self.assertEqual(testResult.getTopic(), testTopic)
+            self.assertEqual(testResult.getUnit(), self.testUnit)
+            self.assertEqual(testResult.getPayload(), self.testPayload)
+
+    def test_quantizedSetters(self):
+        """
+        The setters must snap the modifiers to the quantization grid
+        when the class is quantized.
+        """
+        with patch.object(UnitWhldStateMsg, 'QUANTIZED', True):
+            self.testMsg.setSteering(0.5)
+            self.testMsg.setThrottle(-0.3)
+        self.assertEqual(self.testMsg.getSteering(),
+                         binCodec.quantize(0.5) / binCodec.QUANT_SCALE)
+        self.assertEqual(self.testMsg.getThrottle(),
+                         binCodec.quantize(-0.3) / binCodec.QUANT_SCALE)
+
+    def test_quantizedJson(self):
+        """
+        The quantized json payload must carry the int16 modifiers and
+        their scale, and round trip to the same modifiers.
+        """
+        with patch.object(UnitWhldStateMsg, 'QUANTIZED', True):
+            self.testMsg.setPayload(self.testPayload)
+            testJson = json.loads(self.testMsg.toJson())
+            testBytes = self.testMsg.toBytes()
+        testPayload = testJson[UnitWhldStateMsg.PAYLOAD_KEY]
+        scale = testPayload[UnitWhldStateMsg.SCALE_KEY]
+        steering = testPayload[UnitWhldStateMsg.STEERING_KEY]
+        throttle = testPayload[UnitWhldStateMsg.THROTTLE_KEY]
+        self.assertEqual(scale, binCodec.QUANT_SCALE)
+        self.assertIsInstance(steering, int)
+        self.assertIsInstance(throttle, int)
+        testTopic = self.testMsg.getTopic()
+        testResult = UnitWhldStateMsg.decode(testBytes, testTopic)
+        self.assertEqual(testResult.getPayload(), self.testMsg.getPayload())
+
+    def test_quantizedBinary(self):
+        """
+        The quantized binary message must round trip to the same
+        modifiers.
+        """
+        with patch.object(UnitWhldStateMsg, 'QUANTIZED', True):
+            self.testMsg.setPayload(self.testPayload)
+            testBin = self.testMsg.toBinary()
+        testResult = UnitWhldStateMsg.decode(testBin, self.testMsg.getTopic())
+        self.assertEqual(testResult.getPayload(), self.testMsg.getPayload())
+
+    def test_decodeLazy(self):
+        """
+        A lazily decoded message must get its unit from the topic without
+        parsing and parse the payload on first use.
+        """
+        testTopic = self.testMsg.getTopic()
+        testBufs = [self.testMsg.toBytes(), self.testMsg.toBinary()]
+        for testBuf in testBufs:
+            testResult = UnitWhldStateMsg.decode(testBuf, testTopic, lazy=True)
+            self.assertEqual(testResult.getUnit(), self.testUnit)
+            self.assertIs(testResult._raw, testBuf)
+            self.assertEqual(testResult.getSteering(),
+                             self.testMsg.getSteering())
+            self.assertIsNone(testResult._raw)
+            self.assertEqual(testResult.getThrottle(),
+                             self.testMsg.getThrottle())
+
+    def test_lazySetter(self):
+        """
+        Setting a modifier of a lazily decoded message must keep the other
+        modifier of the raw payload.
+        """
+        testTopic = self.testMsg.getTopic()
+        testBin = self.testMsg.toBinary()
+        testResult = UnitWhldStateMsg.decode(testBin, testTopic, lazy=True)
+        testResult.setSteering(0.0)
+        self.assertEqual(testResult.getSteering(), 0.0)
+        self.assertEqual(testResult.getThrottle(), self.testMsg.getThrottle())
+        testResult = UnitWhldStateMsg.decode(testBin, testTopic, lazy=True)
+        self.assertEqual(testResult.toBinary(), testBin)
+
+    def test_stampBinaryRoundTrip(self):
+        """
+        The stamp must be packed in the binary format and decoded back.
+        """
+        self.testMsg.stamp(9, 50.5)
+        testBin = self.testMsg.toBinary()
+        testResult = UnitWhldStateMsg.decode(testBin, self.testMsg.getTopic())
+        self.assertEqual(testResult.getSeq(), 9)
+        self.assertEqual(testResult.getSentAt(), 50.5)
+        self.assertEqual(testResult.getPayload(), self.testPayload)
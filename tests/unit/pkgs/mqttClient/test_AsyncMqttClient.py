@@ -0,0 +1,407 @@
+import asyncio
+import paho.mqtt.client as mqtt
+import socket
+import tempfile
+import threading
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import Mock, patch
+
+import os
+import sys
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.messages import UnitCxnStateMsg, UnitWhldStateMsg     # noqa: E402
+from pkgs.mqttClient.asyncClient import AsyncMqttClient         # noqa: E402
+from pkgs.mqttClient.diskBuffer import DiskBuffer               # noqa: E402
+from pkgs.mqttClient.exceptions import MqttPublishFailed        # noqa: E402
+from pkgs.mqttClient.fleetRegistry import FleetRegistry         # noqa: E402
+from pkgs.mqttClient.subAck import SubAck                       # noqa: E402
+
+
+class TestAsyncMqttClient(IsolatedAsyncioTestCase):
+    """
+    The AsyncMqttClient class test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.testId = 'testId'
+        self.mockedLogging = Mock()
+        self.mockedClient = Mock()
+        self.mockedClient.loop_misc.return_value = mqtt.MQTT_ERR_SUCCESS
+        self.testInfo = Mock(mid=7, rc=mqtt.MQTT_ERR_SUCCESS)
+        self.testInfo.is_published.return_value = False
+        self.mockedClient.publish.return_value = self.testInfo
+        with patch('pkgs.mqttClient.client.mqtt') as mockedMqtt:
+            mockedMqtt.Client.return_value = self.mockedClient
+            self.testClient = AsyncMqttClient(self.mockedLogging, self.testId,
+                                              'testPassword', queueSize=2)
+        self.logger = self.testClient.getLogger()
+        self.testMsg = UnitWhldStateMsg('unit1', {
+            UnitWhldStateMsg.STEERING_KEY: 0.5,
+            UnitWhldStateMsg.THROTTLE_KEY: -0.5,
+        })
+        self.testMsg.setQos(1)
+
+    async def _connect(self, rc=0):
+        """
+        Connect the client, the broker answering with the result code.
+        """
+        task = asyncio.ensure_future(
+            self.testClient.connectAsync('localhost', 1883))
+        await asyncio.sleep(0)
+        self.testClient._onConnect(self.mockedClient, None, {}, rc)
+        return await task
+
+    def _received(self, msg):
+        """
+        Build a paho received message from a message.
+        """
+        return Mock(topic=msg.getTopic(), payload=msg.toWire())
+
+    def test_constructorSocketCallbacks(self):
+        """
+        The constructor must set the paho socket callbacks.
+        """
+        client = self.testClient
+        self.assertEqual(self.mockedClient.on_socket_open,
+                         client._onSocketOpen)
+        self.assertEqual(self.mockedClient.on_socket_close,
+                         client._onSocketClose)
+        self.assertEqual(self.mockedClient.on_socket_register_write,
+                         client._onSocketRegisterWrite)
+        self.assertEqual(self.mockedClient.on_socket_unregister_write,
+                         client._onSocketUnregisterWrite)
+
+    async def test_connect(self):
+        """
+        The connectAsync method must connect the paho client and return
+        the broker connection result.
+        """
+        testResult = await self._connect(rc=5)
+        self.mockedClient.connect.assert_called_once_with('localhost',
+                                                          port=1883)
+        self.assertEqual(testResult, 5)
+        self.assertIs(self.testClient._loop, asyncio.get_running_loop())
+
+    async def test_connectExecutor(self):
+        """
+        The connectAsync method must run the blocking paho connection
+        off the event loop thread, the socket callbacks it triggers being
+        run on the event loop.
+        """
+        sock, peer = socket.socketpair()
+        testThreads = []
+
+        def testConnect(*args, **kwargs):
+            testThreads.append(threading.get_ident())
+            self.testClient._onSocketOpen(self.mockedClient, None, sock)
+            self.testClient._onSocketRegisterWrite(self.mockedClient, None,
+                                                   sock)
+
+        self.mockedClient.connect.side_effect = testConnect
+        loop = asyncio.get_running_loop()
+        try:
+            task = asyncio.ensure_future(
+                self.testClient.connectAsync('localhost', 1883))
+            for _ in range(100):
+                if self.testClient._miscTask is not None:
+                    break
+                await asyncio.sleep(0.01)
+            self.assertNotEqual(testThreads, [threading.get_ident()])
+            self.testClient._onConnect(self.mockedClient, None, {}, 0)
+            self.assertEqual(await task, 0)
+            self.assertTrue(loop.remove_reader(sock))
+            self.assertTrue(loop.remove_writer(sock))
+            self.testClient._miscTask.cancel()
+        finally:
+            sock.close()
+            peer.close()
+
+    async def test_socketCallbacks(self):
+        """
+        The socket callbacks must drive the socket with the event loop
+        and run the paho housekeeping while the socket is open.
+        """
+        await self._connect()
+        sock, peer = socket.socketpair()
+        loop = asyncio.get_running_loop()
+        try:
+            self.testClient._onSocketOpen(self.mockedClient, None, sock)
+            self.testClient._onSocketRegisterWrite(self.mockedClient, None,
+                                                   sock)
+            await asyncio.sleep(0.01)
+            self.mockedClient.loop_write.assert_called()
+            self.mockedClient.loop_misc.assert_called_once()
+            self.testClient._onSocketUnregisterWrite(self.mockedClient, None,
+                                                     sock)
+            self.assertFalse(loop.remove_writer(sock))
+            peer.send(b'\x00')
+            await asyncio.sleep(0.01)
+            self.mockedClient.loop_read.assert_called()
+            miscTask = self.testClient._miscTask
+            self.testClient._onSocketClose(self.mockedClient, None, sock)
+            self.assertFalse(loop.remove_reader(sock))
+            self.assertIsNone(self.testClient._miscTask)
+            await asyncio.sleep(0)
+            self.assertTrue(miscTask.cancelled())
+        finally:
+            sock.close()
+            peer.close()
+
+    async def test_reconnect(self):
+        """
+        A lost connection must be retried with the backoff delays until
+        reconnected.
+        """
+        testBackoff = Mock()
+        testBackoff.next.return_value = 0.0
+        with patch('pkgs.mqttClient.client.mqtt') as mockedMqtt:
+            mockedMqtt.Client.return_value = self.mockedClient
+            testClient = AsyncMqttClient(self.mockedLogging, self.testId,
+                                         'testPassword', backoff=testBackoff)
+        testClient._loop = asyncio.get_running_loop()
+        self.mockedClient.reconnect.side_effect = [OSError('refused'), None]
+        testClient._onDisconnect(self.mockedClient, None, 1)
+        reconnectTask = testClient._reconnectTask
+        testClient._onDisconnect(self.mockedClient, None, 1)
+        self.assertIs(testClient._reconnectTask, reconnectTask)
+        await reconnectTask
+        self.assertEqual(self.mockedClient.reconnect.call_count, 2)
+        self.assertIsNone(testClient._reconnectTask)
+
+    async def test_reconnectDisconnecting(self):
+        """
+        A requested disconnection must not be retried.
+        """
+        testBackoff = Mock()
+        with patch('pkgs.mqttClient.client.mqtt') as mockedMqtt:
+            mockedMqtt.Client.return_value = self.mockedClient
+            testClient = AsyncMqttClient(self.mockedLogging, self.testId,
+                                         'testPassword', backoff=testBackoff)
+        testClient.disconnect()
+        testClient._onDisconnect(self.mockedClient, None, 0)
+        self.assertIsNone(testClient._reconnectTask)
+        self.testClient._onDisconnect(self.mockedClient, None, 1)
+        self.assertIsNone(self.testClient._reconnectTask)
+
+    async def test_miscLoopEnd(self):
+        """
+        The housekeeping loop must end when paho reports an error.
+        """
+        self.mockedClient.loop_misc.return_value = mqtt.MQTT_ERR_NO_CONN
+        await asyncio.wait_for(self.testClient._miscLoop(), 1)
+        self.mockedClient.loop_misc.assert_called_once()
+
+    async def test_publishAck(self):
+        """
+        The publishAsync method must resolve with the message id when the
+        acknowledgement is received.
+        """
+        task = asyncio.ensure_future(
+            self.testClient.publishAsync(self.testMsg))
+        await asyncio.sleep(0)
+        self.assertFalse(task.done())
+        self.testClient._onPublish(self.mockedClient, None, 3)
+        await asyncio.sleep(0)
+        self.assertFalse(task.done())
+        self.testClient._onPublish(self.mockedClient, None, self.testInfo.mid)
+        self.assertEqual(await task, self.testInfo.mid)
+        self.assertEqual(self.testClient._pending, {})
+
+    async def test_publishAlreadySent(self):
+        """
+        The publishAsync method must return at once when the message was sent
+        by the publish call.
+        """
+        self.testInfo.is_published.return_value = True
+        testResult = await self.testClient.publishAsync(self.testMsg)
+        self.assertEqual(testResult, self.testInfo.mid)
+        self.assertEqual(self.testClient._pending, {})
+
+    async def test_publishTimeout(self):
+        """
+        The publishAsync method must raise a timeout error and forget the
+        message when no acknowledgement is received in time.
+        """
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.testClient.publishAsync(self.testMsg, timeout=0.01)
+        self.assertEqual(self.testClient._pending, {})
+
+    async def test_publishFailed(self):
+        """
+        The publishAsync method must raise an exception when paho cannot send
+        or queue the message.
+        """
+        self.testInfo.rc = mqtt.MQTT_ERR_QUEUE_SIZE
+        with self.assertRaises(MqttPublishFailed) as context:
+            await self.testClient.publishAsync(self.testMsg)
+        self.assertEqual(context.exception.rc, mqtt.MQTT_ERR_QUEUE_SIZE)
+        self.testInfo.rc = mqtt.MQTT_ERR_NO_CONN
+        self.testMsg.setQos(0)
+        with self.assertRaises(MqttPublishFailed):
+            await self.testClient.publishAsync(self.testMsg)
+
+    async def test_publishDisconnected(self):
+        """
+        The publishAsync method must wait for the acknowledgement of a QoS 1
+        message queued while disconnected.
+        """
+        self.testInfo.rc = mqtt.MQTT_ERR_NO_CONN
+        task = asyncio.ensure_future(
+            self.testClient.publishAsync(self.testMsg))
+        await asyncio.sleep(0)
+        self.testClient._onPublish(self.mockedClient, None, self.testInfo.mid)
+        self.assertEqual(await task, self.testInfo.mid)
+
+    async def test_publishDiskBuffer(self):
+        """
+        The publishAsync method must store the QoS 1 message while
+        disconnected, forwarded by a task once connected.
+        """
+        with tempfile.TemporaryDirectory() as testDir:
+            testBuffer = DiskBuffer(os.path.join(testDir, 'outbound.log'),
+                                    rate=1000.0)
+            with patch('pkgs.mqttClient.client.mqtt') as mockedMqtt:
+                mockedMqtt.Client.return_value = self.mockedClient
+                testClient = AsyncMqttClient(self.mockedLogging, self.testId,
+                                             'testPassword',
+                                             diskBuffer=testBuffer)
+            self.testClient = testClient
+            self.mockedClient.is_connected.return_value = False
+            self.assertIsNone(await testClient.publishAsync(self.testMsg))
+            self.mockedClient.publish.assert_not_called()
+            self.assertEqual(testBuffer.getDepth(), 1)
+            self.mockedClient.is_connected.return_value = True
+            await self._connect()
+            self.assertIsNotNone(testClient._fwdTask)
+            await asyncio.sleep(0.01)
+            self.assertIsNone(testClient._fwdTask)
+            self.assertEqual(testBuffer.getDepth(), 0)
+            self.mockedClient.publish.assert_called_once_with(
+                self.testMsg.getTopic(), payload=self.testMsg.toWire(),
+                qos=1, retain=self.testMsg.getRetain())
+            testBuffer.close()
+
+    async def test_mqttClientMethods(self):
+        """
+        The publish, subscribe and unsubscribe methods must keep the
+        MqttClient behavior, so the client can be used by the components
+        taking an MqttClient.
+        """
+        self.mockedClient.subscribe.return_value = (mqtt.MQTT_ERR_SUCCESS, 9)
+        self.mockedClient.unsubscribe.return_value = \
+            (mqtt.MQTT_ERR_SUCCESS, 10)
+        testRegistry = FleetRegistry(self.testClient)
+        testAck = testRegistry.start()
+        self.assertIsInstance(testAck, SubAck)
+        self.mockedClient.subscribe.assert_called_once_with(
+            [(UnitCxnStateMsg.TOPIC_FILTER, UnitCxnStateMsg.QOS)])
+        self.assertIsInstance(testRegistry.stop(), SubAck)
+        self.mockedClient.unsubscribe.assert_called_once_with(
+            [UnitCxnStateMsg.TOPIC_FILTER])
+        self.assertIs(self.testClient.publish(self.testMsg), self.testInfo)
+        self.mockedClient.publish.assert_called_once()
+
+    async def test_subscribe(self):
+        """
+        The subscribeAsync method must resolve with the acknowledgement once
+        the SUBACK is received.
+        """
+        self.mockedClient.subscribe.return_value = (mqtt.MQTT_ERR_SUCCESS, 9)
+        testSubs = [{'topic': 'topic/1', 'qos': 1}]
+        task = asyncio.ensure_future(self.testClient.subscribeAsync(testSubs))
+        await asyncio.sleep(0)
+        self.assertFalse(task.done())
+        self.testClient._onSubscribe(self.mockedClient, None, 9, (1,))
+        testResult = await task
+        self.assertEqual(testResult.getGrantedQos(), {'topic/1': 1})
+
+    async def test_unsubscribeTimeout(self):
+        """
+        The unsubscribeAsync method must raise a timeout error when no
+        UNSUBACK is received in time.
+        """
+        self.mockedClient.unsubscribe.return_value = (mqtt.MQTT_ERR_SUCCESS,
+                                                      9)
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.testClient.unsubscribeAsync([{'topic': 'topic/1'}],
+                                                   timeout=0.01)
+
+    async def test_messages(self):
+        """
+        The message iterator must yield the decoded received messages
+        after the registered handlers are called.
+        """
+        testHandler = Mock(__name__='testHandler')
+        self.testClient.registerMsgHandler(UnitWhldStateMsg, testHandler)
+        self.testClient._onMessage(self.mockedClient, None,
+                                   self._received(self.testMsg))
+        testHandler.assert_called_once()
+        testIter = self.testClient.messages()
+        testResult = await testIter.__anext__()
+        self.assertIsInstance(testResult, UnitWhldStateMsg)
+        self.assertEqual(testResult.getPayload(), self.testMsg.getPayload())
+        self.assertIs(testHandler.call_args[0][0], testResult)
+
+    async def test_messagesQueueFull(self):
+        """
+        The oldest received message must be dropped when the message
+        queue is full.
+        """
+        for unit in ('unit1', 'unit2', 'unit3'):
+            testMsg = UnitCxnStateMsg(unit)
+            testMsg.setAsOnline()
+            self.testClient._onMessage(self.mockedClient, None,
+                                       self._received(testMsg))
+        self.assertEqual(self.testClient.getDroppedCount(), 1)
+        testIter = self.testClient.messages()
+        self.assertEqual((await testIter.__anext__()).getUnit(), 'unit2')
+        self.assertEqual((await testIter.__anext__()).getUnit(), 'unit3')
+
+    def test_messagesCallback(self):
+        """
+        A message caught by a topic callback must not be queued.
+        """
+        testCallback = Mock(__name__='testCallback')
+        self.testClient.registerMsgCallback(self.testMsg.getTopic(),
+                                            testCallback)
+        testMsg = self._received(self.testMsg)
+        self.testClient._onMessage(self.mockedClient, None, testMsg)
+        testCallback.assert_called_once_with(self.mockedClient, None, testMsg)
+        self.assertTrue(self.testClient._getMsgQueue().empty())
+
+    def test_messagesUncaught(self):
+        """
+        A message of an unknown topic must be logged as uncaught and not
+        be queued.
+        """
+        testMsg = Mock(topic='unknown/topic', payload=b'{}')
+        self.testClient._onMessage(self.mockedClient, None, testMsg)
+        self.logger.warn.assert_called_once_with(f"uncaught message: "
+                                                 f"{testMsg}")
+        self.assertTrue(self.testClient._getMsgQueue().empty())
+
+    def test_messagesHandlerError(self):
+        """
+        A handler exception must be logged and the message not queued.
+        """
+        testHandler = Mock(__name__='testHandler',
+                           side_effect=ValueError('test error'))
+        self.testClient.registerMsgHandler(UnitWhldStateMsg, testHandler)
+        self.testClient._onMessage(self.mockedClient, None,
+                                   self._received(self.testMsg))
+        self.logger.error.assert_called_once()
+        self.assertTrue(self.testClient._getMsgQueue().empty())
+
+    def test_startStopLoop(self):
+        """
+        The network thread must not be started nor stopped.
+        """
+        self.testClient.startLoop()
+        self.testClient.stopLoop()
+        self.mockedClient.loop_start.assert_not_called()
+        self.mockedClient.loop_stop.assert_not_called()
+        self.assertEqual(self.logger.warn.call_count, 2)
@@ -0,0 +1,55 @@
+from unittest import TestCase
+
+import os
+import sys
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.mqttClient.backoff import Backoff     # noqa: E402
+
+
+class TestBackoff(TestCase):
+    """
+    The Backoff class test cases.
+    """
+    def test_nextExponential(self):
+        """
+        The delay cap must grow exponentially up to the maximum delay.
+        """
+        testBackoff = Backoff(minDelay=1.0, maxDelay=10.0, rand=lambda: 1.0)
+        testResult = [testBackoff.next() for _ in range(6)]
+        self.assertEqual(testResult, [1.0, 2.0, 4.0, 8.0, 10.0, 10.0])
+        self.assertEqual(testBackoff.getAttempts(), 6)
+
+    def test_nextJitter(self):
+        """
+        The delay must be drawn between 0 and the delay cap.
+        """
+        testBackoff = Backoff(minDelay=2.0, rand=lambda: 0.25)
+        self.assertEqual(testBackoff.next(), 0.5)
+        self.assertEqual(testBackoff.next(), 1.0)
+        testBackoff = Backoff(minDelay=1.0, maxDelay=4.0)
+        for _ in range(100):
+            self.assertTrue(0.0 <= testBackoff.next() <= 4.0)
+
+    def test_reset(self):
+        """
+        The reset method must restart the delays from the first cap.
+        """
+        testBackoff = Backoff(minDelay=1.0, rand=lambda: 1.0)
+        testBackoff.next()
+        testBackoff.next()
+        testBackoff.reset()
+        self.assertEqual(testBackoff.getAttempts(), 0)
+        self.assertEqual(testBackoff.next(), 1.0)
+
+    def test_nextLongOutage(self):
+        """
+        The delay cap must stay at the maximum delay however many
+        attempts were made.
+        """
+        testBackoff = Backoff(minDelay=1.0, maxDelay=60.0, rand=lambda: 1.0)
+        for _ in range(5000):
+            testResult = testBackoff.next()
+        self.assertEqual(testResult, 60.0)
+        self.assertEqual(testBackoff.getAttempts(), 5000)
@@ -0,0 +1,158 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+import os
+import sys
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.mqttClient.metrics import ClientMetrics, LatencyHistogram  # noqa: E402 E501
+
+
+class TestLatencyHistogram(TestCase):
+    """
+    The LatencyHistogram class test cases.
+    """
+    def test_observe(self):
+        """
+        The observe method must count the latencies in their bucket.
+        """
+        testHistogram = LatencyHistogram(buckets=(0.01, 0.1))
+        self.assertIsNone(testHistogram.getMean())
+        self.assertIsNone(testHistogram.getPercentile(50))
+        for testLatency in (0.005, 0.01, 0.05, 0.5):
+            testHistogram.observe(testLatency)
+        self.assertEqual(testHistogram.getCount(), 4)
+        self.assertAlmostEqual(testHistogram.getMean(), 0.14125)
+        self.assertEqual(testHistogram.getBuckets(),
+                         [(0.01, 2), (0.1, 1), (float('inf'), 1)])
+
+    def test_getPercentile(self):
+        """
+        The getPercentile method must return the upper bound of the
+        bucket holding the percentile.
+        """
+        testHistogram = LatencyHistogram(buckets=(0.01, 0.1))
+        for _ in range(90):
+            testHistogram.observe(0.001)
+        for _ in range(10):
+            testHistogram.observe(0.05)
+        self.assertEqual(testHistogram.getPercentile(50), 0.01)
+        self.assertEqual(testHistogram.getPercentile(90), 0.01)
+        self.assertEqual(testHistogram.getPercentile(99), 0.1)
+
+
+class TestClientMetrics(TestCase):
+    """
+    The ClientMetrics class test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.testTime = [0.0]
+        self.testMetrics = ClientMetrics(clock=lambda: self.testTime[0])
+        self.testKey = ('UnitWhldStateMsg', 'units/wheeled')
+
+    def test_publishAck(self):
+        """
+        The acknowledgements must end the flight of the publications and
+        record their latency.
+        """
+        self.testMetrics.onPublish(1, self.testKey)
+        self.testTime[0] = 0.5
+        self.testMetrics.onPublish(2, self.testKey)
+        self.assertEqual(self.testMetrics.getInFlight(), 2)
+        self.testTime[0] = 1.5
+        self.testMetrics.onAck(2)
+        self.testMetrics.onAck(1)
+        self.assertEqual(self.testMetrics.getInFlight(), 0)
+        testHistogram = self.testMetrics.getLatency(self.testKey)
+        self.assertEqual(testHistogram.getCount(), 2)
+        self.assertAlmostEqual(testHistogram.getMean(), 1.25)
+        self.assertEqual(self.testMetrics.getCount(ClientMetrics.ACKED_KEY),
+                         2)
+
+    def test_ackBeforePublish(self):
+        """
+        An acknowledgement received before its publication is recorded
+        must be matched once it is.
+        """
+        self.testTime[0] = 1.0
+        self.testMetrics.onAck(5)
+        self.testMetrics.onPublish(5, self.testKey, start=0.75)
+        self.assertEqual(self.testMetrics.getInFlight(), 0)
+        self.assertEqual(self.testMetrics.getLatency(self.testKey).getMean(),
+                         0.25)
+
+    def test_qos0Disconnect(self):
+        """
+        The QoS 0 publications must be timed until sent without being in
+        flight, the unsent ones and the unmatched acknowledgements being
+        forgotten on disconnection.
+        """
+        for mid in range(1, 101):
+            self.testMetrics.onPublish(mid, self.testKey, qos=0)
+        self.testMetrics.onPublish(101, self.testKey, qos=1)
+        self.testMetrics.onAck(200)
+        self.assertEqual(self.testMetrics.getInFlight(), 1)
+        self.testTime[0] = 0.5
+        self.testMetrics.onAck(1)
+        self.assertEqual(self.testMetrics.getLatency(self.testKey).getMean(),
+                         0.5)
+        self.testMetrics.onDisconnect()
+        self.assertEqual((self.testMetrics._sending,
+                          self.testMetrics._earlyAcks), ({}, {}))
+        self.testMetrics.onAck(101)
+        self.assertEqual(self.testMetrics.getInFlight(), 0)
+        self.testMetrics.onPublish(200, self.testKey, qos=1)
+        self.assertEqual(self.testMetrics.getInFlight(), 1)
+
+    def test_getCount(self):
+        """
+        The getCount method must sum the counts of the matching keys.
+        """
+        testKeys = [self.testKey, ('UnitWhldCmdMsg', 'units/wheeled'),
+                    (None, 'other')]
+        for testKey in testKeys:
+            self.testMetrics.onReceive(testKey)
+        self.testMetrics.onDrop(testKeys[2])
+        self.assertEqual(self.testMetrics.getCount(ClientMetrics.RECEIVED_KEY),
+                         3)
+        self.assertEqual(self.testMetrics.getCount(ClientMetrics.RECEIVED_KEY,
+                                                   topicRoot='units/wheeled'),
+                         2)
+        self.assertEqual(self.testMetrics.getCount(ClientMetrics.RECEIVED_KEY,
+                                                   msgClass='UnitWhldCmdMsg'),
+                         1)
+        self.assertEqual(self.testMetrics.getCounters(ClientMetrics.DROPPED_KEY),   # noqa: E501
+                         {(None, 'other'): 1})
+
+    def test_gauges(self):
+        """
+        The getGauges method must read the registered gauges and the
+        messages in flight.
+        """
+        mockedDepth = Mock(return_value=12)
+        self.testMetrics.addGauge('queue', mockedDepth)
+        self.testMetrics.onPublish(1, self.testKey)
+        self.assertEqual(self.testMetrics.getGauges(),
+                         {ClientMetrics.IN_FLIGHT_KEY: 1, 'queue': 12})
+        self.testMetrics.removeGauge('queue')
+        self.assertEqual(self.testMetrics.getGauges(),
+                         {ClientMetrics.IN_FLIGHT_KEY: 1})
+
+    def test_reset(self):
+        """
+        The reset method must clear the counters and histograms but keep
+        the messages in flight.
+        """
+        self.testMetrics.onPublish(1, self.testKey)
+        self.testMetrics.reset()
+        self.assertEqual(self.testMetrics.getCount(ClientMetrics.PUBLISHED_KEY),   # noqa: E501
+                         0)
+        self.testMetrics.onAck(1)
+        self.assertEqual(self.testMetrics.getCount(ClientMetrics.ACKED_KEY),
+                         1)
+        self.assertEqual(self.testMetrics.getLatencies().keys(),
+                         {self.testKey})
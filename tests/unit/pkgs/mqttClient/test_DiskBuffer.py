@@ -0,0 +1,207 @@
+import paho.mqtt.client as mqtt
+from unittest import TestCase
+from unittest.mock import Mock
+
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.mqttClient.diskBuffer import DiskBuffer   # noqa: E402
+
+
+class TestDiskBuffer(TestCase):
+    """
+    The DiskBuffer class test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.testDir = tempfile.TemporaryDirectory()
+        self.testPath = os.path.join(self.testDir.name, 'outbound.log')
+        self.testMsgs = [(f"test/topic/{idx}", bytes([idx]) * 10, 1,
+                          idx % 2 == 0) for idx in range(5)]
+
+    def tearDown(self):
+        """
+        Test cases teardown.
+        """
+        self.testDir.cleanup()
+
+    def _mockPublish(self, rc=mqtt.MQTT_ERR_SUCCESS):
+        """
+        Create a mocked publish function returning a publication info.
+        """
+        return Mock(return_value=Mock(rc=rc))
+
+    def _fill(self, testBuffer):
+        """
+        Store the test messages.
+        """
+        for testMsg in self.testMsgs:
+            self.assertTrue(testBuffer.put(*testMsg))
+
+    def test_drain(self):
+        """
+        The drain method must forward the stored messages in order and
+        empty the log once all forwarded.
+        """
+        testBuffer = DiskBuffer(self.testPath)
+        self._fill(testBuffer)
+        self.assertEqual(testBuffer.getDepth(), 5)
+        mockedPublish = self._mockPublish()
+        self.assertEqual(testBuffer.drain(mockedPublish, maxCount=2), 2)
+        self.assertEqual(testBuffer.getDepth(), 3)
+        self.assertEqual(testBuffer.drain(mockedPublish), 3)
+        self.assertEqual([testCall.args for testCall
+                          in mockedPublish.call_args_list], self.testMsgs)
+        self.assertEqual(testBuffer.getDepth(), 0)
+        self.assertEqual(testBuffer.getSize(), 0)
+        self.assertEqual(os.path.getsize(self.testPath), 0)
+        self.assertEqual(testBuffer.getStats(),
+                         {DiskBuffer.STORED_KEY: 5,
+                          DiskBuffer.FORWARDED_KEY: 5,
+                          DiskBuffer.DROPPED_KEY: 0})
+        testBuffer.close()
+
+    def test_drainFailed(self):
+        """
+        The drain method must keep pending the message refused by the
+        client, and stop forwarding.
+        """
+        testBuffer = DiskBuffer(self.testPath)
+        self._fill(testBuffer)
+        mockedPublish = self._mockPublish(mqtt.MQTT_ERR_QUEUE_SIZE)
+        self.assertEqual(testBuffer.drain(mockedPublish), 0)
+        mockedPublish.assert_called_once_with(*self.testMsgs[0])
+        self.assertEqual(testBuffer.getDepth(), 5)
+        self.assertEqual(testBuffer.getStats()[DiskBuffer.FORWARDED_KEY], 0)
+        testBuffer.close()
+        testBuffer = DiskBuffer(self.testPath)
+        mockedPublish = self._mockPublish()
+        self.assertEqual(testBuffer.drain(mockedPublish), 5)
+        self.assertEqual([testCall.args for testCall
+                          in mockedPublish.call_args_list], self.testMsgs)
+        testBuffer.close()
+
+    def test_drainNoConn(self):
+        """
+        The drain method must forward the QoS 1 or 2 message kept by the
+        client while disconnected, keep a QoS 0 one pending, and stop
+        forwarding.
+        """
+        self.testMsgs[1] = self.testMsgs[1][:2] + (0,) + self.testMsgs[1][3:]
+        testBuffer = DiskBuffer(self.testPath)
+        self._fill(testBuffer)
+        mockedPublish = self._mockPublish(mqtt.MQTT_ERR_NO_CONN)
+        self.assertEqual(testBuffer.drain(mockedPublish), 1)
+        self.assertEqual(testBuffer.getDepth(), 4)
+        self.assertEqual(testBuffer.drain(mockedPublish), 0)
+        self.assertEqual(testBuffer.getDepth(), 4)
+        self.assertEqual([testCall.args for testCall
+                          in mockedPublish.call_args_list],
+                         self.testMsgs[:2])
+        testBuffer.close()
+
+    def test_drainUnlocked(self):
+        """
+        The drain method must publish without the buffer lock held, the
+        messages stored meanwhile, compacting the log, being kept in
+        order.
+        """
+        testBuffer = DiskBuffer(self.testPath, maxBytes=180)
+        self._fill(testBuffer)
+        testMsg = ('test/topic/new', b'new', 1, False)
+
+        def testPublish(*args):
+            self.assertFalse(testBuffer._lock.locked())
+            if args == self.testMsgs[1]:
+                self.assertTrue(testBuffer.put(*testMsg))
+                self.assertEqual(testBuffer._readOffset, 0)
+            return Mock(rc=mqtt.MQTT_ERR_SUCCESS)
+
+        mockedPublish = Mock(side_effect=testPublish)
+        self.assertEqual(testBuffer.drain(mockedPublish, maxCount=1), 1)
+        self.assertEqual(testBuffer.drain(mockedPublish), 5)
+        self.assertEqual([testCall.args for testCall
+                          in mockedPublish.call_args_list],
+                         self.testMsgs + [testMsg])
+        testBuffer.close()
+
+    def test_reopen(self):
+        """
+        The pending messages must survive a reopening, the forwarded ones
+        being skipped.
+        """
+        testBuffer = DiskBuffer(self.testPath)
+        self._fill(testBuffer)
+        testBuffer.drain(self._mockPublish(), maxCount=2)
+        testBuffer.close()
+        testBuffer = DiskBuffer(self.testPath)
+        self.assertEqual(testBuffer.getDepth(), 3)
+        mockedPublish = self._mockPublish()
+        testBuffer.drain(mockedPublish)
+        self.assertEqual([testCall.args for testCall
+                          in mockedPublish.call_args_list], self.testMsgs[2:])
+        testBuffer.close()
+
+    def test_reopenTornRecord(self):
+        """
+        A torn record at the end of the log must be discarded on
+        reopening.
+        """
+        testBuffer = DiskBuffer(self.testPath)
+        self._fill(testBuffer)
+        testBuffer.close()
+        with open(self.testPath, 'r+b') as testFile:
+            testFile.truncate(os.path.getsize(self.testPath) - 3)
+        testBuffer = DiskBuffer(self.testPath)
+        self.assertEqual(testBuffer.getDepth(), 4)
+        self.assertTrue(testBuffer.put(*self.testMsgs[4]))
+        mockedPublish = self._mockPublish()
+        testBuffer.drain(mockedPublish)
+        self.assertEqual([testCall.args for testCall
+                          in mockedPublish.call_args_list], self.testMsgs)
+        testBuffer.close()
+
+    def test_putFull(self):
+        """
+        The put method must drop the new messages when the size cap is
+        reached, compacting the log to reuse the forwarded room.
+        """
+        testBuffer = DiskBuffer(self.testPath, maxBytes=100)
+        self.assertTrue(testBuffer.put(*self.testMsgs[0]))
+        self.assertTrue(testBuffer.put(*self.testMsgs[1]))
+        self.assertFalse(testBuffer.put(*self.testMsgs[2]))
+        self.assertEqual(testBuffer.getStats()[DiskBuffer.DROPPED_KEY], 1)
+        testBuffer.drain(self._mockPublish(), maxCount=1)
+        self.assertTrue(testBuffer.put(*self.testMsgs[2]))
+        self.assertLessEqual(os.path.getsize(self.testPath), 100)
+        mockedPublish = self._mockPublish()
+        testBuffer.drain(mockedPublish)
+        self.assertEqual([testCall.args for testCall
+                          in mockedPublish.call_args_list],
+                         self.testMsgs[1:3])
+        testBuffer.close()
+
+    def test_forward(self):
+        """
+        The forward method must pace the forwarded messages at the rate
+        while ready.
+        """
+        testBuffer = DiskBuffer(self.testPath, rate=20.0)
+        self._fill(testBuffer)
+        mockedSleep = Mock()
+        mockedReady = Mock(side_effect=[True, True, False])
+        testResult = testBuffer.forward(self._mockPublish(), mockedReady,
+                                        sleepFn=mockedSleep)
+        self.assertEqual(testResult, 2)
+        self.assertEqual(testBuffer.getDepth(), 3)
+        mockedSleep.assert_called_with(0.05)
+        self.assertEqual(mockedSleep.call_count, 2)
+        testResult = testBuffer.forward(self._mockPublish(), lambda: True,
+                                        sleepFn=mockedSleep)
+        self.assertEqual(testResult, 3)
+        testBuffer.close()
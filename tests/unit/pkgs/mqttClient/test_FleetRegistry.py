@@ -0,0 +1,158 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+import os
+import sys
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.messages import BinaryFormatNotSupported, \
+    UnitCxnStateMsg                                             # noqa: E402
+from pkgs.mqttClient.client import MqttClient                   # noqa: E402
+from pkgs.mqttClient.fleetRegistry import FleetRegistry         # noqa: E402
+from pkgs.mqttClient.loopback import LoopbackBroker             # noqa: E402
+
+
+class TestFleetRegistry(TestCase):
+    """
+    The FleetRegistry class test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.mockedClient = Mock()
+        self.testRegistry = FleetRegistry(self.mockedClient)
+
+    def _state(self, unit, state):
+        """
+        Build a received unit connection state message.
+        """
+        wire = UnitCxnStateMsg(unit, {UnitCxnStateMsg.STATE_KEY: state})
+        return UnitCxnStateMsg.decode(wire.toWire(), wire.getTopic(),
+                                      lazy=True)
+
+    def test_startStop(self):
+        """
+        The start and stop methods must follow the unit connection
+        states through the client.
+        """
+        testBroker = LoopbackBroker()
+        testClient = MqttClient(Mock(), 'registry', 'password',
+                                clientFactory=testBroker.createClient)
+        testClient.connect('loopback', 1883)
+        testClient._client.loop(timeout=0)
+        testRegistry = FleetRegistry(testClient)
+        testAck = testRegistry.start()
+        testClient._client.loop(timeout=0)
+        self.assertEqual(testAck.getGrantedQos(),
+                         {UnitCxnStateMsg.TOPIC_FILTER: UnitCxnStateMsg.QOS})
+        testState = UnitCxnStateMsg('unit1', {
+            UnitCxnStateMsg.STATE_KEY: UnitCxnStateMsg.ONLINE_STATE})
+        testBroker.publish(testState.getTopic(), testState.toWire())
+        testClient._client.loop(timeout=0)
+        self.assertTrue(testRegistry.isOnline('unit1'))
+        testAck = testRegistry.stop()
+        testClient._client.loop(timeout=0)
+        self.assertTrue(testAck.isDone())
+        self.assertEqual(testClient._registry.getHandlers(UnitCxnStateMsg),
+                         ())
+        self.assertTrue(testRegistry.isOnline('unit1'))
+
+    def test_startDefaultClient(self):
+        """
+        The start method must use the default client when none is given.
+        """
+        testRegistry = FleetRegistry()
+        with patch('pkgs.mqttClient.client.getDefaultClient') as mockedGet:
+            testRegistry.start()
+        mockedGet.return_value.subscribe.assert_called_once()
+
+    def test_update(self):
+        """
+        The update method must index the online units.
+        """
+        self.assertTrue(self.testRegistry.update(self._state('unit1', 'online')))                     # noqa: E501
+        self.assertTrue(self.testRegistry.update(self._state('unit2', 'online')))                     # noqa: E501
+        self.assertTrue(self.testRegistry.update(self._state('unit3', 'offline')))                    # noqa: E501
+        self.assertTrue(self.testRegistry.isOnline('unit1'))
+        self.assertFalse(self.testRegistry.isOnline('unit3'))
+        self.assertFalse(self.testRegistry.isOnline('unit4'))
+        self.assertTrue(self.testRegistry.isKnown('unit3'))
+        self.assertFalse(self.testRegistry.isKnown('unit4'))
+        self.assertEqual(self.testRegistry.onlineUnits(), {'unit1', 'unit2'})
+        self.assertEqual(self.testRegistry.getOnlineCount(), 2)
+        self.assertEqual(self.testRegistry.getUnitCount(), 3)
+        self.assertTrue(self.testRegistry.update(self._state('unit1', 'offline')))                    # noqa: E501
+        self.assertEqual(self.testRegistry.onlineUnits(), {'unit2'})
+
+    def test_updateNoChange(self):
+        """
+        The update method must ignore a repeated state and keep sharing
+        the online units set.
+        """
+        self.testRegistry.update(self._state('unit1', 'online'))
+        testUnits = self.testRegistry.onlineUnits()
+        self.assertFalse(self.testRegistry.update(self._state('unit1', 'online')))                    # noqa: E501
+        self.assertIs(self.testRegistry.onlineUnits(), testUnits)
+
+    def test_updateCleared(self):
+        """
+        The update method must forget a unit whose retained state was
+        cleared.
+        """
+        self.testRegistry.update(self._state('unit1', 'online'))
+        testMsg = UnitCxnStateMsg.decode(b'', 'units/connectionState/unit1',
+                                         lazy=True)
+        self.assertTrue(self.testRegistry.update(testMsg))
+        self.assertFalse(self.testRegistry.isKnown('unit1'))
+        self.assertEqual(self.testRegistry.onlineUnits(), set())
+        self.assertFalse(self.testRegistry.update(testMsg))
+
+    def test_updateInvalid(self):
+        """
+        The update method must raise for an invalid payload, keeping the
+        unit, and the client must log it.
+        """
+        self.testRegistry.update(self._state('unit1', 'online'))
+        testTopic = UnitCxnStateMsg('unit1').getTopic()
+        testMsg = UnitCxnStateMsg.decode(b'garbage', testTopic, lazy=True)
+        with self.assertRaises(BinaryFormatNotSupported):
+            self.testRegistry.update(testMsg)
+        self.assertEqual(self.testRegistry.onlineUnits(), {'unit1'})
+        testClient = MqttClient(Mock(), 'registry', 'password',
+                                clientFactory=LoopbackBroker().createClient)
+        testRegistry = FleetRegistry(testClient)
+        testRegistry.start()
+        testRegistry.update(self._state('unit1', 'online'))
+        testPahoMsg = Mock(topic=testTopic, payload=b'garbage')
+        testClient._onMessage(None, None, testPahoMsg)
+        testClient.getLogger().error.assert_called_once()
+        self.assertEqual(testRegistry.onlineUnits(), {'unit1'})
+
+    def test_listeners(self):
+        """
+        The listeners must only be notified of the state changes.
+        """
+        testListeners = [Mock(), Mock()]
+        for testListener in testListeners:
+            self.testRegistry.addListener(testListener)
+        self.testRegistry.update(self._state('unit1', 'online'))
+        self.testRegistry.update(self._state('unit1', 'online'))
+        self.testRegistry.removeListener(testListeners[1])
+        self.testRegistry.update(self._state('unit1', 'offline'))
+        self.assertEqual(testListeners[0].call_args_list,
+                         [(('unit1', True),), (('unit1', False),)])
+        testListeners[1].assert_called_once_with('unit1', True)
+
+    def test_retainedFlood(self):
+        """
+        A retained flood of the whole fleet must be indexed at once.
+        """
+        for idx in range(5000):
+            self.testRegistry.update(self._state(f"unit{idx}",
+                                                 'online' if idx % 2
+                                                 else 'offline'))
+        self.assertEqual(self.testRegistry.getUnitCount(), 5000)
+        self.assertEqual(len(self.testRegistry.onlineUnits()), 2500)
+        self.assertTrue(self.testRegistry.isOnline('unit4999'))
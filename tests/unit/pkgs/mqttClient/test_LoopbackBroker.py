@@ -0,0 +1,203 @@
+import paho.mqtt.client as mqtt
+import threading
+from unittest import TestCase
+from unittest.mock import Mock
+
+import os
+import sys
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.messages import UnitCxnStateMsg, UnitWhldStateMsg     # noqa: E402
+from pkgs.mqttClient.backoff import Backoff                     # noqa: E402
+from pkgs.mqttClient.client import MqttClient                   # noqa: E402
+from pkgs.mqttClient.loopback import LoopbackBroker             # noqa: E402
+
+
+class TestLoopbackBroker(TestCase):
+    """
+    The LoopbackBroker class test cases, running real clients.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.testBroker = LoopbackBroker()
+        self.testState = UnitWhldStateMsg('unit1', {
+            UnitWhldStateMsg.STEERING_KEY: 0.5,
+            UnitWhldStateMsg.THROTTLE_KEY: -0.5,
+        })
+
+    def _createClient(self, clientId, **kwargs):
+        """
+        Create a client of the test broker, connected.
+        """
+        testClient = MqttClient(Mock(), clientId, 'password',
+                                clientFactory=self.testBroker.createClient,
+                                **kwargs)
+        testClient.connect('loopback', 1883)
+        self._pump(testClient)
+        return testClient
+
+    def _pump(self, *testClients):
+        """
+        Run the queued events of the clients until idle.
+        """
+        for _ in range(3):
+            for testClient in testClients:
+                testClient._client.loop(timeout=0)
+
+    def test_connect(self):
+        """
+        The connection must be acknowledged.
+        """
+        testClient = self._createClient('client1')
+        self.assertTrue(testClient.isConnected())
+        self.assertEqual(self.testBroker.getClientIds(), ['client1'])
+        testClient.disconnect()
+        self._pump(testClient)
+        self.assertFalse(testClient.isConnected())
+        self.assertEqual(self.testBroker.getClientIds(), [])
+
+    def test_publishWildcard(self):
+        """
+        The publications must be routed to the matching subscriptions
+        and decoded by the receiving client.
+        """
+        publisher = self._createClient('publisher')
+        subscriber = self._createClient('subscriber')
+        mockedHandler = Mock(__name__='mockedHandler')
+        subscriber.registerMsgHandler(UnitWhldStateMsg, mockedHandler)
+        testAck = subscriber.subscribe([{'topic': 'units/wheeled/+/state',
+                                         'qos': 0}])
+        self._pump(subscriber)
+        self.assertEqual(testAck.getGrantedQos(),
+                         {'units/wheeled/+/state': 0})
+        publisher.publish(self.testState)
+        publisher.publish(UnitCxnStateMsg('unit1', {
+            UnitCxnStateMsg.STATE_KEY: UnitCxnStateMsg.ONLINE_STATE}))
+        self._pump(publisher, subscriber)
+        mockedHandler.assert_called_once()
+        testResult = mockedHandler.call_args[0][0]
+        self.assertEqual(testResult.getUnit(), 'unit1')
+        self.assertEqual(testResult.getSteering(), 0.5)
+
+    def test_retained(self):
+        """
+        The retained messages must be delivered to the new subscriptions
+        and cleared by an empty retained payload.
+        """
+        publisher = self._createClient('publisher')
+        testMsg = UnitCxnStateMsg('unit1', {
+            UnitCxnStateMsg.STATE_KEY: UnitCxnStateMsg.ONLINE_STATE})
+        publisher.publish(testMsg)
+        self.assertEqual(self.testBroker.getRetained(testMsg.getTopic()),
+                         testMsg.toWire())
+        subscriber = self._createClient('subscriber')
+        mockedCallback = Mock(__name__='mockedCallback')
+        subscriber.registerMsgCallback(UnitCxnStateMsg.TOPIC_FILTER,
+                                       mockedCallback)
+        subscriber.subscribe([{'topic': UnitCxnStateMsg.TOPIC_FILTER,
+                               'qos': 1}])
+        self._pump(subscriber)
+        testReceived = mockedCallback.call_args[0][2]
+        self.assertTrue(testReceived.retain)
+        self.assertEqual(testReceived.qos, 1)
+        publisher._client.publish(testMsg.getTopic(), b'', retain=True)
+        self.assertIsNone(self.testBroker.getRetained(testMsg.getTopic()))
+
+    def test_lastWill(self):
+        """
+        The last will of a lost client must be published, but not the
+        one of a disconnected client.
+        """
+        subscriber = self._createClient('subscriber')
+        mockedHandler = Mock(__name__='mockedHandler')
+        subscriber.registerMsgHandler(UnitCxnStateMsg, mockedHandler)
+        subscriber.subscribe([{'topic': UnitCxnStateMsg.TOPIC_FILTER,
+                               'qos': 1}])
+        unit = self._createClient('unit1')
+        unit.disconnect()
+        self._pump(subscriber, unit)
+        mockedHandler.assert_not_called()
+        unit.connect('loopback', 1883)
+        self._pump(unit)
+        self.assertTrue(self.testBroker.dropClient('unit1'))
+        self.assertFalse(self.testBroker.dropClient('unit1'))
+        self.assertEqual(unit._client.loop(timeout=0),
+                         mqtt.MQTT_ERR_CONN_LOST)
+        self._pump(subscriber)
+        testResult = mockedHandler.call_args[0][0]
+        self.assertEqual(testResult.getUnit(), 'unit1')
+        self.assertTrue(testResult.isOffline())
+
+    def test_publishAck(self):
+        """
+        The QoS 1 publications must be acknowledged once routed, the
+        ones published while disconnected being sent on reconnection.
+        """
+        publisher = self._createClient('publisher')
+        self.testState.setQos(1)
+        testInfo = publisher.publish(self.testState)
+        self.assertFalse(testInfo.is_published())
+        self._pump(publisher)
+        self.assertTrue(testInfo.is_published())
+        publisher.disconnect()
+        self._pump(publisher)
+        testInfo = publisher.publish(self.testState)
+        self.assertEqual(testInfo.rc, mqtt.MQTT_ERR_NO_CONN)
+        publisher.connect('loopback', 1883)
+        self._pump(publisher)
+        self.assertTrue(testInfo.is_published())
+        testMetrics = publisher.getMetrics()
+        self.assertEqual(testMetrics.getCount(testMetrics.ACKED_KEY), 2)
+        self.assertEqual(testMetrics.getInFlight(), 0)
+
+    def test_persistentSession(self):
+        """
+        A persistent session must keep the subscriptions and QoS 1
+        messages while disconnected.
+        """
+        publisher = self._createClient('publisher')
+        subscriber = self._createClient('subscriber', cleanSession=False)
+        mockedHandler = Mock(__name__='mockedHandler')
+        subscriber.registerMsgHandler(UnitWhldStateMsg, mockedHandler)
+        subscriber.subscribe([{'topic': UnitWhldStateMsg.TOPIC_FILTER,
+                               'qos': 1}])
+        subscriber.disconnect()
+        self._pump(subscriber)
+        self.testState.setQos(1)
+        publisher.publish(self.testState)
+        self._pump(publisher)
+        subscriber._client.subscribe = Mock()
+        subscriber.connect('loopback', 1883)
+        self._pump(subscriber)
+        subscriber._client.subscribe.assert_not_called()
+        mockedHandler.assert_called_once()
+
+    def test_networkLoopReconnect(self):
+        """
+        The managed network loop must reconnect a lost client and
+        restore its subscriptions.
+        """
+        publisher = self._createClient('publisher')
+        subscriber = self._createClient('subscriber',
+                                        backoff=Backoff(minDelay=0.01))
+        received = threading.Event()
+        subscriber.registerMsgHandler(UnitWhldStateMsg,
+                                      lambda msg: received.set())
+        subscriber.subscribe([{'topic': UnitWhldStateMsg.TOPIC_FILTER,
+                               'qos': 0}])
+        subscriber.startLoop()
+        try:
+            self.testBroker.dropClient('subscriber')
+            for _ in range(100):
+                if self.testBroker.getClientIds() == ['publisher',
+                                                      'subscriber'] and \
+                        subscriber.isConnected():
+                    break
+                threading.Event().wait(0.01)
+            publisher.publish(self.testState)
+            self.assertTrue(received.wait(2.0))
+        finally:
+            subscriber.stopLoop()
@@ -0,0 +1,133 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+import os
+import sys
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.messages import UnitCxnStateMsg, UnitWhldCmdMsg, \
+    UnitWhldStateMsg                                    # noqa: E402
+from pkgs.mqttClient.msgRegistry import MsgRegistry     # noqa: E402
+
+
+class TestMsgRegistry(TestCase):
+    """
+    The MsgRegistry class test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.testUnit = 'unit1'
+        self.testRegistry = MsgRegistry()
+        self.testMsg = UnitWhldStateMsg(self.testUnit, {
+            UnitWhldStateMsg.STEERING_KEY: 0.5,
+            UnitWhldStateMsg.THROTTLE_KEY: -0.5,
+        })
+
+    def test_defaultClasses(self):
+        """
+        The RC mission messages must be registered by default.
+        """
+        testMsgs = [UnitCxnStateMsg(self.testUnit),
+                    UnitWhldCmdMsg(self.testUnit),
+                    UnitWhldStateMsg(self.testUnit)]
+        for testMsg in testMsgs:
+            testResult = self.testRegistry.getMsgClass(testMsg.getTopic())
+            self.assertIs(testResult, type(testMsg))
+
+    def test_getMsgClassUnknown(self):
+        """
+        The getMsgClass method must return None for unknown topics.
+        """
+        self.assertIsNone(self.testRegistry.getMsgClass('unknown/topic'))
+
+    def test_registerCustomFilter(self):
+        """
+        The register method must register the class on the given filter
+        and unregister must remove it.
+        """
+        testFilter = 'custom/+/state'
+        self.testRegistry.register(UnitWhldStateMsg, testFilter)
+        self.assertIs(self.testRegistry.getMsgClass('custom/unit1/state'),
+                      UnitWhldStateMsg)
+        self.testRegistry.unregister(UnitWhldStateMsg, testFilter)
+        self.assertIsNone(self.testRegistry.getMsgClass('custom/unit1/state'))
+
+    def test_decode(self):
+        """
+        The decode method must return the typed message with the unit ID
+        of the topic.
+        """
+        testResult = self.testRegistry.decode(self.testMsg.getTopic(),
+                                              self.testMsg.toWire())
+        self.assertIsInstance(testResult, UnitWhldStateMsg)
+        self.assertEqual(testResult.getUnit(), self.testUnit)
+        self.assertEqual(testResult.getPayload(), self.testMsg.getPayload())
+        self.assertIsNone(self.testRegistry.decode('unknown/topic', b'{}'))
+
+    def test_dispatch(self):
+        """
+        The dispatch method must decode the message once and call
+        every handler of its class.
+        """
+        testHandlers = [Mock(), Mock()]
+        otherHandler = Mock()
+        for testHandler in testHandlers:
+            self.testRegistry.addHandler(UnitWhldStateMsg, testHandler)
+        self.testRegistry.addHandler(UnitWhldCmdMsg, otherHandler)
+        testResult = self.testRegistry.dispatch(self.testMsg.getTopic(),
+                                                self.testMsg.toWire())
+        self.assertTrue(testResult)
+        msg = testHandlers[0].call_args[0][0]
+        self.assertIsInstance(msg, UnitWhldStateMsg)
+        testHandlers[1].assert_called_once_with(msg)
+        otherHandler.assert_not_called()
+
+    def test_dispatchNoHandler(self):
+        """
+        The dispatch method must return False when no handler is
+        registered for the topic class.
+        """
+        self.assertFalse(self.testRegistry.dispatch(self.testMsg.getTopic(),
+                                                    self.testMsg.toWire()))
+        self.assertFalse(self.testRegistry.dispatch('unknown/topic', b'{}'))
+
+    def test_removeHandler(self):
+        """
+        The removeHandler method must stop calling the handler.
+        """
+        testHandler = Mock()
+        self.testRegistry.addHandler(UnitWhldStateMsg, testHandler)
+        self.testRegistry.removeHandler(UnitWhldStateMsg, testHandler)
+        self.testRegistry.dispatch(self.testMsg.getTopic(),
+                                   self.testMsg.toWire())
+        testHandler.assert_not_called()
+
+    def test_getHandlers(self):
+        """
+        The getHandlers method must return the handlers of a class
+        or an empty tuple.
+        """
+        testHandler = Mock()
+        self.testRegistry.addHandler(UnitWhldStateMsg, testHandler)
+        self.assertEqual(self.testRegistry.getHandlers(UnitWhldStateMsg),
+                         (testHandler,))
+        self.assertEqual(self.testRegistry.getHandlers(UnitCxnStateMsg), ())
+        self.assertEqual(self.testRegistry.getHandlers(object), ())
+
+    def test_dispatchLazy(self):
+        """
+        The dispatch method must give lazily decoded messages by default
+        and parsed ones when not lazy.
+        """
+        testBuf = self.testMsg.toWire()
+        testHandler = Mock()
+        self.testRegistry.addHandler(UnitWhldStateMsg, testHandler)
+        self.testRegistry.dispatch(self.testMsg.getTopic(), testBuf)
+        self.assertIs(testHandler.call_args[0][0]._raw, testBuf)
+        testRegistry = MsgRegistry(lazy=False)
+        testRegistry.addHandler(UnitWhldStateMsg, testHandler)
+        testRegistry.dispatch(self.testMsg.getTopic(), testBuf)
+        self.assertIsNone(testHandler.call_args[0][0]._raw)
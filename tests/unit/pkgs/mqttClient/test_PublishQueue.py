@@ -0,0 +1,259 @@
+import threading
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+import os
+import sys
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.messages import UnitCxnStateMsg, UnitWhldCmdMsg   # noqa: E402
+from pkgs.mqttClient.exceptions import PublishQueueFull, \
+    UnknownQueuePolicy                                      # noqa: E402
+from pkgs.mqttClient.publishQueue import PublishQueue       # noqa: E402
+
+
+class TestPublishQueue(TestCase):
+    """
+    The PublishQueue class test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.ready = True
+        self.mockedPublish = Mock()
+        self.testQueue = PublishQueue(maxSize=2,
+                                      publishFn=self.mockedPublish,
+                                      readyFn=lambda: self.ready)
+
+    def _cmd(self, unit):
+        """
+        Build a command message.
+        """
+        return UnitWhldCmdMsg(unit, {UnitWhldCmdMsg.STEERING_KEY: 0.0})
+
+    def _published(self):
+        """
+        Get the published messages.
+        """
+        return [c[0][0] for c in self.mockedPublish.call_args_list]
+
+    def test_constructorDefaultClient(self):
+        """
+        The constructor must use the mqttClient publish, connection
+        state, publications in flight and logger by default.
+        """
+        with patch('pkgs.mqttClient.publishQueue.client') as mockedClient:
+            mockedInFlight = mockedClient.getMetrics.return_value.getInFlight     # noqa: E501
+            mockedInFlight.return_value = 0
+            testQueue = PublishQueue(maxInFlight=1)
+            testQueue.put(self._cmd('unit1'))
+            testQueue.put(self._cmd('unit2'))
+            mockedClient.isConnected.return_value = False
+            self.assertEqual(testQueue.drain(), 0)
+            mockedClient.isConnected.return_value = True
+            self.assertEqual(testQueue.drain(maxCount=1), 1)
+            mockedClient.publish.assert_called_once()
+            mockedInFlight.return_value = 1
+            self.assertEqual(testQueue.drain(), 0)
+            mockedInFlight.return_value = 0
+            mockedClient.publish.side_effect = ValueError('test error')
+            self.assertEqual(testQueue.drain(), 0)
+            mockedLogger = mockedClient.getDefaultClient.return_value.getLogger.return_value  # noqa: E501
+            mockedLogger.error.assert_called_once()
+
+    def test_constructorUnknownPolicy(self):
+        """
+        The constructor and setPolicy must raise an exception for an
+        unknown policy.
+        """
+        with self.assertRaises(UnknownQueuePolicy):
+            PublishQueue(policy='unknown')
+        with self.assertRaises(UnknownQueuePolicy):
+            PublishQueue(policies={UnitWhldCmdMsg: 'unknown'})
+        with self.assertRaises(UnknownQueuePolicy):
+            self.testQueue.setPolicy(UnitWhldCmdMsg, 'unknown')
+
+    def test_getPolicy(self):
+        """
+        The getPolicy method must return the class policy or the default
+        one.
+        """
+        self.testQueue.setPolicy(UnitWhldCmdMsg, PublishQueue.REJECT)
+        self.assertEqual(self.testQueue.getPolicy(UnitWhldCmdMsg),
+                         PublishQueue.REJECT)
+        self.assertEqual(self.testQueue.getPolicy(UnitCxnStateMsg),
+                         PublishQueue.DROP_OLDEST)
+
+    def test_putDrain(self):
+        """
+        The queued messages must be published in order while ready.
+        """
+        testMsgs = [self._cmd('unit1'), self._cmd('unit2')]
+        for testMsg in testMsgs:
+            self.assertTrue(self.testQueue.put(testMsg))
+        self.assertEqual(self.testQueue.getDepth(), 2)
+        self.ready = False
+        self.assertEqual(self.testQueue.drain(), 0)
+        self.ready = True
+        self.assertEqual(self.testQueue.drain(maxCount=1), 1)
+        self.assertEqual(self.testQueue.drain(), 1)
+        self.assertEqual(self._published(), testMsgs)
+        self.assertEqual(self.testQueue.getDepth(), 0)
+
+    def test_dropOldest(self):
+        """
+        The drop oldest policy must drop the oldest queued message of
+        the same class, or the new message if none is queued.
+        """
+        testMsgs = [self._cmd(unit) for unit in ('unit1', 'unit2', 'unit3')]
+        for testMsg in testMsgs:
+            self.assertTrue(self.testQueue.put(testMsg))
+        self.assertFalse(self.testQueue.put(UnitCxnStateMsg('unit1')))
+        self.testQueue.drain()
+        self.assertEqual(self._published(), testMsgs[1:])
+        self.assertEqual(self.testQueue.getStats(UnitWhldCmdMsg),
+                         {PublishQueue.QUEUED_KEY: 3,
+                          PublishQueue.SENT_KEY: 2,
+                          PublishQueue.DROPPED_KEY: 1,
+                          PublishQueue.REJECTED_KEY: 0})
+        stats = self.testQueue.getStats(UnitCxnStateMsg)
+        self.assertEqual(stats[PublishQueue.DROPPED_KEY], 1)
+
+    def test_maxInFlight(self):
+        """
+        The drain method must pause while the publications in flight are
+        at the maximum.
+        """
+        testInFlight = [0]
+
+        def testPublish(msg):
+            testInFlight[0] += 1
+
+        testQueue = PublishQueue(maxSize=8, publishFn=testPublish,
+                                 maxInFlight=3,
+                                 inFlightFn=lambda: testInFlight[0])
+        for idx in range(5):
+            testQueue.put(self._cmd(f"unit{idx}"))
+        self.assertEqual(testQueue.drain(), 3)
+        self.assertEqual(testQueue.getDepth(), 2)
+        testInFlight[0] = 1
+        self.assertEqual(testQueue.drain(), 2)
+        self.assertEqual(testQueue.getDepth(), 0)
+
+    def test_dropNewest(self):
+        """
+        The drop newest policy must drop the new message.
+        """
+        self.testQueue.setPolicy(UnitWhldCmdMsg, PublishQueue.DROP_NEWEST)
+        testMsgs = [self._cmd(unit) for unit in ('unit1', 'unit2', 'unit3')]
+        self.assertTrue(self.testQueue.put(testMsgs[0]))
+        self.assertTrue(self.testQueue.put(testMsgs[1]))
+        self.assertFalse(self.testQueue.put(testMsgs[2]))
+        self.testQueue.drain()
+        self.assertEqual(self._published(), testMsgs[:2])
+        stats = self.testQueue.getStats()
+        self.assertEqual(stats[PublishQueue.DROPPED_KEY], 1)
+
+    def test_reject(self):
+        """
+        The reject policy must raise an exception.
+        """
+        self.testQueue.setPolicy(UnitWhldCmdMsg, PublishQueue.REJECT)
+        self.testQueue.put(self._cmd('unit1'))
+        self.testQueue.put(self._cmd('unit2'))
+        with self.assertRaises(PublishQueueFull):
+            self.testQueue.put(self._cmd('unit3'))
+        self.assertEqual(self.testQueue.getDepth(), 2)
+        stats = self.testQueue.getStats(UnitWhldCmdMsg)
+        self.assertEqual(stats[PublishQueue.REJECTED_KEY], 1)
+
+    def test_blockTimeout(self):
+        """
+        The block policy must raise an exception when no room is made
+        before the block timeout.
+        """
+        testQueue = PublishQueue(maxSize=1, policy=PublishQueue.BLOCK,
+                                 blockTimeout=0.01,
+                                 publishFn=self.mockedPublish)
+        testQueue.put(self._cmd('unit1'))
+        with self.assertRaises(PublishQueueFull):
+            testQueue.put(self._cmd('unit2'))
+        stats = testQueue.getStats()
+        self.assertEqual(stats[PublishQueue.REJECTED_KEY], 1)
+
+    def test_block(self):
+        """
+        The block policy must wait until the queue has room.
+        """
+        testQueue = PublishQueue(maxSize=1, policy=PublishQueue.BLOCK,
+                                 publishFn=self.mockedPublish)
+        testQueue.put(self._cmd('unit1'))
+        testMsg = self._cmd('unit2')
+        putThread = threading.Thread(target=testQueue.put, args=(testMsg,))
+        putThread.start()
+        putThread.join(0.05)
+        self.assertTrue(putThread.is_alive())
+        self.assertEqual(testQueue.drain(maxCount=1), 1)
+        putThread.join(1.0)
+        self.assertFalse(putThread.is_alive())
+        testQueue.drain()
+        self.assertIs(self._published()[-1], testMsg)
+
+    def test_startStop(self):
+        """
+        The sender thread must publish the queued messages once ready,
+        stopping it must keep the remaining messages.
+        """
+        sent = threading.Event()
+        self.mockedPublish.side_effect = lambda msg: sent.set()
+        self.ready = False
+        testQueue = PublishQueue(publishFn=self.mockedPublish,
+                                 readyFn=lambda: self.ready,
+                                 pollPeriod=0.01)
+        testQueue.start()
+        testQueue.start()
+        try:
+            testQueue.put(self._cmd('unit1'))
+            self.assertFalse(sent.wait(0.05))
+            self.ready = True
+            self.assertTrue(sent.wait(1.0))
+        finally:
+            testQueue.stop()
+        self.ready = False
+        testQueue.put(self._cmd('unit2'))
+        self.assertEqual(testQueue.getDepth(), 1)
+        testQueue.stop()
+
+    def test_publishFailed(self):
+        """
+        A failed publication must be counted as dropped and reported,
+        the sender thread going on with the next messages.
+        """
+        testError = ValueError('test error')
+        testMsgs = [self._cmd('unit1'), self._cmd('unit2')]
+        sent = threading.Event()
+
+        def testPublish(msg):
+            if msg is testMsgs[0]:
+                raise testError
+            sent.set()
+
+        mockedError = Mock()
+        testQueue = PublishQueue(publishFn=testPublish,
+                                 onError=mockedError, pollPeriod=0.01)
+        testQueue.start()
+        try:
+            testQueue.put(testMsgs[0])
+            testQueue.put(testMsgs[1])
+            self.assertTrue(sent.wait(1.0))
+            self.assertTrue(testQueue._thread.is_alive())
+        finally:
+            testQueue.stop()
+        mockedError.assert_called_once_with(testMsgs[0], testError)
+        self.assertEqual(testQueue.getStats(),
+                         {PublishQueue.QUEUED_KEY: 2,
+                          PublishQueue.SENT_KEY: 1,
+                          PublishQueue.DROPPED_KEY: 1,
+                          PublishQueue.REJECTED_KEY: 0})
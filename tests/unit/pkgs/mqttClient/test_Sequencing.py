@@ -0,0 +1,121 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+import os
+import sys
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.messages import UnitWhldCmdMsg                            # noqa: E402 E501
+from pkgs.mqttClient.sequencing import SeqStamper, StaleFilter      # noqa: E402 E501
+
+
+class TestSeqStamper(TestCase):
+    """
+    The SeqStamper class test cases.
+    """
+    def test_stamp(self):
+        """
+        The stamp method must stamp each topic with its own monotonic
+        sequence and the current time.
+        """
+        testStamper = SeqStamper(clock=lambda: 10.0)
+        testMsgs = [UnitWhldCmdMsg('unit1'), UnitWhldCmdMsg('unit1'),
+                    UnitWhldCmdMsg('unit2')]
+        for testMsg in testMsgs:
+            self.assertIs(testStamper.stamp(testMsg), testMsg)
+        self.assertEqual([m.getSeq() for m in testMsgs], [1, 2, 1])
+        self.assertEqual(testMsgs[0].getSentAt(), 10.0)
+
+
+class TestStaleFilter(TestCase):
+    """
+    The StaleFilter class test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.now = 100.0
+        self.mockedHandler = Mock(__name__='handler')
+        self.testFilter = StaleFilter(self.mockedHandler, maxAgeMs=50,
+                                      resetGap=10, clock=lambda: self.now)
+
+    def _msg(self, seq: int, sentAt: float, unit: str = 'unit1'):
+        """
+        Create a stamped message.
+        """
+        msg = UnitWhldCmdMsg(unit)
+        msg.stamp(seq, sentAt)
+        return msg
+
+    def test_passUnstamped(self):
+        """
+        Unstamped messages must always be handled.
+        """
+        testMsg = UnitWhldCmdMsg('unit1')
+        self.assertTrue(self.testFilter(testMsg))
+        self.mockedHandler.assert_called_once_with(testMsg)
+
+    def test_dropOutOfOrder(self):
+        """
+        Messages with a sequence number not above the last one of their
+        topic must be dropped.
+        """
+        self.assertTrue(self.testFilter(self._msg(2, 99.99)))
+        self.assertFalse(self.testFilter(self._msg(1, 99.99)))
+        self.assertFalse(self.testFilter(self._msg(2, 99.99)))
+        self.assertTrue(self.testFilter(self._msg(3, 99.99)))
+        self.assertTrue(self.testFilter(self._msg(1, 99.99, unit='unit2')))
+        self.assertEqual(self.testFilter.getStats('unit1'),
+                         {'passed': 2, 'out of order': 2, 'stale': 0})
+
+    def test_senderRestart(self):
+        """
+        A sequence drop larger than the reset gap must be handled as a
+        sender restart.
+        """
+        self.testFilter(self._msg(100, 99.99))
+        self.assertTrue(self.testFilter(self._msg(1, 99.99)))
+
+    def test_senderRestartSentAt(self):
+        """
+        A sequence drop within the reset gap must be handled as a sender
+        restart when the message was sent after the last one.
+        """
+        testStamper = SeqStamper(clock=lambda: self.now - 0.01)
+        for _ in range(8):
+            self.assertTrue(self.testFilter(testStamper.stamp(
+                UnitWhldCmdMsg('unit1'))))
+        self.now += 1.0
+        testStamper = SeqStamper(clock=lambda: self.now - 0.01)
+        for _ in range(8):
+            self.assertTrue(self.testFilter(testStamper.stamp(
+                UnitWhldCmdMsg('unit1'))))
+        self.assertFalse(self.testFilter(self._msg(7, self.now - 0.02)))
+        self.assertEqual(self.testFilter.getStats('unit1'),
+                         {'passed': 16, 'out of order': 1, 'stale': 0})
+
+    def test_dropStale(self):
+        """
+        Messages older than the maximum age must be dropped.
+        """
+        self.assertFalse(self.testFilter(self._msg(1, 99.9)))
+        self.assertTrue(self.testFilter(self._msg(2, 99.96)))
+        self.assertEqual(self.testFilter.getStats('unit1')['stale'], 1)
+        self.mockedHandler.assert_called_once()
+
+    def test_latencyStats(self):
+        """
+        The latency statistics of each unit must be kept in milliseconds.
+        """
+        self.assertIsNone(self.testFilter.getLatencyStats('unit1'))
+        for seq, sentAt in enumerate([99.99, 99.97, 99.98]):
+            self.testFilter(self._msg(seq + 1, sentAt))
+        testResult = self.testFilter.getLatencyStats('unit1')
+        self.assertEqual(testResult['count'], 3)
+        self.assertAlmostEqual(testResult['min'], 10, places=3)
+        self.assertAlmostEqual(testResult['max'], 30, places=3)
+        self.assertAlmostEqual(testResult['mean'], 20, places=3)
+        self.assertAlmostEqual(testResult['last'], 20, places=3)
+        self.assertEqual(self.testFilter.getUnits(), ('unit1',))
@@ -0,0 +1,58 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+import os
+import sys
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.mqttClient.subAck import SubAck   # noqa: E402
+
+
+class TestSubAck(TestCase):
+    """
+    The SubAck class test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.testTopics = ['topic/1', 'topic/2']
+        self.testAck = SubAck(self.testTopics, mid=4)
+
+    def test_complete(self):
+        """
+        The complete method must keep the granted QoS of each topic.
+        """
+        self.assertFalse(self.testAck.isDone())
+        self.assertFalse(self.testAck.wait(0.001))
+        self.assertIsNone(self.testAck.getGrantedQos())
+        self.assertEqual(self.testAck.getFailedTopics(), [])
+        self.testAck.complete((SubAck.FAILURE, 1))
+        self.assertTrue(self.testAck.isDone())
+        self.assertTrue(self.testAck.wait(0))
+        self.assertEqual(self.testAck.getGrantedQos(),
+                         {'topic/1': SubAck.FAILURE, 'topic/2': 1})
+        self.assertEqual(self.testAck.getFailedTopics(), ['topic/1'])
+
+    def test_completeNoQos(self):
+        """
+        The complete method without granted QoS must complete the
+        request with no result per topic.
+        """
+        self.testAck.complete()
+        self.assertTrue(self.testAck.isDone())
+        self.assertIsNone(self.testAck.getGrantedQos())
+
+    def test_addDoneCallback(self):
+        """
+        The done callbacks must be called once completed, at once if
+        already completed.
+        """
+        testCallbacks = [Mock(), Mock()]
+        self.testAck.addDoneCallback(testCallbacks[0])
+        testCallbacks[0].assert_not_called()
+        self.testAck.complete((0, 0))
+        testCallbacks[0].assert_called_once_with(self.testAck)
+        self.testAck.addDoneCallback(testCallbacks[1])
+        testCallbacks[1].assert_called_once_with(self.testAck)
@@ -0,0 +1,93 @@
+from unittest import TestCase
+
+import os
+import sys
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.mqttClient.topicTrie import TopicTrie     # noqa: E402
+
+
+class TestTopicTrie(TestCase):
+    """
+    The TopicTrie class test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.testTrie = TopicTrie()
+        self.testFilters = {
+            'units/connectionState/+': 'cxn',
+            'units/wheeled/+/state': 'state',
+            'units/wheeled/unit1/state': 'unit1 state',
+            'units/wheeled/#': 'wheeled',
+            '#': 'all',
+            '+/+': 'two levels',
+        }
+        for topicFilter, value in self.testFilters.items():
+            self.testTrie.add(topicFilter, value)
+
+    def test_len(self):
+        """
+        The trie length must be the number of indexed values.
+        """
+        self.assertEqual(len(self.testTrie), len(self.testFilters))
+
+    def test_matchExact(self):
+        """
+        The match method must return the values of the exact filter.
+        """
+        self.testTrie.add('a/b', 'exact')
+        self.assertIn('exact', self.testTrie.match('a/b'))
+        self.assertNotIn('exact', self.testTrie.match('a/b/c'))
+
+    def test_matchWildcards(self):
+        """
+        The match method must return the values of every matching filter,
+        including single and multi level wildcards.
+        """
+        testResult = self.testTrie.match('units/wheeled/unit1/state')
+        self.assertCountEqual(testResult, ['state', 'unit1 state',
+                                           'wheeled', 'all'])
+        testResult = self.testTrie.match('units/connectionState/unit2')
+        self.assertCountEqual(testResult, ['cxn', 'all'])
+        testResult = self.testTrie.match('units/other')
+        self.assertCountEqual(testResult, ['all', 'two levels'])
+
+    def test_matchMultiLevelParent(self):
+        """
+        The multi level wildcard must also match its parent level.
+        """
+        self.assertCountEqual(self.testTrie.match('units/wheeled'),
+                              ['wheeled', 'all', 'two levels'])
+
+    def test_matchDollarTopics(self):
+        """
+        Wildcards must not match the first level of topics starting
+        with '$'.
+        """
+        self.testTrie.add('$SYS/+', 'sys')
+        self.assertEqual(self.testTrie.match('$SYS/uptime'), ['sys'])
+
+    def test_remove(self):
+        """
+        The remove method must remove the value and prune empty nodes.
+        """
+        self.testTrie.remove('units/wheeled/unit1/state', 'unit1 state')
+        self.assertNotIn('unit1 state',
+                         self.testTrie.match('units/wheeled/unit1/state'))
+        self.assertEqual(len(self.testTrie), len(self.testFilters) - 1)
+        self.assertNotIn('unit1', self.testTrie._root.children['units']
+                         .children['wheeled'].children)
+
+    def test_removeAll(self):
+        """
+        The remove method must remove every value of the filter when no
+        value is given and ignore unknown filters.
+        """
+        self.testTrie.add('units/wheeled/+/state', 'other state')
+        self.testTrie.remove('units/wheeled/+/state')
+        self.testTrie.remove('unknown/filter')
+        self.assertEqual(self.testTrie.get('units/wheeled/+/state'), ())
+        self.assertEqual(len(self.testTrie), len(self.testFilters) - 1)
@@ -0,0 +1,220 @@
+import paho.mqtt.client as mqtt
+from unittest import TestCase
+from unittest.mock import Mock
+
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.messages import UnitCxnStateMsg, UnitWhldStateMsg     # noqa: E402
+from pkgs.mqttClient import traffic                             # noqa: E402
+from pkgs.mqttClient.client import MqttClient                   # noqa: E402
+from pkgs.mqttClient.exceptions import InvalidReplaySpeed, \
+    InvalidTrafficLog                                           # noqa: E402
+from pkgs.mqttClient.loopback import LoopbackBroker             # noqa: E402
+from pkgs.mqttClient.traffic import TrafficRecorder, \
+    TrafficReplayer                                             # noqa: E402
+
+
+class TestTraffic(TestCase):
+    """
+    The TrafficRecorder and TrafficReplayer classes test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.testDir = tempfile.TemporaryDirectory()
+        self.testPath = os.path.join(self.testDir.name, 'traffic.log')
+        self.testMsgs = []
+        for idx, unit in enumerate(('unit1', 'unit2', 'unit1')):
+            testMsg = UnitWhldStateMsg(unit, {
+                UnitWhldStateMsg.STEERING_KEY: idx / 4,
+                UnitWhldStateMsg.THROTTLE_KEY: -idx / 4,
+            })
+            payload = testMsg.toBinary() if idx == 1 else testMsg.toBytes()
+            self.testMsgs.append((100.0 + idx * 0.5, testMsg.getTopic(),
+                                  payload, 0, False))
+        testMsg = UnitCxnStateMsg('unit2')
+        testMsg.setAsOnline()
+        self.testMsgs.append((102.0, testMsg.getTopic(), testMsg.toWire(),
+                              1, True))
+        self.testMsgs.append((102.5, 'unknown/topic', b'test', 0, False))
+
+    def tearDown(self):
+        """
+        Test cases teardown.
+        """
+        self.testDir.cleanup()
+
+    def _record(self, testMsgs):
+        """
+        Record the test messages.
+        """
+        testRecorder = TrafficRecorder(self.testPath, Mock())
+        for arrival, topic, payload, qos, retain in testMsgs:
+            testRecorder.record(topic, payload, qos, retain, arrival)
+        testRecorder.close()
+        return testRecorder
+
+    def _read(self):
+        """
+        Read the recorded messages, in the test messages layout.
+        """
+        return [(arrival, topic, payload, qos, retain)
+                for arrival, topic, qos, retain, payload
+                in TrafficReplayer(self.testPath).records()]
+
+    def test_record(self):
+        """
+        The recorded messages must be read back in order, each topic
+        being written once.
+        """
+        testRecorder = self._record(self.testMsgs)
+        self.assertEqual(testRecorder.getCount(), len(self.testMsgs))
+        self.assertEqual(self._read(), self.testMsgs)
+        with open(self.testPath, 'rb') as testFile:
+            self.assertEqual(testFile.read().count(b'unknown/topic'), 1)
+
+    def test_recordReceived(self):
+        """
+        The started recorder must record the messages received by the
+        client, with their arrival time, until stopped.
+        """
+        mockedClient = Mock()
+        testRecorder = TrafficRecorder(self.testPath, mockedClient,
+                                       clock=Mock(return_value=42.0))
+        testRecorder.start()
+        testHook = mockedClient.addReceiveHook.call_args[0][0]
+        testMsg = mqtt.MQTTMessage(topic=b'test/topic')
+        testMsg.payload = b'test payload'
+        testMsg.qos = 2
+        testHook(testMsg)
+        testRecorder.stop()
+        mockedClient.removeReceiveHook.assert_called_once_with(testHook)
+        testRecorder.close()
+        self.assertEqual(self._read(),
+                         [(42.0, 'test/topic', b'test payload', 2, False)])
+
+    def test_recordAppend(self):
+        """
+        The recorder must append to an existing log, discarding a torn
+        record at its end and keeping its topics interned.
+        """
+        self._record(self.testMsgs[:2])
+        with open(self.testPath, 'ab') as testFile:
+            testFile.write(b'\x00' * 5)
+        self._record(self.testMsgs[2:])
+        self.assertEqual(self._read(), self.testMsgs)
+
+    def test_recordInlineTopics(self):
+        """
+        The topics beyond the interned topics table capacity must be
+        written in each record.
+        """
+        traffic.INLINE_TOPIC, inlineTopic = 1, traffic.INLINE_TOPIC
+        try:
+            self._record(self.testMsgs)
+            self.assertEqual(self._read(), self.testMsgs)
+        finally:
+            traffic.INLINE_TOPIC = inlineTopic
+
+    def test_invalidLog(self):
+        """
+        The recorder and replayer must raise InvalidTrafficLog for a file
+        that is not a traffic log.
+        """
+        with open(self.testPath, 'wb') as testFile:
+            testFile.write(b'not a traffic log')
+        with self.assertRaises(InvalidTrafficLog):
+            TrafficRecorder(self.testPath, Mock())
+        with self.assertRaises(InvalidTrafficLog):
+            self._read()
+
+    def test_replay(self):
+        """
+        The replay must publish the recorded payloads as they are, at the
+        recorded pace, with their QoS and retain flag, whatever their
+        topic.
+        """
+        self._record(self.testMsgs)
+        testNow = [10.0]
+        mockedSleep = Mock(side_effect=lambda delay: testNow.__setitem__(
+            0, testNow[0] + delay))
+        mockedPublish = Mock()
+        testReplayer = TrafficReplayer(self.testPath)
+        self.assertEqual(testReplayer.replay(publishFn=mockedPublish,
+                                             sleepFn=mockedSleep,
+                                             clock=lambda: testNow[0]), 5)
+        self.assertEqual([call[0][0] for call in mockedSleep.call_args_list],
+                         [0.5, 0.5, 1.0, 0.5])
+        self.assertEqual([call[0] for call in mockedPublish.call_args_list],
+                         [(topic, payload, qos, retain) for _, topic,
+                          payload, qos, retain in self.testMsgs])
+        self.assertEqual(testReplayer.getSkippedCount(), 0)
+
+    def test_replaySpeed(self):
+        """
+        The replay must scale the recorded pace by its speed, without
+        pause at maximum speed, and only keep the selected units, the
+        unregistered topics being skipped and counted.
+        """
+        self._record(self.testMsgs)
+        testNow = [10.0]
+        mockedSleep = Mock(side_effect=lambda delay: testNow.__setitem__(
+            0, testNow[0] + delay))
+        mockedClient = Mock()
+        testReplayer = TrafficReplayer(self.testPath)
+        self.assertEqual(testReplayer.replay(speed=2.0, units=['unit1'],
+                                             mqttClient=mockedClient,
+                                             sleepFn=mockedSleep,
+                                             clock=lambda: testNow[0]), 2)
+        mockedSleep.assert_called_once_with(0.5)
+        self.assertEqual(testReplayer.getSkippedCount(), 1)
+        mockedSleep.reset_mock()
+        self.assertEqual(testReplayer.replay(speed=None,
+                                             mqttClient=mockedClient,
+                                             sleepFn=mockedSleep), 5)
+        mockedSleep.assert_not_called()
+        self.assertEqual(mockedClient.publishRaw.call_count, 7)
+
+    def test_replayInvalidSpeed(self):
+        """
+        The replay must raise InvalidReplaySpeed for a speed not above 0.
+        """
+        self._record(self.testMsgs)
+        testReplayer = TrafficReplayer(self.testPath)
+        for testSpeed in (0, -1.0):
+            with self.assertRaises(InvalidReplaySpeed):
+                testReplayer.replay(speed=testSpeed, publishFn=Mock())
+
+    def test_replayLoopback(self):
+        """
+        The replayed messages must be received as recorded through the
+        loopback broker.
+        """
+        self._record(self.testMsgs)
+        testBroker = LoopbackBroker()
+        testClients = []
+        for clientId in ('replayer', 'subscriber'):
+            testClient = MqttClient(Mock(), clientId, 'password',
+                                    clientFactory=testBroker.createClient)
+            testClient.connect('loopback', 1883)
+            testClient._client.loop(timeout=0)
+            testClients.append(testClient)
+        mockedCallback = Mock(__name__='mockedCallback')
+        testClients[1].registerMsgCallback(UnitWhldStateMsg.TOPIC_FILTER,
+                                           mockedCallback)
+        testClients[1].subscribe([{'topic': UnitWhldStateMsg.TOPIC_FILTER,
+                                   'qos': 0}])
+        testClients[1]._client.loop(timeout=0)
+        testReplayer = TrafficReplayer(self.testPath)
+        self.assertEqual(testReplayer.replay(speed=None,
+                                             mqttClient=testClients[0]), 5)
+        testClients[1]._client.loop(timeout=0)
+        self.assertEqual([call[0][2].payload for call
+                          in mockedCallback.call_args_list],
+                         [payload for _, _, payload, _, _
+                          in self.testMsgs[:3]])
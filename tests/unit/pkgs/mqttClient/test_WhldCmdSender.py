@@ -0,0 +1,102 @@
+import threading
+from unittest import TestCase
+from unittest.mock import Mock
+
+import os
+import sys
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.messages import UnitWhldCmdMsg                # noqa: E402
+from pkgs.mqttClient.cmdSender import WhldCmdSender     # noqa: E402
+
+
+class TestWhldCmdSender(TestCase):
+    """
+    The WhldCmdSender class test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.now = 0.0
+        self.mockedPublish = Mock()
+        self.testSender = WhldCmdSender(rate=10.0,
+                                        publishFn=self.mockedPublish,
+                                        clock=lambda: self.now)
+
+    def _cmd(self, unit, steering, throttle=0.0):
+        """
+        Build a command message.
+        """
+        return UnitWhldCmdMsg(unit, {UnitWhldCmdMsg.STEERING_KEY: steering,
+                                     UnitWhldCmdMsg.THROTTLE_KEY: throttle})
+
+    def test_submitLatestWins(self):
+        """
+        Only the newest command of a unit must be published, the older
+        ones being dropped.
+        """
+        testMsgs = [self._cmd('unit1', s) for s in (0.1, 0.2, 0.3)]
+        for testMsg in testMsgs:
+            self.testSender.submit(testMsg)
+        self.assertEqual(self.testSender.getPendingCount(), 1)
+        self.assertEqual(self.testSender.flush(), 1)
+        self.mockedPublish.assert_called_once_with(testMsgs[-1])
+        self.assertEqual(self.testSender.getStats(),
+                         {WhldCmdSender.SUBMITTED_KEY: 3,
+                          WhldCmdSender.SENT_KEY: 1,
+                          WhldCmdSender.DROPPED_KEY: 2})
+
+    def test_submitPerUnit(self):
+        """
+        The pending commands must be kept per unit topic.
+        """
+        testMsg1 = self._cmd('unit1', 0.1)
+        testMsg2 = self._cmd('unit2', 0.2)
+        self.testSender.submit(testMsg1)
+        self.testSender.submit(testMsg2)
+        self.assertEqual(self.testSender.flush(), 2)
+        publishedMsgs = [c[0][0] for c in self.mockedPublish.call_args_list]
+        self.assertEqual(publishedMsgs, [testMsg1, testMsg2])
+        self.assertEqual(self.testSender.getPendingCount(), 0)
+
+    def test_flushEmpty(self):
+        """
+        Flushing without pending command must not publish anything.
+        """
+        self.assertEqual(self.testSender.flush(), 0)
+        self.mockedPublish.assert_not_called()
+
+    def test_poll(self):
+        """
+        The poll method must flush at most once per send period.
+        """
+        self.testSender.submit(self._cmd('unit1', 0.1))
+        self.assertEqual(self.testSender.poll(), 1)
+        self.testSender.submit(self._cmd('unit1', 0.2))
+        self.now = 0.05
+        self.assertEqual(self.testSender.poll(), 0)
+        self.now = 0.1
+        self.assertEqual(self.testSender.poll(), 1)
+        self.assertEqual(self.mockedPublish.call_count, 2)
+
+    def test_startStop(self):
+        """
+        The sender thread must flush the pending commands periodically
+        and stopping it must flush the remaining ones.
+        """
+        sent = threading.Event()
+        self.mockedPublish.side_effect = lambda msg: sent.set()
+        testSender = WhldCmdSender(rate=100.0, publishFn=self.mockedPublish)
+        testSender.start()
+        testSender.start()
+        try:
+            testSender.submit(self._cmd('unit1', 0.1))
+            self.assertTrue(sent.wait(1.0))
+        finally:
+            testSender.submit(self._cmd('unit2', 0.2))
+            testSender.stop()
+        self.assertEqual(self.mockedPublish.call_count, 2)
+        self.assertEqual(testSender.getPendingCount(), 0)
+        testSender.stop()
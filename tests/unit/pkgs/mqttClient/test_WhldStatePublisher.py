@@ -0,0 +1,116 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+import os
+import sys
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.messages import UnitWhldStateMsg                      # noqa: E402
+from pkgs.mqttClient.statePublisher import WhldStatePublisher   # noqa: E402
+
+
+class TestWhldStatePublisher(TestCase):
+    """
+    The WhldStatePublisher class test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.testUnit = 'unit1'
+        self.now = 0.0
+        self.mockedPublish = Mock()
+        self.testPublisher = WhldStatePublisher(deadband=0.1,
+                                                maxInterval=1.0,
+                                                publishFn=self.mockedPublish,
+                                                clock=lambda: self.now)
+
+    def test_updateFirst(self):
+        """
+        The first state of a unit must always be published.
+        """
+        self.assertTrue(self.testPublisher.update(self.testUnit, 0.5, 0.2))
+        msg = self.mockedPublish.call_args[0][0]
+        self.assertIsInstance(msg, UnitWhldStateMsg)
+        self.assertEqual(msg.getUnit(), self.testUnit)
+        self.assertEqual(msg.getSteering(), 0.5)
+        self.assertEqual(msg.getThrottle(), 0.2)
+
+    def test_updateDeadband(self):
+        """
+        A state within the deadband of the last published state must be
+        suppressed, the deadband being measured from the published state.
+        """
+        self.testPublisher.update(self.testUnit, 0.5, 0.2)
+        self.now = 0.1
+        self.assertFalse(self.testPublisher.update(self.testUnit, 0.55, 0.2))
+        self.now = 0.2
+        self.assertFalse(self.testPublisher.update(self.testUnit, 0.58, 0.25))
+        self.now = 0.3
+        self.assertTrue(self.testPublisher.update(self.testUnit, 0.61, 0.2))
+        self.assertEqual(self.mockedPublish.call_count, 2)
+
+    def test_updateMaxInterval(self):
+        """
+        An unchanged state must be published once the maximum interval
+        expired.
+        """
+        self.testPublisher.update(self.testUnit, 0.5, 0.2)
+        self.now = 0.9
+        self.assertFalse(self.testPublisher.update(self.testUnit, 0.5, 0.2))
+        self.now = 1.0
+        self.assertTrue(self.testPublisher.update(self.testUnit, 0.5, 0.2))
+
+    def test_updateReuseMessage(self):
+        """
+        The published message of a unit must be reused.
+        """
+        self.testPublisher.update(self.testUnit, 0.5, 0.2)
+        self.testPublisher.update(self.testUnit, -0.5, 0.2)
+        calls = self.mockedPublish.call_args_list
+        self.assertIs(calls[0][0][0], calls[1][0][0])
+
+    def test_refresh(self):
+        """
+        The refresh method must republish the expired unit states only.
+        """
+        self.testPublisher.update(self.testUnit, 0.5, 0.2)
+        self.now = 0.5
+        self.testPublisher.update('unit2', 0.0, 0.0)
+        self.now = 1.2
+        self.assertEqual(self.testPublisher.refresh(), 1)
+        msg = self.mockedPublish.call_args[0][0]
+        self.assertEqual(msg.getUnit(), self.testUnit)
+        self.assertEqual(self.testPublisher.refresh(), 0)
+
+    def test_forget(self):
+        """
+        The next state of a forgotten unit must be published.
+        """
+        self.testPublisher.update(self.testUnit, 0.5, 0.2)
+        self.testPublisher.forget(self.testUnit)
+        self.assertTrue(self.testPublisher.update(self.testUnit, 0.5, 0.2))
+
+    def test_getStats(self):
+        """
+        The getStats method must return the published and suppressed
+        counts of a unit or of every unit.
+        """
+        self.testPublisher.update(self.testUnit, 0.5, 0.2)
+        self.testPublisher.update(self.testUnit, 0.5, 0.2)
+        self.testPublisher.update('unit2', 0.5, 0.2)
+        self.assertEqual(self.testPublisher.getStats(self.testUnit),
+                         {'published': 1, 'suppressed': 1})
+        self.assertEqual(self.testPublisher.getStats(),
+                         {'published': 2, 'suppressed': 1})
+        self.assertEqual(self.testPublisher.getStats('unknown'),
+                         {'published': 0, 'suppressed': 0})
+
+    def test_defaultPublish(self):
+        """
+        The mqttClient publish function must be used by default.
+        """
+        from pkgs.mqttClient import client
+        testPublisher = WhldStatePublisher()
+        self.assertIs(testPublisher._publish, client.publish)
@@ -0,0 +1,168 @@
+import concurrent.futures
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import Mock
+
+import os
+import sys
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.mqttClient.dispatcher import ReceivedMsg, \
+    WorkerDispatcher                                    # noqa: E402
+
+
+def _processCallback(client, usrData, msg):
+    """
+    The process pool callback used for test, failing on unexpected
+    arguments.
+    """
+    if client is not None or usrData is not None or \
+            msg != ReceivedMsg('topic/1', b'data', 0, False):
+        raise ValueError('unexpected arguments')
+
+
+class TestWorkerDispatcher(TestCase):
+    """
+    The WorkerDispatcher class test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.onError = Mock()
+        self.testDispatcher = WorkerDispatcher(workers=4,
+                                               onError=self.onError)
+        self.lock = threading.Lock()
+        self.calls = []
+        self.running = 0
+        self.maxRunning = 0
+
+    def tearDown(self):
+        """
+        Test cases teardown.
+        """
+        self.testDispatcher.shutdown()
+
+    def _msg(self, topic, payload=b''):
+        """
+        Build a paho received message.
+        """
+        return Mock(topic=topic, payload=payload, qos=0, retain=False)
+
+    def _slowCallback(self, client, usrData, msg):
+        """
+        The slow callback used for test, recording its calls and the
+        maximum number of concurrent calls.
+        """
+        with self.lock:
+            self.running += 1
+            self.maxRunning = max(self.maxRunning, self.running)
+        time.sleep(0.01)
+        with self.lock:
+            self.running -= 1
+            self.calls.append((msg.topic, msg.payload))
+
+    def _wait(self, count):
+        """
+        Wait until the number of completed calls is reached.
+        """
+        deadline = time.monotonic() + 5.0
+        while time.monotonic() < deadline:
+            stats = self.testDispatcher.getStats()
+            completed = stats[WorkerDispatcher.COMPLETED_KEY] + \
+                stats[WorkerDispatcher.FAILED_KEY]
+            if completed >= count:
+                return
+            time.sleep(0.005)
+        self.fail('callbacks not completed')
+
+    def test_wrap(self):
+        """
+        The wrapped callback must keep the name of the callback and
+        dispatch its calls to the workers.
+        """
+        testCallback = Mock(__name__='testCallback')
+        testWrapped = self.testDispatcher.wrap(testCallback)
+        self.assertEqual(testWrapped.__name__, 'testCallback')
+        testMsg = self._msg('topic/1')
+        testWrapped('client', 'usrData', testMsg)
+        self._wait(1)
+        testCallback.assert_called_once_with('client', 'usrData', testMsg)
+
+    def test_topicOrdering(self):
+        """
+        The messages of a topic must be handled one at a time in their
+        reception order.
+        """
+        testWrapped = self.testDispatcher.wrap(self._slowCallback)
+        for index in range(5):
+            testWrapped(None, None, self._msg('topic/1', index))
+        self._wait(5)
+        self.assertEqual(self.calls, [('topic/1', i) for i in range(5)])
+        self.assertEqual(self.maxRunning, 1)
+
+    def test_topicsConcurrent(self):
+        """
+        The messages of different topics must be handled concurrently.
+        """
+        testWrapped = self.testDispatcher.wrap(self._slowCallback)
+        for index in range(4):
+            testWrapped(None, None, self._msg(f"topic/{index}"))
+        self._wait(4)
+        self.assertGreater(self.maxRunning, 1)
+
+    def test_maxConcurrency(self):
+        """
+        A callback must not run more than its concurrency limit at once,
+        the limit being shared by every topic of the callback, while
+        keeping the order of each topic.
+        """
+        testWrapped = self.testDispatcher.wrap(self._slowCallback,
+                                               maxConcurrency=2)
+        self.testDispatcher.wrap(self._slowCallback, maxConcurrency=2)
+        for index in range(3):
+            for topic in ('topic/1', 'topic/2', 'topic/3', 'topic/4'):
+                testWrapped(None, None, self._msg(topic, index))
+        self._wait(12)
+        self.assertEqual(self.maxRunning, 2)
+        for topic in ('topic/1', 'topic/2', 'topic/3', 'topic/4'):
+            self.assertEqual([p for t, p in self.calls if t == topic],
+                             [0, 1, 2])
+        self.assertEqual(self.testDispatcher.getPendingCount(), 0)
+
+    def test_callbackError(self):
+        """
+        A failing callback must be reported and not stop the next calls
+        of its topic.
+        """
+        testError = ValueError('test error')
+        testCallback = Mock(__name__='testCallback',
+                            side_effect=[testError, None])
+        testWrapped = self.testDispatcher.wrap(testCallback)
+        testWrapped(None, None, self._msg('topic/1'))
+        testWrapped(None, None, self._msg('topic/1'))
+        self._wait(2)
+        self.onError.assert_called_once_with(testCallback, testError)
+        self.assertEqual(self.testDispatcher.getStats(),
+                         {WorkerDispatcher.DISPATCHED_KEY: 2,
+                          WorkerDispatcher.COMPLETED_KEY: 1,
+                          WorkerDispatcher.FAILED_KEY: 1})
+
+    def test_processPool(self):
+        """
+        With a process pool, the callback must be called with a copy of
+        the message and no client nor user data.
+        """
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=1)
+        testDispatcher = WorkerDispatcher(executor=executor)
+        try:
+            testWrapped = testDispatcher.wrap(_processCallback)
+            testWrapped('client', 'usrData', self._msg('topic/1', b'data'))
+        finally:
+            testDispatcher.shutdown()
+        self.assertEqual(testDispatcher.getStats(),
+                         {WorkerDispatcher.DISPATCHED_KEY: 1,
+                          WorkerDispatcher.COMPLETED_KEY: 1,
+                          WorkerDispatcher.FAILED_KEY: 0})
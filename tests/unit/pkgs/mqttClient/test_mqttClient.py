@@ -9,11 +9,13 @@ sys.path.append(os.path.abspath('./src'))
 
 import pkgs.mqttClient.client as client                     # noqa: E402
 from pkgs.messages.unitCxnStateMsg import UnitCxnStateMsg   # noqa: E402
+from pkgs.messages.unitWhldCmdMsg import UnitWhldCmdMsg     # noqa: E402
+from pkgs.mqttClient.subAck import SubAck                   # noqa: E402
 
 
 class TestMqttClient(TestCase):
     """
-    The mqttClient module test cases.
+    The MqttClient class test cases.
     """
     def setUp(self):
         """
@@ -28,371 +30,824 @@ class TestMqttClient(TestCase):
         self.mockedClient = Mock()
         with patch('pkgs.mqttClient.client.mqtt') as mockedMqtt:
             mockedMqtt.Client.return_value = self.mockedClient
-            client.init(self.mockedLogging, self.testId, self.testPassword)
+            self.testClient = client.MqttClient(self.mockedLogging,
+                                                self.testId,
+                                                self.testPassword)
+        self.logger = self.testClient.getLogger()
         self.mockedLogging.reset_mock()
         self.mockedClient.reset_mock()
 
-    def tearDown(self):
-        """
-        Test cases teardown.
-        """
-        client.logger = None
-        client.client = None
-
     def _testCallback(self):
         """
         The callback used for test.
         """
         pass
 
-    def test_initAlreadyInit(self):
+    def _createClient(self, **kwargs):
         """
-        The init function must do nothing and warn that the client has
-        already been initialized.
+        Create a client with a mocked paho client.
         """
         with patch('pkgs.mqttClient.client.mqtt') as mockedMqtt:
-            client.init(self.mockedLogging, self.testId, self.testPassword)
-            self.mockedLogging.assert_not_called()
-            mockedMqtt.Client.assert_not_called()
-            client.logger.warn.assert_called_once()
+            mockedMqtt.Client.return_value = self.mockedClient
+            testClient = client.MqttClient(self.mockedLogging, self.testId,
+                                           self.testPassword, **kwargs)
+        return testClient, mockedMqtt
 
-    def test_initLogger(self):
+    def test_constructorLogger(self):
         """
-        The init function must initialize the logger.
+        The constructor must initialize the logger.
         """
-        client.logger = None
-        client.client = None
-        client.init(self.mockedLogging, self.testId, self.testPassword)
+        testClient, mockedMqtt = self._createClient()
         self.mockedLogging.getLogger.assert_called_once_with(f"MQTT-{self.testId.upper()}")     # noqa: E501
+        self.assertEqual(testClient.getLogger(),
+                         self.mockedLogging.getLogger.return_value)
+        self.assertEqual(testClient.getClientId(), self.testId)
 
-    def test_initCreatMqttClient(self):
+    def test_constructorCreateMqttClient(self):
         """
-        The init function must create the MQTT client.
+        The constructor must create its own MQTT client.
         """
-        client.logger = None
-        client.client = None
-        with patch('pkgs.mqttClient.client.mqtt') as mockedMqtt:
-            client.init(self.mockedLogging, self.testId, self.testPassword)
-            mockedMqtt.Client.assert_called_once_with(client_id=self.testId)
+        testClient, mockedMqtt = self._createClient()
+        mockedMqtt.Client.assert_called_once_with(client_id=self.testId,
+                                                  clean_session=True)
+        self.assertIs(testClient._client, self.mockedClient)
+        testClient, mockedMqtt = self._createClient(cleanSession=False)
+        mockedMqtt.Client.assert_called_once_with(client_id=self.testId,
+                                                  clean_session=False)
 
-    def test_initSetWill(self):
+    def test_constructorSetWill(self):
         """
-        The init function must set the client last will.
+        The constructor must set the client last will.
         """
-        client.logger = None
-        client.client = None
         testWillMsg = UnitCxnStateMsg(unit=self.testId, payload={
             UnitCxnStateMsg.STATE_KEY: UnitCxnStateMsg.OFFLINE_STATE
         })
-        with patch('pkgs.mqttClient.client.mqtt') as mockedMqtt:
-            mockedMqtt.Client.return_value = self.mockedClient
-            client.init(self.mockedLogging, self.testId, self.testPassword)
-            client.client.will_set.assert_called_once_with(testWillMsg.getTopic(),      # noqa: E501
-                                                           testWillMsg.toJson(),       # noqa: E501
-                                                           qos=testWillMsg.getQos(),   # noqa: E501
-                                                           retain=True)                 # noqa: E501
+        testClient, mockedMqtt = self._createClient()
+        testClient._client.will_set.assert_called_once_with(testWillMsg.getTopic(),     # noqa: E501
+                                                            testWillMsg.toWire(),      # noqa: E501
+                                                            qos=testWillMsg.getQos(),  # noqa: E501
+                                                            retain=True)                # noqa: E501
 
-    def test_initSetUserPassword(self):
+    def test_constructorSetUserPassword(self):
         """
-        The init function must set the user and password.
+        The constructor must set the user and password.
         """
-        client.logger = None
-        client.client = None
-        with patch('pkgs.mqttClient.client.mqtt') as mockedMqtt:
-            mockedMqtt.Client.return_value = self.mockedClient
-            client.init(self.mockedLogging, self.testId, self.testPassword)
-            client.client.username_pw_set.assert_called_once_with(self.testId,
-                                                                  self.testPassword)    # noqa: E501
+        testClient, mockedMqtt = self._createClient()
+        testClient._client.username_pw_set.assert_called_once_with(self.testId,        # noqa: E501
+                                                                   self.testPassword)  # noqa: E501
+
+    def test_constructorSetCallbacks(self):
+        """
+        The constructor must set the client callbacks to its own methods.
+        """
+        testClient, mockedMqtt = self._createClient()
+        pahoClient = testClient._client
+        self.assertEqual(pahoClient.on_connect, testClient._onConnect)
+        self.assertEqual(pahoClient.on_disconnect, testClient._onDisconnect)
+        self.assertEqual(pahoClient.on_message, testClient._onMessage)
+        self.assertEqual(pahoClient.on_publish, testClient._onPublish)
+        self.assertEqual(pahoClient.on_subscribe, testClient._onSubscribe)
+        self.assertEqual(pahoClient.on_unsubscribe, testClient._onUnsubscribe)
+        self.assertEqual(pahoClient.on_log, testClient._onLog)
 
-    def test_initSetCallbacks(self):
+    def test_independentInstances(self):
         """
-        The init function must set the client callbacks.
+        Each instance must hold its own paho client and registry.
         """
-        client.logger = None
-        client.client = None
+        otherPahoClient = Mock()
         with patch('pkgs.mqttClient.client.mqtt') as mockedMqtt:
-            mockedMqtt.Client.return_value = self.mockedClient
-            client.init(self.mockedLogging, self.testId, self.testPassword)
-            self.assertEqual(client.client.on_connect, client._onConnect)
-            self.assertEqual(client.client.on_disconnect, client._onDisconnect)
-            self.assertEqual(client.client.on_message, client._onMessage)
-            self.assertEqual(client.client.on_publish, client._onPublish)
-            self.assertEqual(client.client.on_subscribe, client._onSubscribe)
-            self.assertEqual(client.client.on_unsubscribe,
-                             client._onUnsubscribe)
-            self.assertEqual(client.client.on_log, client._onLog)
+            mockedMqtt.Client.return_value = otherPahoClient
+            otherClient = client.MqttClient(self.mockedLogging, 'otherId',
+                                            self.testPassword)
+        self.assertIsNot(otherClient._client, self.testClient._client)
+        self.assertIsNot(otherClient._registry, self.testClient._registry)
 
     def test_onConnect(self):
         """
-        The _onConnect function must log (info) the connection information.
+        The _onConnect method must log (info) the connection information.
         """
         testRc = 0
-        client._onConnect(self.mockedClient, None, {}, testRc)
-        client.logger.info.assert_called_once_with(f"connection result: "
-                                                   f"{testRc}")
+        self.testClient._onConnect(self.mockedClient, None, {}, testRc)
+        self.logger.info.assert_called_once_with(f"connection result: "
+                                                 f"{testRc}")
+
+    def test_onConnectResubscribe(self):
+        """
+        The _onConnect method must restore the tracked subscriptions in
+        a single request and reset the backoff.
+        """
+        testBackoff = Mock()
+        testClient, mockedMqtt = self._createClient(backoff=testBackoff)
+        self.mockedClient.subscribe.return_value = (mqtt.MQTT_ERR_SUCCESS, 1)
+        testClient.subscribe(self.testSubs)
+        self.mockedClient.subscribe.reset_mock()
+        testClient._onConnect(self.mockedClient, None,
+                              {'session present': 0}, 0)
+        expectedList = [(testSub['topic'], testSub['qos'])
+                        for testSub in self.testSubs]
+        self.mockedClient.subscribe.assert_called_once_with(expectedList)
+        testBackoff.reset.assert_called_once()
+
+    def test_onConnectSessionPresent(self):
+        """
+        The _onConnect method must not restore the subscriptions when the
+        broker kept the persistent session.
+        """
+        testClient, mockedMqtt = self._createClient(cleanSession=False)
+        self.mockedClient.subscribe.return_value = (mqtt.MQTT_ERR_SUCCESS, 1)
+        testClient.subscribe(self.testSubs)
+        self.mockedClient.subscribe.reset_mock()
+        testClient._onConnect(self.mockedClient, None,
+                              {'session present': 1}, 0)
+        self.mockedClient.subscribe.assert_not_called()
+        testClient._onConnect(self.mockedClient, None,
+                              {'session present': 0}, 0)
+        self.mockedClient.subscribe.assert_called_once()
+
+    def test_onConnectRefused(self):
+        """
+        The _onConnect method must not restore the subscriptions when
+        the connection is refused.
+        """
+        self.mockedClient.subscribe.return_value = (mqtt.MQTT_ERR_SUCCESS, 1)
+        self.testClient.subscribe(self.testSubs)
+        self.mockedClient.subscribe.reset_mock()
+        self.testClient._onConnect(self.mockedClient, None, {}, 5)
+        self.mockedClient.subscribe.assert_not_called()
+
+    def test_getSubscriptions(self):
+        """
+        The subscriptions must be tracked until unsubscribed.
+        """
+        self.mockedClient.subscribe.return_value = (mqtt.MQTT_ERR_SUCCESS, 1)
+        self.mockedClient.unsubscribe.return_value = (mqtt.MQTT_ERR_SUCCESS,
+                                                      2)
+        self.testClient.subscribe(self.testSubs)
+        self.assertEqual(self.testClient.getSubscriptions(), self.testSubs)
+        self.testClient.unsubscribe(self.testSubs[:1])
+        self.assertEqual(self.testClient.getSubscriptions(),
+                         self.testSubs[1:])
 
     def test_onDisconnect(self):
         """
-        The _onDisconnect function must log (info)
+        The _onDisconnect method must log (info)
         the disconnection information.
         """
         testRc = 0
-        client._onDisconnect(self.mockedClient, None, testRc)
-        client.logger.info.assert_called_once_with(f"disconnection result: "
-                                                   f"{testRc}")
+        self.testClient._onDisconnect(self.mockedClient, None, testRc)
+        self.logger.info.assert_called_once_with(f"disconnection result: "
+                                                 f"{testRc}")
 
     def test_onMessage(self):
         """
-        The _onMessage function must warn of the uncaught messages.
-        """
-        testMsg = 'uncaught message'
-        client._onMessage(self.mockedClient, None, testMsg)
-        client.logger.warn.assert_called_once_with(f"uncaught message: "
-                                                   f"{testMsg}")
+        The _onMessage method must warn of the uncaught messages.
+        """
+        testMsg = mqtt.MQTTMessage(topic=b'unknown/topic')
+        self.testClient._onMessage(self.mockedClient, None, testMsg)
+        self.logger.warn.assert_called_once_with(f"uncaught message: "
+                                                 f"{testMsg}")
+
+    def test_onMessageHandled(self):
+        """
+        The _onMessage method must give the decoded message to the
+        handlers registered for its class.
+        """
+        testHandler = Mock(__name__='testHandler')
+        testCxnMsg = UnitCxnStateMsg('test unit')
+        testCxnMsg.setAsOnline()
+        testMsg = mqtt.MQTTMessage(topic=testCxnMsg.getTopic().encode())
+        testMsg.payload = testCxnMsg.toWire()
+        self.testClient.registerMsgHandler(UnitCxnStateMsg, testHandler)
+        self.testClient._onMessage(self.mockedClient, None, testMsg)
+        decodedMsg = testHandler.call_args[0][0]
+        self.assertIsInstance(decodedMsg, UnitCxnStateMsg)
+        self.assertEqual(decodedMsg.getUnit(), 'test unit')
+        self.assertTrue(decodedMsg.isOnline())
+        self.logger.warn.assert_not_called()
+
+    def test_onMessageHandlerError(self):
+        """
+        The _onMessage method must log (error) the exceptions raised
+        while decoding or handling a message.
+        """
+        testHandler = Mock(__name__='testHandler',
+                           side_effect=ValueError('test error'))
+        testCxnMsg = UnitCxnStateMsg('test unit')
+        testCxnMsg.setAsOnline()
+        testMsg = mqtt.MQTTMessage(topic=testCxnMsg.getTopic().encode())
+        testMsg.payload = testCxnMsg.toWire()
+        self.testClient.registerMsgHandler(UnitCxnStateMsg, testHandler)
+        self.testClient._onMessage(self.mockedClient, None, testMsg)
+        self.logger.error.assert_called_once()
+        self.logger.warn.assert_not_called()
+
+    def test_onMessageCallback(self):
+        """
+        The _onMessage method must call the callbacks whose filter
+        matches the message topic instead of the handlers.
+        """
+        testHandler = Mock(__name__='testHandler')
+        testCallbacks = [Mock(__name__=f"testCallback{i}") for i in range(3)]
+        testCxnMsg = UnitCxnStateMsg('test unit')
+        testMsg = mqtt.MQTTMessage(topic=testCxnMsg.getTopic().encode())
+        testMsg.payload = testCxnMsg.toWire()
+        self.testClient.registerMsgHandler(UnitCxnStateMsg, testHandler)
+        self.testClient.registerMsgCallback(testCxnMsg.getTopic(),
+                                            testCallbacks[0])
+        self.testClient.registerMsgCallback(f"{UnitCxnStateMsg.TOPIC_ROOT}/+",    # noqa: E501
+                                            testCallbacks[1])
+        self.testClient.registerMsgCallback('units/other/#', testCallbacks[2])
+        self.testClient._onMessage(self.mockedClient, 'usrData', testMsg)
+        for testCallback in testCallbacks[:2]:
+            testCallback.assert_called_once_with(self.mockedClient,
+                                                 'usrData', testMsg)
+        testCallbacks[2].assert_not_called()
+        testHandler.assert_not_called()
+        self.logger.warn.assert_not_called()
 
     def test_onPublish(self):
         """
-        The _onPublish function must log (debug) the publish result.
+        The _onPublish method must log (debug) the publish result.
         """
         testMid = 1
-        client._onPublish(self.mockedClient, None, testMid)
-        client.logger.debug.assert_called_once_with(f"message {testMid} "
-                                                    f"published")
+        self.testClient._onPublish(self.mockedClient, None, testMid)
+        self.logger.debug.assert_called_once_with(f"message {testMid} "
+                                                  f"published")
 
     def test_onSubscribe(self):
         """
-        The _onSubscribe function must log (debug) the subscribe result.
+        The _onSubscribe method must log (debug) the subscribe result.
         """
         testMid = 3
         testQos = 2
-        client._onSubscribe(self.mockedClient, None, testMid, testQos)
-        client.logger.debug.assert_called_once_with(f"subscribed to message "
-                                                    f"{testMid} with QoS: "
-                                                    f"{testQos}")
+        self.testClient._onSubscribe(self.mockedClient, None, testMid, testQos)
+        self.logger.debug.assert_called_once_with(f"subscribed to message "
+                                                  f"{testMid} with QoS: "
+                                                  f"{testQos}")
 
     def test_onUnsubscribe(self):
         """
-        The _onUnsubscribe function must log (debug) the unsubscribe result.
+        The _onUnsubscribe method must log (debug) the unsubscribe result.
         """
         testMid = 0
-        client._onUnsubscribe(self.mockedClient, None, testMid)
-        client.logger.debug.assert_called_once_with(f"unsubscribed from "
-                                                    f"message {testMid}")
+        self.testClient._onUnsubscribe(self.mockedClient, None, testMid)
+        self.logger.debug.assert_called_once_with(f"unsubscribed from "
+                                                  f"message {testMid}")
 
     def test_onLog(self):
         """
-        The _onLog function must log the received message base on its level.
+        The _onLog method must log the received message base on its level.
         """
         testLvls = [mqtt.MQTT_LOG_DEBUG, mqtt.MQTT_LOG_NOTICE,
                     mqtt.MQTT_LOG_INFO, mqtt.MQTT_LOG_WARNING,
                     mqtt.MQTT_LOG_ERR, 5000]
         testMsg = 'test log message'
         for idx, testLvl in enumerate(testLvls):
-            client._onLog(self.mockedClient, None, testLvl, testMsg)
-        client.logger.debug.assert_called_once_with(testMsg)
-        client.logger.info.assert_called_with(testMsg)
-        self.assertEqual(client.logger.info.call_count, 2)
+            self.testClient._onLog(self.mockedClient, None, testLvl, testMsg)
+        self.logger.debug.assert_called_once_with(testMsg)
+        self.logger.info.assert_called_with(testMsg)
+        self.assertEqual(self.logger.info.call_count, 2)
         warnCalls = [call(testMsg), call(f"unknown level "
                                          f"log: {testMsg}")]
-        client.logger.warn.assert_has_calls(warnCalls)
-        client.logger.error.assert_called_once_with(testMsg)
-
-    def test_connectNotInit(self):
-        """
-        The connect function must raise a MqttClientNotInit exception
-        and do nothing else if the client has not been initialized.
-        """
-        client.client = None
-        testIp = '192.168.1.45'
-        testPort = 1883
-        with self.assertRaises(client.MqttClientNotInit) as context:
-            client.connect(testIp, testPort)
-            self.assertTrue(isinstance(context.exception,
-                                       client.MqttClientNotInit))
-            client.client.connect.assert_not_called()
+        self.logger.warn.assert_has_calls(warnCalls)
+        self.logger.error.assert_called_once_with(testMsg)
 
     def test_connect(self):
         """
-        The connect function must try to connect to the broker.
+        The connect method must try to connect to the broker.
         """
         testIp = '192.168.1.45'
         testPort = 1883
-        client.connect(testIp, testPort)
-        client.client.connect.assert_called_once_with(testIp, port=testPort)
-
-    def test_disconnectNotInit(self):
-        """
-        The disconnect function must raise a MqttClientNotInit exception
-        and do nothing else if the client has not been initialized.
-        """
-        client.client = None
-        with self.assertRaises(client.MqttClientNotInit) as context:
-            client.disconnect()
-            self.assertTrue(isinstance(context.exception,
-                                       client.MqttClientNotInit))
-            client.client.disconnect.assert_not_called()
+        self.testClient.connect(testIp, testPort)
+        self.mockedClient.connect.assert_called_once_with(testIp, port=testPort)    # noqa: E501
 
     def test_disconnect(self):
         """
-        The disconnect function must disconect from the broker.
-        """
-        client.disconnect()
-        client.client.disconnect.assert_called_once()
-
-    def test_startLoopNotInit(self):
-        """
-        The startLoop function must raise a MqttClientNotInit exception
-        and do nothing else if the client has not been initialized.
+        The disconnect method must disconect from the broker.
         """
-        client.client = None
-        with self.assertRaises(client.MqttClientNotInit) as context:
-            client.startLoop()
-            self.assertTrue(isinstance(context.exception,
-                                       client.MqttClientNotInit))
-            client.client.loop_start.assert_not_called()
+        self.testClient.disconnect()
+        self.mockedClient.disconnect.assert_called_once()
 
     def test_startLoop(self):
         """
-        The startLoop function must start the MQTT client network loop.
-        """
-        client.startLoop()
-        client.client.loop_start.assert_called_once()
-
-    def test_stopLoopNotInit(self) -> None:
-        """
-        The stopLoop function must raise a MqttClientNotinit exception
-        and do nothing else if the client has not been initialized.
+        The startLoop method must start the MQTT client network loop.
         """
-        client.client = None
-        with self.assertRaises(client.MqttClientNotInit) as context:
-            client.stopLoop()
-            self.assertTrue(isinstance(context.exception,
-                            client.MqttClientNotInit))
-            client.client.loop_stop.assert_not_called()
+        self.testClient.startLoop()
+        self.mockedClient.loop_start.assert_called_once()
 
     def test_stopLoop(self):
         """
-        The stopLoop function must stop the MQTT client network loop.
-        """
-        client.stopLoop()
-        client.client.loop_stop.assert_called_once()
-
-    def test_publishNotInit(self):
-        """
-        The publish function must raise a MqttClientNotInit exception
-        and do nothing else if the client has not been initialized.
-        """
-        testMsg = UnitCxnStateMsg('test unit')
-        client.client = None
-        with self.assertRaises(client.MqttClientNotInit) as context:
-            client.publish(testMsg)
-            self.assertTrue(isinstance(context.exception,
-                                       client.MqttClientNotInit))
-            client.client.publish.assert_not_called()
+        The stopLoop method must stop the MQTT client network loop.
+        """
+        self.testClient.stopLoop()
+        self.mockedClient.loop_stop.assert_called_once()
+
+    def test_startStopLoopBackoff(self):
+        """
+        The startLoop and stopLoop methods must run the managed network
+        loop instead of the paho one when a backoff is given.
+        """
+        self.mockedClient.loop.return_value = mqtt.MQTT_ERR_SUCCESS
+        testClient, mockedMqtt = self._createClient(backoff=Mock())
+        testClient.startLoop()
+        testClient.startLoop()
+        self.assertTrue(testClient._netThread.is_alive())
+        testClient.stopLoop()
+        self.assertIsNone(testClient._netThread)
+        testClient.stopLoop()
+        self.mockedClient.loop_start.assert_not_called()
+        self.mockedClient.loop_stop.assert_not_called()
+        self.mockedClient.loop.assert_called_with(timeout=1.0)
+
+    def test_networkLoopReconnect(self):
+        """
+        The managed network loop must reconnect after the backoff delay
+        when the connection is lost, and retry when it fails.
+        """
+        testBackoff = Mock()
+        testBackoff.next.return_value = 0.0
+        testClient, mockedMqtt = self._createClient(backoff=testBackoff)
+        self.mockedClient.loop.side_effect = [mqtt.MQTT_ERR_SUCCESS,
+                                              mqtt.MQTT_ERR_CONN_LOST,
+                                              mqtt.MQTT_ERR_NO_CONN]
+
+        def reconnect():
+            if self.mockedClient.reconnect.call_count == 1:
+                raise OSError('refused')
+            testClient._stopEvent.set()
+        self.mockedClient.reconnect.side_effect = reconnect
+        testClient._networkLoop()
+        self.assertEqual(testBackoff.next.call_count, 2)
+        self.assertEqual(self.mockedClient.reconnect.call_count, 2)
+        self.logger.warn.assert_called_once()
+
+    def test_networkLoopDisconnecting(self):
+        """
+        The managed network loop must not reconnect after a requested
+        disconnection.
+        """
+        testBackoff = Mock()
+        testClient, mockedMqtt = self._createClient(backoff=testBackoff)
+        testClient.disconnect()
+        self.mockedClient.loop.side_effect = \
+            lambda timeout: testClient._stopEvent.set() or \
+            mqtt.MQTT_ERR_NO_CONN
+        testClient._networkLoop()
+        testBackoff.next.assert_not_called()
+        self.mockedClient.reconnect.assert_not_called()
+
+    def test_isConnected(self):
+        """
+        The isConnected method must return the paho client connection
+        state.
+        """
+        for expected in (True, False):
+            self.mockedClient.is_connected.return_value = expected
+            self.assertEqual(self.testClient.isConnected(), expected)
 
     def test_publish(self):
         """
-        The publish function must publish the desired message.
+        The publish method must publish the desired message and return
+        the publication info.
         """
         testPayload = {'testKey': 'test value'}
         testMsg = UnitCxnStateMsg('test unit', payload=testPayload)
         expectedTopic = testMsg.getTopic()
-        expectedPayload = testMsg.toJson()
+        expectedPayload = testMsg.toBytes()
         expectedQos = testMsg.getQos()
         expectedRetain = testMsg.getRetain()
-        client.publish(testMsg)
-        client.client.publish.assert_called_once_with(expectedTopic,
-                                                      payload=expectedPayload,
-                                                      qos=expectedQos,
-                                                      retain=expectedRetain)
+        testResult = self.testClient.publish(testMsg)
+        self.assertIs(testResult, self.mockedClient.publish.return_value)
+        self.mockedClient.publish.assert_called_once_with(expectedTopic,
+                                                          payload=expectedPayload,    # noqa: E501
+                                                          qos=expectedQos,
+                                                          retain=expectedRetain)    # noqa: E501
 
-    def test_subscribeNotInit(self):
+    def test_publishBinary(self):
         """
-        The subscribe function must raise a MqTTClientNotInit exception
-        and do nothing else if the client has not been initialized.
+        The publish method must publish the binary message when the
+        message class wire format is binary.
         """
-        client.client = None
-        with self.assertRaises(client.MqttClientNotInit) as context:
-            client.subscribe(self.testSubs)
-            self.assertTrue(isinstance(context.exception,
-                                       client.MqttClientNotInit))
-            client.client.subscribe.assert_not_called()
+        testMsg = UnitWhldCmdMsg('test unit', payload={
+            UnitWhldCmdMsg.STEERING_KEY: 0.5,
+            UnitWhldCmdMsg.THROTTLE_KEY: -0.5
+        })
+        with patch.object(UnitWhldCmdMsg, 'WIRE_FORMAT',
+                          UnitWhldCmdMsg.BINARY_FORMAT):
+            self.testClient.publish(testMsg)
+        self.mockedClient.publish.assert_called_once_with(testMsg.getTopic(),
+                                                          payload=testMsg.toBinary(),   # noqa: E501
+                                                          qos=testMsg.getQos(),
+                                                          retain=testMsg.getRetain())   # noqa: E501
+
+    def test_publishDiskBuffer(self):
+        """
+        The publish method must store the QoS 1 and 2 messages in the disk
+        buffer while disconnected or while stored messages are pending.
+        """
+        testBuffer = Mock()
+        testBuffer.getDepth.return_value = 0
+        testClient, mockedMqtt = self._createClient(diskBuffer=testBuffer)
+        testMsg = UnitCxnStateMsg('test unit', payload={'testKey': 1})
+        self.mockedClient.is_connected.return_value = False
+        self.assertIsNone(testClient.publish(testMsg))
+        testBuffer.put.assert_called_once_with(testMsg.getTopic(),
+                                               testMsg.toWire(),
+                                               qos=testMsg.getQos(),
+                                               retain=testMsg.getRetain())
+        self.mockedClient.publish.assert_not_called()
+        self.mockedClient.is_connected.return_value = True
+        testBuffer.getDepth.return_value = 1
+        self.assertIsNone(testClient.publish(testMsg))
+        self.assertEqual(testBuffer.put.call_count, 2)
+        testBuffer.getDepth.return_value = 0
+        testResult = testClient.publish(testMsg)
+        self.assertIs(testResult, self.mockedClient.publish.return_value)
+
+    def test_publishRaw(self):
+        """
+        The publishRaw method must publish the encoded message, or store
+        it in the disk buffer as the publish method does.
+        """
+        testBuffer = Mock()
+        testBuffer.getDepth.return_value = 0
+        testClient, mockedMqtt = self._createClient(diskBuffer=testBuffer)
+        self.mockedClient.is_connected.return_value = True
+        testResult = testClient.publishRaw('test/topic', b'\x01\x02', 1,
+                                           True)
+        self.assertIs(testResult, self.mockedClient.publish.return_value)
+        self.mockedClient.publish.assert_called_once_with(
+            'test/topic', payload=b'\x01\x02', qos=1, retain=True)
+        self.mockedClient.is_connected.return_value = False
+        self.assertIsNone(testClient.publishRaw('test/topic', b'\x03', 2))
+        testBuffer.put.assert_called_once_with('test/topic', b'\x03',
+                                               qos=2, retain=False)
+
+    def test_publishDiskBufferForward(self):
+        """
+        The publish method must restart the forwarding of the message
+        stored while connected, the forwarding having possibly ended.
+        """
+        testBuffer = Mock()
+        testBuffer.getDepth.return_value = 1
+        testClient, mockedMqtt = self._createClient(diskBuffer=testBuffer)
+        testMsg = UnitCxnStateMsg('test unit', payload={'testKey': 1})
+        self.mockedClient.is_connected.return_value = True
+        self.assertIsNone(testClient.publish(testMsg))
+        testClient._fwdThread.join(1.0)
+        testBuffer.forward.assert_called_once_with(testClient._publishRaw,
+                                                   testClient.isConnected)
+
+    def test_publishDiskBufferFull(self):
+        """
+        The publish method must log (warning) the messages dropped by a
+        full disk buffer.
+        """
+        testBuffer = Mock()
+        testBuffer.getDepth.return_value = 0
+        testBuffer.put.return_value = False
+        testClient, mockedMqtt = self._createClient(diskBuffer=testBuffer)
+        testMsg = UnitCxnStateMsg('test unit', payload={'testKey': 1})
+        self.mockedClient.is_connected.return_value = False
+        self.assertIsNone(testClient.publish(testMsg))
+        testClient.getLogger().warn.assert_called_once()
+
+    def test_onConnectForward(self):
+        """
+        The _onConnect method must forward the stored messages at the
+        disk buffer rate.
+        """
+        testBuffer = Mock()
+        testBuffer.getDepth.return_value = 2
+        testBuffer.forward.return_value = 2
+        testClient, mockedMqtt = self._createClient(diskBuffer=testBuffer)
+        testClient._onConnect(self.mockedClient, None, {}, 0)
+        testClient._fwdThread.join(1.0)
+        testBuffer.forward.assert_called_once_with(testClient._publishRaw,
+                                                   testClient.isConnected)
+        testBuffer.forward.reset_mock()
+        testBuffer.getDepth.return_value = 0
+        testClient._onConnect(self.mockedClient, None, {}, 0)
+        testBuffer.forward.assert_not_called()
+
+    def test_publishMetrics(self):
+        """
+        The publish method must record the sent and queued publications
+        in flight and the failed ones as dropped, the acknowledgements
+        ending the flight.
+        """
+        testMsg = UnitCxnStateMsg('test unit', payload={'testKey': 1})
+        expectedKey = ('UnitCxnStateMsg', UnitCxnStateMsg.TOPIC_ROOT)
+        testMetrics = self.testClient.getMetrics()
+        self.mockedClient.publish.return_value = \
+            Mock(rc=mqtt.MQTT_ERR_SUCCESS, mid=3)
+        self.testClient.publish(testMsg)
+        self.assertEqual(testMetrics.getInFlight(), 1)
+        self.mockedClient.publish.return_value = \
+            Mock(rc=mqtt.MQTT_ERR_QUEUE_SIZE, mid=4)
+        self.testClient.publish(testMsg)
+        self.testClient._onPublish(self.mockedClient, None, 3)
+        self.assertEqual(testMetrics.getInFlight(), 0)
+        self.assertEqual(testMetrics.getCounters(),
+                         {testMetrics.PUBLISHED_KEY: {expectedKey: 1},
+                          testMetrics.ACKED_KEY: {expectedKey: 1},
+                          testMetrics.RECEIVED_KEY: {},
+                          testMetrics.DROPPED_KEY: {expectedKey: 1}})
+        self.assertEqual(testMetrics.getLatency(expectedKey).getCount(), 1)
+
+    def test_publishMetricsReconnect(self):
+        """
+        The QoS 0 publications dropped by paho on a lost connection must
+        not stay in flight, the QoS 1 ones staying until acknowledged
+        after the reconnection.
+        """
+        testMetrics = self.testClient.getMetrics()
+        testMsg = UnitWhldCmdMsg('test unit', {'steering': 0.0})
+        for mid in range(1, 101):
+            self.mockedClient.publish.return_value = \
+                Mock(rc=mqtt.MQTT_ERR_SUCCESS, mid=mid)
+            self.testClient.publish(testMsg)
+        self.mockedClient.publish.return_value = \
+            Mock(rc=mqtt.MQTT_ERR_NO_CONN, mid=101)
+        self.testClient.publish(UnitCxnStateMsg('test unit'))
+        self.assertEqual(testMetrics.getInFlight(), 1)
+        self.testClient._onDisconnect(self.mockedClient, None,
+                                      mqtt.MQTT_ERR_CONN_LOST)
+        self.testClient._onConnect(self.mockedClient, None, {}, 0)
+        self.testClient._onPublish(self.mockedClient, None, 101)
+        self.assertEqual(testMetrics.getInFlight(), 0)
+        self.assertEqual(testMetrics._sending, {})
+
+    def test_onMessageMetrics(self):
+        """
+        The _onMessage method must record the received messages by class
+        and topic root.
+        """
+        testMsg = UnitCxnStateMsg('test unit', payload={'testKey': 1})
+        self.testClient._onMessage(self.mockedClient, None,
+                                   Mock(topic=testMsg.getTopic(),
+                                        payload=testMsg.toWire()))
+        self.testClient._onMessage(self.mockedClient, None,
+                                   Mock(topic='other/topic', payload=b''))
+        testMetrics = self.testClient.getMetrics()
+        self.assertEqual(testMetrics.getCounters(testMetrics.RECEIVED_KEY),
+                         {('UnitCxnStateMsg', UnitCxnStateMsg.TOPIC_ROOT): 1,
+                          (None, 'other'): 1})
+
+    def test_receiveHook(self):
+        """
+        The _onMessage method must give the received messages to the
+        receive hooks, logging (error) their exceptions, until removed.
+        """
+        testHooks = [Mock(), Mock(side_effect=ValueError('test error'))]
+        testMsg = mqtt.MQTTMessage(topic=b'unknown/topic')
+        for testHook in testHooks:
+            self.testClient.addReceiveHook(testHook)
+        self.testClient._onMessage(self.mockedClient, None, testMsg)
+        for testHook in testHooks:
+            testHook.assert_called_once_with(testMsg)
+        self.logger.error.assert_called_once()
+        self.logger.warn.assert_called_once()
+        self.testClient.removeReceiveHook(testHooks[0])
+        self.testClient._onMessage(self.mockedClient, None, testMsg)
+        testHooks[0].assert_called_once()
+        self.assertEqual(testHooks[1].call_count, 2)
 
     def test_subscribe(self):
         """
-        The subscribe function must subscribe to the desired subscriptions.
-        """
-        expectedCalls = []
-        for testSub in self.testSubs:
-            expectedCalls.append(call(testSub['topic'], qos=testSub['qos']))
-        client.subscribe(self.testSubs)
-        client.client.subscribe.assert_has_calls(expectedCalls)
-
-    def test_unsubscribeNotInit(self):
-        """
-        The unsubscribe function must raise a MqttClientNotInit exception
-        and do nothing else if the client has not been initialized.
-        """
-        client.client = None
-        with self.assertRaises(client.MqttClientNotInit) as context:
-            client.unscubscribe(self.testSubs)
-            self.assertTrue(isinstance(context.exception,
-                                       client.MqttClientNotInit))
-            client.client.unsubscribe.assert_not_called()
+        The subscribe method must subscribe to the desired subscriptions
+        in a single request and report the granted QoS of each topic
+        once acknowledged.
+        """
+        expectedTopics = [testSub['topic'] for testSub in self.testSubs]
+        expectedList = [(testSub['topic'], testSub['qos'])
+                        for testSub in self.testSubs]
+        self.mockedClient.subscribe.return_value = (mqtt.MQTT_ERR_SUCCESS, 5)
+        testResult = self.testClient.subscribe(self.testSubs)
+        self.mockedClient.subscribe.assert_called_once_with(expectedList)
+        self.assertEqual(testResult.getMid(), 5)
+        self.assertFalse(testResult.isDone())
+        self.testClient._onSubscribe(self.mockedClient, None, 5,
+                                     (1, 0, SubAck.FAILURE))
+        self.assertTrue(testResult.wait(0))
+        self.assertEqual(testResult.getGrantedQos(),
+                         dict(zip(expectedTopics, (1, 0, SubAck.FAILURE))))
+        self.assertEqual(testResult.getFailedTopics(), [expectedTopics[2]])
+
+    def test_subscribeEarlyAck(self):
+        """
+        The subscribe method must complete a request acknowledged before
+        being tracked.
+        """
+        self.mockedClient.subscribe.return_value = (mqtt.MQTT_ERR_SUCCESS, 5)
+        self.testClient._onSubscribe(self.mockedClient, None, 5, (1, 0, 2))
+        testResult = self.testClient.subscribe(self.testSubs)
+        self.assertTrue(testResult.isDone())
+        self.assertEqual(list(testResult.getGrantedQos().values()),
+                         [1, 0, 2])
+        self.assertEqual(self.testClient._earlyAcks, {})
+        self.assertEqual(self.testClient._pendingAcks, {})
+
+    def test_subscribeNotSent(self):
+        """
+        The subscribe method must complete at once a request paho
+        could not send.
+        """
+        self.mockedClient.subscribe.return_value = (mqtt.MQTT_ERR_NO_CONN,
+                                                    None)
+        testResult = self.testClient.subscribe(self.testSubs)
+        self.assertTrue(testResult.isDone())
+        self.assertEqual(testResult.getRc(), mqtt.MQTT_ERR_NO_CONN)
+        self.assertIsNone(testResult.getGrantedQos())
+
+    def test_subscribeEmpty(self):
+        """
+        The subscribe and unsubscribe methods must not send a request
+        for an empty list.
+        """
+        self.assertEqual(self.testClient.subscribe([]).getGrantedQos(), {})
+        self.assertTrue(self.testClient.unsubscribe([]).isDone())
+        self.mockedClient.subscribe.assert_not_called()
+        self.mockedClient.unsubscribe.assert_not_called()
 
     def test_unsubscribe(self):
         """
-        The unsubscribe function must unsubscribe from the desired
-        subscriptions
+        The unsubscribe method must unsubscribe from the desired
+        subscriptions in a single request.
         """
-        expectedCalls = []
-        for testSub in self.testSubs:
-            expectedCalls.append(call(testSub['topic']))
-        client.unscubscribe(self.testSubs)
-        client.client.unsubscribe.assert_has_calls(expectedCalls)
-
-    def test_registerMsgCallbackNotInit(self):
-        """
-        The registerMsgCallback must raise a MqttClientNotInit exception
-        and do nothing else if the client has not been initialized.
-        """
-        testTopic = 'test topic'
-        testCallback = 'test callback'
-        client.client = None
-        with self.assertRaises(client.MqttClientNotInit) as context:
-            client.registerMsgCallback(testTopic, testCallback)
-            self.assertTrue(isinstance(context.exception,
-                                       client.MqttClientNotInit))
-            client.client.message_callback_add.assert_not_called()
+        expectedTopics = [testSub['topic'] for testSub in self.testSubs]
+        self.mockedClient.unsubscribe.return_value = (mqtt.MQTT_ERR_SUCCESS,
+                                                      6)
+        testResult = self.testClient.unsubscribe(self.testSubs)
+        self.mockedClient.unsubscribe.assert_called_once_with(expectedTopics)
+        self.assertFalse(testResult.isDone())
+        self.testClient._onUnsubscribe(self.mockedClient, None, 6)
+        self.assertTrue(testResult.isDone())
+        self.assertEqual(testResult.getTopics(), tuple(expectedTopics))
 
     def test_registerMsgCallback(self):
         """
         The registerMsgCallback must add the message callback for the
         specified topic.
         """
-        testTopic = 'test topic'
-        client.registerMsgCallback(testTopic, self._testCallback)
-        client.client.message_callback_add.assert_called_once_with(testTopic,
-                                                                   self._testCallback)  # noqa: E501
+        testTopic = 'test/+/topic'
+        testCallback = Mock(__name__='testCallback')
+        self.testClient.registerMsgCallback(testTopic, self._testCallback)
+        self.assertEqual(self.testClient._callbacks.get(testTopic),
+                         (self._testCallback,))
+        self.testClient.registerMsgCallback(testTopic, testCallback)
+        self.assertEqual(self.testClient._callbacks.get(testTopic),
+                         (testCallback,))
+        self.mockedClient.message_callback_add.assert_not_called()
 
-    def test_unregisterMsgCallbackNotInit(self):
+    def test_registerMsgCallbackDispatcher(self):
         """
-        The unregisterMsgCallback must raise a MqttClientNotInit exception
-        and do nothing else if the client has not been initialized.
+        The registerMsgCallback must add the callback wrapped by the
+        worker dispatcher when one is used.
         """
-        client.client = None
         testTopic = 'test topic'
-        with self.assertRaises(client.MqttClientNotInit) as context:
-            client.unregisterMsgCallback(testTopic)
-            self.assertTrue(isinstance(context.exception,
-                                       client.MqttClientNotInit))
-            client.client.message_callback_remove.assert_not_called()
+        mockedDispatcher = Mock()
+        with patch('pkgs.mqttClient.client.mqtt') as mockedMqtt:
+            mockedMqtt.Client.return_value = self.mockedClient
+            testClient = client.MqttClient(self.mockedLogging, self.testId,
+                                           self.testPassword,
+                                           dispatcher=mockedDispatcher)
+        testClient.registerMsgCallback(testTopic, self._testCallback,
+                                       maxConcurrency=2)
+        mockedDispatcher.wrap.assert_called_once_with(self._testCallback, 2)
+        self.assertEqual(testClient._callbacks.get(testTopic),
+                         (mockedDispatcher.wrap.return_value,))
 
     def test_unregisterMsgCallback(self):
         """
         The unregisterCallback must remove the message callback from
         The specified topic.
         """
-        testTopic = 'test topic'
-        client.unregisterMsgCallback(testTopic)
-        client.client.message_callback_remove.assert_called_once_with(testTopic)    # noqa: E501
+        testTopic = 'test/#'
+        self.testClient.registerMsgCallback(testTopic, self._testCallback)
+        self.testClient.unregisterMsgCallback(testTopic)
+        self.assertEqual(self.testClient._callbacks.get(testTopic), ())
+        self.assertEqual(len(self.testClient._callbacks), 0)
+
+    def test_registerMsgHandler(self):
+        """
+        The registerMsgHandler must add the handler to the registry.
+        """
+        with patch.object(self.testClient._registry, 'addHandler') as mockedAdd:    # noqa: E501
+            self.testClient.registerMsgHandler(UnitCxnStateMsg, self._testCallback)    # noqa: E501
+            mockedAdd.assert_called_once_with(UnitCxnStateMsg,
+                                              self._testCallback)
+
+    def test_unregisterMsgHandler(self):
+        """
+        The unregisterMsgHandler must remove the handler from the registry.
+        """
+        with patch.object(self.testClient._registry, 'removeHandler') as mockedRemove:    # noqa: E501
+            self.testClient.unregisterMsgHandler(UnitCxnStateMsg, self._testCallback)    # noqa: E501
+            mockedRemove.assert_called_once_with(UnitCxnStateMsg,
+                                                 self._testCallback)
+
+
+class TestMqttClientModule(TestCase):
+    """
+    The mqttClient module default client wrapper test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.testId = 'testId'
+        self.testPassword = 'testPassword'
+        self.mockedLogging = Mock()
+        with patch('pkgs.mqttClient.client.mqtt'):
+            client.init(self.mockedLogging, self.testId, self.testPassword)
+        self.mockedDefault = Mock()
+        self.mockedLogging.reset_mock()
+
+    def tearDown(self):
+        """
+        Test cases teardown.
+        """
+        client.defaultClient = None
+
+    def test_init(self):
+        """
+        The init function must create the default client.
+        """
+        self.assertIsInstance(client.defaultClient, client.MqttClient)
+        self.assertEqual(client.defaultClient.getClientId(), self.testId)
+
+    def test_initAlreadyInit(self):
+        """
+        The init function must do nothing and warn that the client has
+        already been initialized.
+        """
+        defaultClient = client.defaultClient
+        with patch('pkgs.mqttClient.client.mqtt') as mockedMqtt:
+            client.init(self.mockedLogging, self.testId, self.testPassword)
+            self.mockedLogging.assert_not_called()
+            mockedMqtt.Client.assert_not_called()
+        self.assertIs(client.defaultClient, defaultClient)
+        defaultClient.getLogger().warn.assert_called_once()
+
+    def test_getDefaultClientNotInit(self):
+        """
+        The getDefaultClient function must raise a MqttClientNotInit
+        exception if the client has not been initialized.
+        """
+        client.defaultClient = None
+        with self.assertRaises(client.MqttClientNotInit):
+            client.getDefaultClient()
+
+    def test_functionsNotInit(self):
+        """
+        The module functions must raise a MqttClientNotInit exception
+        if the client has not been initialized.
+        """
+        client.defaultClient = None
+        testCalls = [(client.connect, ('192.168.1.45', 1883)),
+                     (client.disconnect, ()),
+                     (client.isConnected, ()),
+                     (client.getMetrics, ()),
+                     (client.startLoop, ()),
+                     (client.stopLoop, ()),
+                     (client.publish, (UnitCxnStateMsg('test unit'),)),
+                     (client.publishRaw, ('topic', b'payload')),
+                     (client.subscribe, ([],)),
+                     (client.unscubscribe, ([],)),
+                     (client.registerMsgCallback, ('topic', print)),
+                     (client.unregisterMsgCallback, ('topic',)),
+                     (client.registerMsgHandler, (UnitCxnStateMsg, print)),
+                     (client.unregisterMsgHandler, (UnitCxnStateMsg, print))]
+        for function, args in testCalls:
+            with self.assertRaises(client.MqttClientNotInit):
+                function(*args)
+
+    def test_functionsDelegate(self):
+        """
+        The module functions must delegate to the default client.
+        """
+        testMsg = UnitCxnStateMsg('test unit')
+        testCalls = [(client.connect, 'connect', ('192.168.1.45', 1883)),
+                     (client.disconnect, 'disconnect', ()),
+                     (client.isConnected, 'isConnected', ()),
+                     (client.getMetrics, 'getMetrics', ()),
+                     (client.startLoop, 'startLoop', ()),
+                     (client.stopLoop, 'stopLoop', ()),
+                     (client.publish, 'publish', (testMsg,)),
+                     (client.publishRaw, 'publishRaw',
+                      ('topic', b'payload', 1, True)),
+                     (client.subscribe, 'subscribe', ([],)),
+                     (client.unscubscribe, 'unsubscribe', ([],)),
+                     (client.registerMsgCallback, 'registerMsgCallback',
+                      ('topic', print, 2)),
+                     (client.unregisterMsgCallback, 'unregisterMsgCallback',
+                      ('topic',)),
+                     (client.registerMsgHandler, 'registerMsgHandler',
+                      (UnitCxnStateMsg, print)),
+                     (client.unregisterMsgHandler, 'unregisterMsgHandler',
+                      (UnitCxnStateMsg, print))]
+        client.defaultClient = self.mockedDefault
+        for function, method, args in testCalls:
+            function(*args)
+            getattr(self.mockedDefault, method).assert_called_once_with(*args)
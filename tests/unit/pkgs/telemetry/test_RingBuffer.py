@@ -0,0 +1,93 @@
+import numpy as np
+from unittest import TestCase
+
+import os
+import sys
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.telemetry.ringBuffer import RingBuffer    # noqa: E402
+
+
+class TestRingBuffer(TestCase):
+    """
+    The RingBuffer class test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.testBuffer = RingBuffer(4)
+
+    def _fill(self, count):
+        """
+        Append samples timestamped from 0, their fields being the
+        timestamp times 10 and 100.
+        """
+        for idx in range(count):
+            self.testBuffer.append(float(idx), idx * 10.0, idx * 100.0)
+
+    def test_append(self):
+        """
+        The append method must keep the latest samples in chronological
+        order.
+        """
+        self._fill(2)
+        self.assertEqual(self.testBuffer.getCount(), 2)
+        np.testing.assert_array_equal(self.testBuffer.getSamples(),
+                                      [[0, 1], [0, 10], [0, 100]])
+        self._fill(6)
+        self.assertEqual(self.testBuffer.getCount(), 4)
+        self.assertEqual(self.testBuffer.getCapacity(), 4)
+        np.testing.assert_array_equal(self.testBuffer.getSamples()[0],
+                                      [2, 3, 4, 5])
+
+    def test_extend(self):
+        """
+        The extend method must append the samples at once, keeping the
+        latest ones.
+        """
+        self._fill(3)
+        self.testBuffer.extend(np.array([[3, 4], [30, 40], [300, 400]]))
+        np.testing.assert_array_equal(self.testBuffer.getSamples()[0],
+                                      [1, 2, 3, 4])
+        testSamples = np.arange(18).reshape(3, 6)
+        self.testBuffer.extend(testSamples)
+        np.testing.assert_array_equal(self.testBuffer.getSamples(),
+                                      testSamples[:, 2:])
+
+    def test_since(self):
+        """
+        The since method must return the samples from a time, as a view
+        when not wrapping around.
+        """
+        self._fill(3)
+        testResult = self.testBuffer.since(1.0)
+        np.testing.assert_array_equal(testResult[0], [1, 2])
+        self.assertTrue(np.shares_memory(testResult, self.testBuffer._data))
+        self._fill(6)
+        np.testing.assert_array_equal(self.testBuffer.since(2.5)[0],
+                                      [3, 4, 5])
+        np.testing.assert_array_equal(self.testBuffer.since(4.5)[0], [5])
+        self.assertEqual(self.testBuffer.since(10.0).shape, (3, 0))
+
+    def test_last(self):
+        """
+        The last method must return the latest samples.
+        """
+        self.assertEqual(self.testBuffer.last(2).shape, (3, 0))
+        self._fill(3)
+        np.testing.assert_array_equal(self.testBuffer.last(2)[0], [1, 2])
+        self._fill(5)
+        np.testing.assert_array_equal(self.testBuffer.last(3)[0], [2, 3, 4])
+        np.testing.assert_array_equal(self.testBuffer.last(10)[0],
+                                      [1, 2, 3, 4])
+
+    def test_clear(self):
+        """
+        The clear method must drop every sample.
+        """
+        self._fill(3)
+        self.testBuffer.clear()
+        self.assertEqual(self.testBuffer.getCount(), 0)
+        self.assertEqual(self.testBuffer.getSamples().shape, (3, 0))
@@ -0,0 +1,123 @@
+import numpy as np
+from unittest import TestCase
+from unittest.mock import Mock
+
+import os
+import sys
+
+sys.path.append(os.path.abspath('./src'))
+
+from pkgs.messages import UnitWhldStateMsg                  # noqa: E402
+from pkgs.mqttClient.client import MqttClient               # noqa: E402
+from pkgs.mqttClient.loopback import LoopbackBroker         # noqa: E402
+from pkgs.telemetry.whldTelemetry import WhldTelemetry      # noqa: E402
+
+
+class TestWhldTelemetry(TestCase):
+    """
+    The WhldTelemetry class test cases.
+    """
+    def setUp(self):
+        """
+        Test cases setup.
+        """
+        self.testTime = [0.0]
+        self.mockedClient = Mock()
+        self.testTelemetry = WhldTelemetry(capacity=8,
+                                           mqttClient=self.mockedClient,
+                                           clock=lambda: self.testTime[0])
+
+    def _fill(self):
+        """
+        Record a sample per second from 0 to 4, the steering being the
+        time and the throttle its opposite.
+        """
+        for idx in range(5):
+            self.testTelemetry.record('unit1', float(idx), -float(idx),
+                                      timestamp=float(idx))
+        self.testTime[0] = 4.0
+
+    def test_startStop(self):
+        """
+        The start and stop methods must record the wheeled unit states
+        through the client.
+        """
+        testBroker = LoopbackBroker()
+        testClient = MqttClient(Mock(), 'telemetry', 'password',
+                                clientFactory=testBroker.createClient)
+        testClient.connect('loopback', 1883)
+        testClient._client.loop(timeout=0)
+        testTelemetry = WhldTelemetry(mqttClient=testClient,
+                                      clock=lambda: self.testTime[0])
+        testAck = testTelemetry.start()
+        testClient._client.loop(timeout=0)
+        self.assertEqual(testAck.getGrantedQos(),
+                         {UnitWhldStateMsg.TOPIC_FILTER: 0})
+        testMsg = UnitWhldStateMsg('unit1', {
+            UnitWhldStateMsg.STEERING_KEY: 0.5,
+            UnitWhldStateMsg.THROTTLE_KEY: -0.25,
+        })
+        testBroker.publish(testMsg.getTopic(), testMsg.toWire())
+        testClient._client.loop(timeout=0)
+        self.assertEqual(testTelemetry.getUnits(), ['unit1'])
+        testAck = testTelemetry.stop()
+        testClient._client.loop(timeout=0)
+        self.assertTrue(testAck.isDone())
+        testBroker.publish(testMsg.getTopic(), testMsg.toWire())
+        testClient._client.loop(timeout=0)
+        self.assertEqual(testTelemetry.getWindow('unit1').shape[1], 1)
+
+    def test_update(self):
+        """
+        The update method must record the message state at the clock
+        time.
+        """
+        self.testTime[0] = 12.5
+        testMsg = UnitWhldStateMsg('unit1', {
+            UnitWhldStateMsg.STEERING_KEY: 0.5,
+            UnitWhldStateMsg.THROTTLE_KEY: -0.25,
+        })
+        self.testTelemetry.update(testMsg)
+        self.assertEqual(self.testTelemetry.getUnits(), ['unit1'])
+        np.testing.assert_array_equal(self.testTelemetry.getWindow('unit1'),
+                                      [[12.5], [0.5], [-0.25]])
+        self.assertEqual(self.testTelemetry.getBuffer('unit1').getCapacity(),
+                         8)
+
+    def test_getWindow(self):
+        """
+        The getWindow method must return the samples of the last seconds.
+        """
+        self._fill()
+        np.testing.assert_array_equal(self.testTelemetry.getWindow('unit1',
+                                                                   2.0)[0],
+                                      [2, 3, 4])
+        self.assertEqual(self.testTelemetry.getWindow('unit2', 2.0).shape,
+                         (3, 0))
+
+    def test_getMeanMax(self):
+        """
+        The getMean and getMax methods must reduce the window states.
+        """
+        self._fill()
+        np.testing.assert_array_equal(self.testTelemetry.getMean('unit1',
+                                                                 2.0),
+                                      [3.0, -3.0])
+        np.testing.assert_array_equal(self.testTelemetry.getMax('unit1'),
+                                      [4.0, 0.0])
+        self.assertIsNone(self.testTelemetry.getMean('unit2'))
+        self.assertIsNone(self.testTelemetry.getMax('unit1', -1.0))
+
+    def test_resample(self):
+        """
+        The resample method must interpolate the window states on a
+        regular grid.
+        """
+        self._fill()
+        testResult = self.testTelemetry.resample('unit1', 0.5, 2.0)
+        np.testing.assert_array_almost_equal(testResult,
+                                             [[2, 2.5, 3, 3.5, 4],
+                                              [2, 2.5, 3, 3.5, 4],
+                                              [-2, -2.5, -3, -3.5, -4]])
+        self.assertEqual(self.testTelemetry.resample('unit2', 0.5).shape,
+                         (3, 0))